@@ -0,0 +1,175 @@
+from typing import Deque, Dict, Optional
+from collections import deque
+import asyncio
+import itertools
+import time
+
+import config
+
+# 서버 과부하로 연결을 받지 않을 때의 WebSocket 종료 코드 (RFC 6455 "Try Again Later")
+CLOSE_TRY_AGAIN_LATER = 1013
+
+
+class AdmissionRejected(Exception):
+    """새 세션을 받을 수 없는 경우"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Session rejected: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """실시간 분석 세션 수락 제어
+
+    활성 세션 수, 추론 풀 사용률, 최근 추론 지연 시간이 한도를 넘으면
+    새 세션을 대기열에서 기다리게 하거나 거절한다. 이미 수락된 세션은
+    끊지 않으므로 과부하 시에도 기존 세션의 처리 품질이 유지된다.
+    브라우저에서 자세를 추정하는 세션은 추론 풀을 쓰지 않으므로 이 한도에
+    포함하지 않고, 별도의 세션 수 한도만 적용한다.
+
+    상태는 프로세스 메모리에만 있으므로 한도와 준비 상태(accepting)는 서버
+    워커 프로세스마다 따로 적용된다.
+    """
+
+    def __init__(self, inference_pool, max_sessions: Optional[int] = None, max_load: Optional[float] = None,
+                 max_latency_ms: Optional[float] = None, queue_size: Optional[int] = None,
+                 queue_timeout: Optional[float] = None, retry_after: Optional[int] = None,
+                 max_client_sessions: Optional[int] = None):
+        self.inference_pool = inference_pool
+        # 0도 유효한 한도이므로 None일 때만 설정값 사용
+        self.max_sessions = config.ADMISSION_MAX_SESSIONS if max_sessions is None else max_sessions
+        self.max_load = config.ADMISSION_MAX_LOAD if max_load is None else max_load
+        self.max_latency = (config.ADMISSION_MAX_LATENCY_MS if max_latency_ms is None else max_latency_ms) / 1000
+        self.queue_size = config.ADMISSION_QUEUE_SIZE if queue_size is None else queue_size
+        self.queue_timeout = config.ADMISSION_QUEUE_TIMEOUT_S if queue_timeout is None else queue_timeout
+        self.retry_after = config.ADMISSION_RETRY_AFTER_S if retry_after is None else retry_after
+        self.max_client_sessions = (
+            config.ADMISSION_MAX_CLIENT_SESSIONS if max_client_sessions is None else max_client_sessions
+        )
+
+        # 서버 추론 세션 수 / 브라우저 추론 세션 수
+        self.active = 0
+        self.client_active = 0
+        # 대기 중인 세션 (먼저 온 순서대로 수락)
+        self._waiting: Deque[int] = deque()
+        self._tickets = itertools.count()
+        self._released = asyncio.Event()
+
+        self.admitted = 0
+        self.queued = 0
+        self.rejected: Dict[str, int] = {"queue_full": 0, "queue_timeout": 0, "max_client_sessions": 0}
+
+    def overload_reason(self) -> Optional[str]:
+        """새 세션을 받을 수 없는 이유 (여유가 있으면 None)"""
+        if self.active >= self.max_sessions:
+            return "max_sessions"
+        # 활성 세션이 없으면 부하/지연 지표가 의미 없으므로 확인하지 않음
+        if self.active == 0:
+            return None
+        if self.inference_pool.load() >= self.max_load:
+            return "inference_load"
+        if self.inference_pool.latency() >= self.max_latency:
+            return "inference_latency"
+        return None
+
+    def accepting(self) -> bool:
+        """대기 없이 새 세션을 바로 수락할 수 있는지 여부"""
+        return not self._waiting and self.overload_reason() is None
+
+    def try_admit(self) -> Optional[str]:
+        """대기 없이 수락 시도 (수락하면 None, 아니면 과부하 이유)"""
+        reason = self.overload_reason()
+        if self._waiting:
+            return reason or "queued_sessions"
+        if reason is None:
+            self._admit()
+        return reason
+
+    def try_admit_client(self) -> Optional[str]:
+        """브라우저 추론 세션 수락 시도 (수락하면 None, 한도에 도달하면 거절 이유)"""
+        if self.client_active >= self.max_client_sessions:
+            self.rejected["max_client_sessions"] += 1
+            return "max_client_sessions"
+        self.client_active += 1
+        self.admitted += 1
+        return None
+
+    def enqueue(self, reason: str) -> int:
+        """대기열에 등록하고 대기 번호 반환 (대기열이 가득 차면 AdmissionRejected)"""
+        if len(self._waiting) >= self.queue_size:
+            self.rejected["queue_full"] += 1
+            raise AdmissionRejected(reason, self.retry_after)
+
+        ticket = next(self._tickets)
+        self._waiting.append(ticket)
+        self.queued += 1
+        return ticket
+
+    def queue_position(self, ticket: int) -> int:
+        """대기열에서의 순번 (1부터)"""
+        return self._waiting.index(ticket) + 1
+
+    async def wait_for_slot(self, ticket: int, reason: str) -> None:
+        """대기열에서 차례를 기다린 뒤 수락 (시간 초과 시 AdmissionRejected)"""
+        deadline = time.monotonic() + self.queue_timeout
+        try:
+            while True:
+                if self._waiting[0] == ticket and self.overload_reason() is None:
+                    self._waiting.popleft()
+                    self._admit()
+                    return
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.rejected["queue_timeout"] += 1
+                    raise AdmissionRejected(reason, self.retry_after)
+
+                # 세션 종료 시 바로 깨어나고, 부하 지표 변화는 주기적으로 확인
+                self._released.clear()
+                try:
+                    await asyncio.wait_for(self._released.wait(), min(remaining, config.ADMISSION_POLL_INTERVAL_S))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.leave(ticket)
+
+    def leave(self, ticket: int):
+        """수락되지 않은 채 대기열에서 빠짐 (연결 종료, 시간 초과)"""
+        if ticket in self._waiting:
+            self._waiting.remove(ticket)
+            # 뒤에서 기다리던 세션이 차례를 확인하도록 깨움
+            self._released.set()
+
+    def release(self, client_inference: bool = False):
+        """세션 종료 기록"""
+        if client_inference:
+            self.client_active = max(0, self.client_active - 1)
+            return
+        self.active = max(0, self.active - 1)
+        self._released.set()
+
+    def _admit(self):
+        self.active += 1
+        self.admitted += 1
+        # 같은 틈에 뒤의 대기 세션도 차례를 확인하도록 깨움
+        self._released.set()
+
+    def get_stats(self) -> Dict:
+        """수락/대기/거절 통계"""
+        return {
+            "accepting": self.accepting(),
+            "overload_reason": self.overload_reason(),
+            "active_sessions": self.active,
+            "waiting_sessions": len(self._waiting),
+            "max_sessions": self.max_sessions,
+            "client_sessions": self.client_active,
+            "max_client_sessions": self.max_client_sessions,
+            "inference_load": round(self.inference_pool.load(), 3),
+            "inference_latency_ms": round(self.inference_pool.latency() * 1000, 2),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": sum(self.rejected.values()),
+            "rejected_by_reason": dict(self.rejected),
+            "retry_after": self.retry_after
+        }
@@ -0,0 +1,166 @@
+"""데이터베이스 조회 처리량 벤치마크
+
+여러 스레드가 동시에 get_user_history / get_user_stats를 호출하고, 한 스레드가
+계속 훈련 세션을 기록하는 상황에서 초당 처리한 조회 수를 비교한다.
+기존 방식(호출마다 sqlite3.connect, 롤백 저널)과 연결 풀(WAL)을 각각
+별도 파일에서 측정한다.
+
+    cd backend
+    python benchmarks/bench_database.py
+"""
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+
+NUM_USERS = 200
+SESSIONS_PER_USER = 25
+READER_THREADS = 8
+DURATION_S = 5.0
+
+
+class LegacyDatabase:
+    """기존 방식: 호출마다 연결을 열고 닫음 (조회/기록 쿼리는 Database와 동일)"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def get_user_history(self, user_id: str, limit: int = 50):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute('''
+            SELECT * FROM training_sessions
+            WHERE user_id = ?
+            ORDER BY start_time DESC
+            LIMIT ?
+        ''', (user_id, limit)).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
+    def get_user_stats(self, user_id: str):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT COUNT(*) FROM training_sessions WHERE user_id = ?', (user_id,))
+        total_sessions = cursor.fetchone()[0]
+        cursor.execute('SELECT AVG(average_score) FROM training_sessions WHERE user_id = ?', (user_id,))
+        avg_score = cursor.fetchone()[0] or 0
+        cursor.execute('SELECT SUM(swing_count) FROM training_sessions WHERE user_id = ?', (user_id,))
+        total_swings = cursor.fetchone()[0] or 0
+        cursor.execute('SELECT MAX(start_time) FROM training_sessions WHERE user_id = ?', (user_id,))
+        last_training = cursor.fetchone()[0]
+        conn.close()
+        return {
+            "total_sessions": total_sessions,
+            "average_score": round(avg_score, 2),
+            "total_swings": total_swings,
+            "last_training": last_training
+        }
+
+    def update_training_session(self, session_id: str, session_data: dict):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            UPDATE training_sessions
+            SET end_time = ?, total_frames = ?, swing_count = ?, average_score = ?, session_data = ?
+            WHERE session_id = ?
+        ''', (
+            datetime.now(),
+            session_data.get("total_frames", 0),
+            session_data.get("swing_count", 0),
+            session_data.get("average_score", 0),
+            json.dumps(session_data),
+            session_id
+        ))
+        conn.commit()
+        conn.close()
+
+
+def populate(path: str) -> list:
+    """합성 사용자/세션 데이터 생성 후 세션 ID 목록 반환"""
+    Database(path).close()
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1)
+    rows = []
+    for user in range(NUM_USERS):
+        for i in range(SESSIONS_PER_USER):
+            session_data = {"summary": {"improvement_areas": ["spine"] * 20}, "swing_phases": {"setup": rng.randint(0, 500)}}
+            rows.append((
+                f"session_{user}_{i}", f"user_{user}", "intermediate", 600,
+                start + timedelta(hours=rng.randint(0, 24 * 365)), None,
+                rng.randint(100, 20000), rng.randint(0, 50), rng.uniform(40, 100), json.dumps(session_data)
+            ))
+    # 삽입 순서를 섞어 사용자별 세션이 파일 전체에 흩어지도록 함
+    rng.shuffle(rows)
+
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO training_sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    # 기존 방식 측정용 파일은 기본 롤백 저널로 되돌림
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.close()
+    return [row[0] for row in rows]
+
+
+def run(db, session_ids: list) -> float:
+    """DURATION_S 동안 조회 스레드와 기록 스레드를 실행하고 초당 조회 수 반환"""
+    stop = threading.Event()
+    counts = [0] * READER_THREADS
+    writes = [0]
+
+    def reader(index: int):
+        rng = random.Random(index)
+        while not stop.is_set():
+            user_id = f"user_{rng.randrange(NUM_USERS)}"
+            db.get_user_history(user_id)
+            db.get_user_stats(user_id)
+            counts[index] += 2
+
+    def writer():
+        rng = random.Random(-1)
+        while not stop.is_set():
+            db.update_training_session(rng.choice(session_ids), {"total_frames": 100, "swing_count": 3, "average_score": 80})
+            writes[0] += 1
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(READER_THREADS)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION_S)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    print(f"  writes: {writes[0] / DURATION_S:8.1f} /s")
+    return sum(counts) / DURATION_S
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        legacy_path = os.path.join(directory, "legacy.db")
+        pooled_path = os.path.join(directory, "pooled.db")
+        session_ids = populate(legacy_path)
+        populate(pooled_path)
+
+        print(f"{NUM_USERS * SESSIONS_PER_USER} sessions, {READER_THREADS} reader threads + 1 writer")
+        print("connect per call (rollback journal)")
+        legacy = run(LegacyDatabase(legacy_path), session_ids)
+        print(f"  reads : {legacy:8.1f} /s")
+
+        # 스레드마다 연결 하나 (연결을 기다리지 않음)
+        db = Database(pooled_path, pool_size=READER_THREADS + 1)
+        print("connection pool (WAL)")
+        pooled = run(db, session_ids)
+        print(f"  reads : {pooled:8.1f} /s ({pooled / legacy:.1f}x)")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
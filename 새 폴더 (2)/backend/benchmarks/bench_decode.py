@@ -0,0 +1,82 @@
+"""프레임 디코딩 경로 벤치마크
+
+기존 경로(전체 해상도 imdecode + cvtColor)와 축소 디코딩 + 버퍼 재사용 경로를 비교한다.
+
+    cd backend
+    python benchmarks/bench_decode.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frame_decoder import FrameDecoder
+
+RESOLUTIONS = [(1280, 720), (1920, 1080), (3840, 2160)]
+ITERATIONS = 100
+
+
+def make_jpeg(width: int, height: int) -> bytes:
+    """벤치마크용 JPEG 생성 (노이즈 대신 그라디언트로 실제 카메라 프레임과 비슷한 압축률)"""
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    frame = np.dstack([(x + y) / 2, np.broadcast_to(x, (height, width)), np.broadcast_to(y, (height, width))])
+    frame = frame.astype(np.uint8)
+    cv2.rectangle(frame, (width // 3, height // 5), (width // 2, height * 4 // 5), (40, 80, 160), -1)
+    return cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes()
+
+
+def legacy_path(payload: bytes) -> np.ndarray:
+    """기존 경로: 전체 해상도 디코딩 후 새 배열로 RGB 변환"""
+    frame = cv2.imdecode(np.frombuffer(payload, np.uint8), cv2.IMREAD_COLOR)
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+class ReducedPath:
+    """축소 디코딩 후 재사용 버퍼로 RGB 변환"""
+
+    def __init__(self):
+        self.decoder = FrameDecoder()
+        self.rgb = None
+
+    def __call__(self, payload: bytes) -> np.ndarray:
+        frame = self.decoder.decode(payload)
+        if self.rgb is None or self.rgb.shape != frame.shape:
+            self.rgb = np.empty(frame.shape, dtype=np.uint8)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.rgb)
+
+
+def measure(path, payload: bytes):
+    """프레임당 평균 시간(ms)과 할당 바이트 측정"""
+    output = path(payload)  # 예열 및 버퍼 준비
+
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        path(payload)
+    elapsed_ms = (time.perf_counter() - started) / ITERATIONS * 1000
+
+    tracemalloc.start()
+    for _ in range(ITERATIONS):
+        path(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed_ms, peak, output.shape
+
+
+def main():
+    print(f"{'resolution':>12} {'path':>8} {'ms/frame':>10} {'peak alloc':>12} {'output':>16}")
+    for width, height in RESOLUTIONS:
+        payload = make_jpeg(width, height)
+        for name, path in (("legacy", legacy_path), ("reduced", ReducedPath())):
+            elapsed_ms, peak, shape = measure(path, payload)
+            print(f"{width:>5}x{height:<6} {name:>8} {elapsed_ms:>10.2f} {peak / 1024:>10.0f}KB {str(shape):>16}")
+
+
+if __name__ == "__main__":
+    main()
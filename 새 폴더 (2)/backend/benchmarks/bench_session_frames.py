@@ -0,0 +1,100 @@
+"""세션 프레임 저장 방식 벤치마크
+
+프레임마다 중첩 딕셔너리를 보관하던 기존 방식, 열 단위 저장(FrameColumns),
+프레임 로그 + 최근 프레임 창의 메모리 사용량 및 세션 요약 시간을 비교한다.
+30분 x 30fps (54,000 프레임) 기준.
+
+    cd backend
+    python benchmarks/bench_session_frames.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from ai_coach import AICoach
+from landmark_batch import ANGLE_NAMES, POSE_LANDMARKS
+from training_session import TrainingSession
+
+NUM_FRAMES = 30 * 60 * 30
+PHASES = ("setup", "backswing", "downswing", "impact")
+
+
+def make_pose_data(rng: random.Random) -> dict:
+    """분석기 출력과 같은 구조의 자세 데이터 (프레임마다 새 객체)"""
+    return {
+        "detected": True,
+        "landmarks": {name: (rng.random(), rng.random(), rng.random()) for name in POSE_LANDMARKS},
+        "angles": {name: rng.uniform(60, 180) for name in ANGLE_NAMES},
+        "swing_phase": rng.choice(PHASES),
+        "posture_score": {"score": rng.randint(50, 100), "issues": [], "grade": "Good"},
+        "model_complexity": 1,
+        "timestamp": None
+    }
+
+
+class LegacySession:
+    """기존 저장 방식: 프레임 기록 딕셔너리 + 피드백 이력"""
+
+    def __init__(self):
+        self.frames = []
+        self.feedback_history = []
+
+    def add_frame(self, pose_data: dict, feedback: dict, timestamp: float):
+        self.frames.append({
+            "timestamp": timestamp,
+            "pose_data": pose_data,
+            "feedback": feedback,
+            "datetime": datetime.now().isoformat()
+        })
+        self.feedback_history.append(feedback)
+
+
+def fill(session, coach: AICoach) -> int:
+    """세션에 프레임을 채우고 유지 중인 메모리(바이트) 반환"""
+    rng = random.Random(0)
+    tracemalloc.start()
+    for i in range(NUM_FRAMES):
+        pose_data = make_pose_data(rng)
+        feedback = coach.generate_feedback(pose_data, timestamp=i / 30)
+        session.add_frame(pose_data, feedback, i / 30)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current
+
+
+def main():
+    coach = AICoach()
+
+    legacy_bytes = fill(LegacySession(), coach)
+    print(f"legacy dict records : {legacy_bytes / 1024 / 1024:8.1f} MB")
+
+    session = TrainingSession(max_frames=0, frame_log=False)
+    columnar_bytes = fill(session, coach)
+    print(f"columnar storage    : {columnar_bytes / 1024 / 1024:8.1f} MB")
+
+    started = time.perf_counter()
+    session.get_session_data(include_frames=False)
+    print(f"get_session_data    : {(time.perf_counter() - started) * 1000:8.1f} ms ({NUM_FRAMES} frames)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        config.FRAME_LOG_DIR = directory
+        logged = TrainingSession(frame_log=True)
+        logged_bytes = fill(logged, coach)
+        print(f"frame log + window  : {logged_bytes / 1024 / 1024:8.1f} MB "
+              f"(window {len(logged.frames)} frames, log {logged.frame_log.size / 1024 / 1024:.1f} MB on disk)")
+
+        started = time.perf_counter()
+        count = sum(1 for _ in logged.iter_frame_records())
+        print(f"stream frame log    : {(time.perf_counter() - started) * 1000:8.1f} ms ({count} frames)")
+        logged.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""사용자 이력/통계 조회 벤치마크
+
+세션 기록이 수백만 건인 합성 데이터베이스에서 기존 조회(인덱스 없음,
+통계는 COUNT/AVG/SUM/MAX 네 번의 전체 스캔)와 (user_id, start_time)
+인덱스 + user_stats 집계 테이블 조회의 지연 시간을 비교한다.
+
+    cd backend
+    python benchmarks/bench_user_stats.py [세션 수]
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+
+NUM_SESSIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+SESSIONS_PER_USER = 100
+SAMPLE_USERS = 10
+BATCH_ROWS = 100_000
+
+
+def populate(path: str):
+    """기존 스키마(인덱스 없음)로 합성 세션 기록 생성"""
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE training_sessions (
+            session_id TEXT PRIMARY KEY,
+            user_id TEXT,
+            mode TEXT,
+            duration INTEGER,
+            start_time TIMESTAMP,
+            end_time TIMESTAMP,
+            total_frames INTEGER,
+            swing_count INTEGER,
+            average_score REAL,
+            session_data TEXT
+        )
+    ''')
+    rng = random.Random(0)
+    num_users = NUM_SESSIONS // SESSIONS_PER_USER
+    start = datetime(2022, 1, 1)
+
+    def rows():
+        for i in range(NUM_SESSIONS):
+            started = start + timedelta(seconds=rng.randrange(3 * 365 * 24 * 3600))
+            yield (
+                f"session_{i}", f"user_{rng.randrange(num_users)}", "intermediate", 600,
+                str(started), str(started + timedelta(minutes=10)),
+                rng.randint(100, 20000), rng.randint(0, 50), rng.uniform(40, 100), "{}"
+            )
+
+    batch = []
+    for row in rows():
+        batch.append(row)
+        if len(batch) >= BATCH_ROWS:
+            conn.executemany("INSERT INTO training_sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+            batch.clear()
+    if batch:
+        conn.executemany("INSERT INTO training_sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+    conn.commit()
+    conn.close()
+
+
+def legacy_history(conn: sqlite3.Connection, user_id: str):
+    return conn.execute('''
+        SELECT * FROM training_sessions
+        WHERE user_id = ?
+        ORDER BY start_time DESC
+        LIMIT 50
+    ''', (user_id,)).fetchall()
+
+
+def legacy_stats(conn: sqlite3.Connection, user_id: str) -> dict:
+    total_sessions = conn.execute('SELECT COUNT(*) FROM training_sessions WHERE user_id = ?', (user_id,)).fetchone()[0]
+    avg_score = conn.execute('SELECT AVG(average_score) FROM training_sessions WHERE user_id = ?', (user_id,)).fetchone()[0] or 0
+    total_swings = conn.execute('SELECT SUM(swing_count) FROM training_sessions WHERE user_id = ?', (user_id,)).fetchone()[0] or 0
+    last_training = conn.execute('SELECT MAX(start_time) FROM training_sessions WHERE user_id = ?', (user_id,)).fetchone()[0]
+    return {
+        "total_sessions": total_sessions,
+        "average_score": round(avg_score, 2),
+        "total_swings": total_swings,
+        "last_training": last_training
+    }
+
+
+def timed(func, users: list) -> tuple:
+    """사용자별 호출 평균 지연 시간(ms)과 결과 목록"""
+    results = []
+    started = time.perf_counter()
+    for user_id in users:
+        results.append(func(user_id))
+    return (time.perf_counter() - started) * 1000 / len(users), results
+
+
+def main():
+    users = [f"user_{i * 7919 % (NUM_SESSIONS // SESSIONS_PER_USER)}" for i in range(SAMPLE_USERS)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        started = time.perf_counter()
+        populate(path)
+        print(f"populate            : {time.perf_counter() - started:8.1f} s ({NUM_SESSIONS} sessions)")
+
+        conn = sqlite3.connect(path)
+        legacy_history_ms, legacy_histories = timed(lambda user_id: legacy_history(conn, user_id), users)
+        legacy_stats_ms, legacy_results = timed(lambda user_id: legacy_stats(conn, user_id), users)
+        conn.close()
+
+        # 인덱스 생성 및 user_stats 초기 집계 (기존 데이터베이스 첫 실행 시 한 번)
+        started = time.perf_counter()
+        db = Database(path)
+        print(f"index + rollup build: {time.perf_counter() - started:8.1f} s")
+
+        history_ms, histories = timed(db.get_user_history, users)
+        stats_ms, results = timed(db.get_user_stats, users)
+        db.close()
+
+    for legacy, new in zip(legacy_results, results):
+        assert legacy["total_sessions"] == new["total_sessions"] and legacy["total_swings"] == new["total_swings"]
+        assert legacy["last_training"] == new["last_training"] and abs(legacy["average_score"] - new["average_score"]) < 0.01
+    assert [[row[0] for row in rows] for rows in legacy_histories] == [[row["session_id"] for row in rows] for rows in histories]
+
+    print(f"get_user_history    : {legacy_history_ms:8.2f} ms -> {history_ms:6.2f} ms ({legacy_history_ms / history_ms:.0f}x)")
+    print(f"get_user_stats      : {legacy_stats_ms:8.2f} ms -> {stats_ms:6.2f} ms ({legacy_stats_ms / stats_ms:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
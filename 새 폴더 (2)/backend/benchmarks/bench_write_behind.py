@@ -0,0 +1,79 @@
+"""데이터베이스 기록 처리량 벤치마크
+
+여러 스레드가 포인트/레벨 갱신과 훈련 세션 종료 기록을 계속 호출할 때,
+변경마다 커밋하는 방식과 쓰기 지연 큐로 모아 커밋하는 방식의 초당 기록
+수를 비교한다. 마지막에 두 데이터베이스의 포인트 합계가 같은지 확인한다.
+
+    cd backend
+    python benchmarks/bench_write_behind.py
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+
+NUM_USERS = 100
+WRITER_THREADS = 4
+WRITES_PER_THREAD = 2000
+
+
+def populate(db: Database) -> list:
+    """사용자와 사용자별 세션 하나를 만들고 세션 ID 목록 반환"""
+    session_ids = []
+    for user in range(NUM_USERS):
+        db.create_user(f"user_{user}", f"user {user}")
+        session_ids.append(db.create_training_session(f"user_{user}", "intermediate", 600))
+    db.flush()
+    return session_ids
+
+
+def run(db: Database, session_ids: list) -> float:
+    """WRITER_THREADS개 스레드로 기록을 호출하고 (모두 커밋될 때까지) 초당 기록 수 반환"""
+    def writer(index: int):
+        rng = random.Random(index)
+        for i in range(WRITES_PER_THREAD):
+            user = rng.randrange(NUM_USERS)
+            if i % 10 == 0:
+                db.update_training_session(session_ids[user], {"total_frames": 100, "swing_count": 3, "average_score": 80})
+            else:
+                db.update_user_points(f"user_{user}", 1)
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(WRITER_THREADS)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    db.flush()
+    return WRITER_THREADS * WRITES_PER_THREAD / (time.perf_counter() - started)
+
+
+def total_points(db: Database) -> int:
+    return sum(db.get_user(f"user_{user}")["points"] for user in range(NUM_USERS))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        immediate = Database(os.path.join(directory, "immediate.db"), write_behind=False)
+        batched = Database(os.path.join(directory, "batched.db"), write_behind=True)
+
+        print(f"{WRITER_THREADS} writer threads x {WRITES_PER_THREAD} writes")
+        immediate_rate = run(immediate, populate(immediate))
+        print(f"commit per write : {immediate_rate:8.1f} writes/s")
+        batched_rate = run(batched, populate(batched))
+        print(f"write-behind     : {batched_rate:8.1f} writes/s ({batched_rate / immediate_rate:.1f}x)")
+        print(f"  {batched.writes.get_stats()}")
+
+        assert total_points(immediate) == total_points(batched)
+        immediate.close()
+        batched.close()
+
+
+if __name__ == "__main__":
+    main()
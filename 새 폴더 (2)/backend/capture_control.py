@@ -0,0 +1,117 @@
+from typing import Dict, Optional, Tuple
+import time
+
+import config
+
+# 클라이언트 캡처 단계 (fps, 최대 너비, JPEG 품질) - 앞쪽일수록 부하가 큼
+# 1280px은 서버에서 1/2 축소 디코딩되므로 640px과 추론 입력 크기가 같다.
+CAPTURE_LEVELS: Tuple[Tuple[int, int, float], ...] = (
+    (15, 1280, 0.8),
+    (10, 1280, 0.8),
+    (10, 960, 0.7),
+    (8, 640, 0.7),
+    (5, 640, 0.6),
+    (3, 480, 0.5),
+)
+# 기존 클라이언트 기본값 (약 10fps, 원본 해상도, 품질 0.8)
+DEFAULT_CAPTURE_LEVEL = 1
+
+
+class CaptureController:
+    """서버 부하에 따른 클라이언트 캡처 설정 조절기
+
+    세션별 프레임 처리 지연 시간, 폐기된 프레임 비율, 추론 풀 사용률을
+    주기적으로 평가해 캡처 단계를 조절한다. 부하가 높으면 바로 한 단계
+    낮추고, 여유 있는 구간이 연속으로 이어질 때만 한 단계 올린다.
+    """
+
+    def __init__(self, latency_target_ms: Optional[float] = None, interval: Optional[float] = None,
+                 initial_level: int = DEFAULT_CAPTURE_LEVEL, recover_windows: int = 3):
+        self.latency_target = (latency_target_ms or config.CAPTURE_LATENCY_TARGET_MS) / 1000
+        self.interval = interval or config.CAPTURE_CONTROL_INTERVAL_S
+        self.level = initial_level
+        self.recover_windows = recover_windows
+
+        self._window_started = time.monotonic()
+        self._latency_sum = 0.0
+        self._latency_count = 0
+        self._last_received = 0
+        self._last_dropped = 0
+        self._healthy_windows = 0
+        self.changes = 0
+
+    def record(self, latency: float):
+        """프레임 처리 지연 시간 기록 (수신부터 추론 완료까지, 초)"""
+        self._latency_sum += latency
+        self._latency_count += 1
+
+    def control_message(self, reason: str = "initial") -> Dict:
+        """현재 캡처 단계의 control 메시지"""
+        fps, max_width, jpeg_quality = CAPTURE_LEVELS[self.level]
+        return {
+            "type": "control",
+            "fps": fps,
+            "max_width": max_width,
+            "jpeg_quality": jpeg_quality,
+            "level": self.level,
+            "reason": reason
+        }
+
+    def update(self, frame_stats: Dict, node_load: float) -> Optional[Dict]:
+        """평가 주기가 지났으면 캡처 단계를 조절하고, 바뀐 경우 control 메시지 반환"""
+        now = time.monotonic()
+        if now - self._window_started < self.interval:
+            return None
+
+        received = frame_stats["received"] - self._last_received
+        dropped = frame_stats["dropped"] - self._last_dropped
+        drop_ratio = dropped / received if received else 0.0
+        latency = self._latency_sum / self._latency_count if self._latency_count else 0.0
+
+        self._window_started = now
+        self._latency_sum = 0.0
+        self._latency_count = 0
+        self._last_received = frame_stats["received"]
+        self._last_dropped = frame_stats["dropped"]
+
+        if node_load >= config.CAPTURE_NODE_LOAD_HIGH:
+            reason = "node_load"
+        elif drop_ratio >= config.CAPTURE_DROP_RATIO_HIGH:
+            reason = "dropped_frames"
+        elif latency > self.latency_target:
+            reason = "latency"
+        else:
+            reason = None
+
+        if reason is not None:
+            self._healthy_windows = 0
+            if self.level < len(CAPTURE_LEVELS) - 1:
+                return self._set_level(self.level + 1, reason)
+            return None
+
+        # 지연 시간과 노드 부하 모두 여유가 있어야 회복 구간으로 인정
+        if received and latency <= self.latency_target / 2 and node_load <= config.CAPTURE_NODE_LOAD_LOW:
+            self._healthy_windows += 1
+        else:
+            self._healthy_windows = 0
+
+        if self._healthy_windows >= self.recover_windows and self.level > 0:
+            self._healthy_windows = 0
+            return self._set_level(self.level - 1, "recovered")
+        return None
+
+    def _set_level(self, level: int, reason: str) -> Dict:
+        self.level = level
+        self.changes += 1
+        return self.control_message(reason)
+
+    def get_stats(self) -> Dict:
+        """현재 캡처 단계 및 변경 횟수"""
+        fps, max_width, jpeg_quality = CAPTURE_LEVELS[self.level]
+        return {
+            "level": self.level,
+            "fps": fps,
+            "max_width": max_width,
+            "jpeg_quality": jpeg_quality,
+            "changes": self.changes
+        }
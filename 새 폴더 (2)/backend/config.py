@@ -0,0 +1,170 @@
+from typing import Dict
+import os
+
+# 런타임 설정 (환경 변수로 재정의 가능)
+
+
+def _env_int(name: str, default: int) -> int:
+    """정수형 환경 변수 읽기"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return int(value)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """불리언 환경 변수 읽기"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_mapping(name: str, default: str) -> Dict[str, int]:
+    """'key=value,key=value' 형식 환경 변수 읽기"""
+    value = os.getenv(name, default)
+    mapping = {}
+    for item in value.split(","):
+        if "=" in item:
+            key, raw = item.split("=", 1)
+            mapping[key.strip()] = int(raw)
+    return mapping
+
+
+def _env_float(name: str, default: float) -> float:
+    """실수형 환경 변수 읽기"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return float(value)
+
+
+# python main.py로 실행할 때의 uvicorn 워커 프로세스 수
+SERVER_WORKERS = _env_int("GOLFLINK_SERVER_WORKERS", 1)
+
+# 추론 워커 풀
+# 서버 워커 프로세스마다 띄우는 추론 워커 프로세스 수
+# (기본값: CPU 코어 수 - 1을 서버 워커 수로 나눈 값, 최소 1)
+INFERENCE_WORKERS = _env_int("GOLFLINK_INFERENCE_WORKERS", max(1, ((os.cpu_count() or 2) - 1) // max(1, SERVER_WORKERS)))
+# 워커당 처리 대기 중인 최대 프레임 수
+INFERENCE_QUEUE_DEPTH = _env_int("GOLFLINK_INFERENCE_QUEUE_DEPTH", 4)
+# JPEG 축소 디코딩 후에도 유지할 최소 긴 변 길이 (픽셀)
+DECODE_TARGET_SIZE = _env_int("GOLFLINK_DECODE_TARGET_SIZE", 640)
+# 워커 프로세스 비정상 종료 확인 주기 (초, 종료된 워커는 다시 시작)
+INFERENCE_WORKER_CHECK_INTERVAL_S = _env_float("GOLFLINK_INFERENCE_WORKER_CHECK_INTERVAL_S", 1.0)
+
+# 자세 추정 모델 복잡도 (0: lite, 1: full, 2: heavy)
+MODEL_COMPLEXITY = _env_int("GOLFLINK_MODEL_COMPLEXITY", 2)
+# 프레임 추론 지연 시간에 따라 복잡도 단계를 자동 조절
+ADAPTIVE_MODEL_COMPLEXITY = _env_bool("GOLFLINK_ADAPTIVE_MODEL_COMPLEXITY", True)
+# 프레임당 목표 추론 시간 (ms)
+MODEL_LATENCY_TARGET_MS = _env_float("GOLFLINK_MODEL_LATENCY_TARGET_MS", 33.0)
+# 훈련 모드별 고정 복잡도 (예: "beginner=0,professional=2")
+MODEL_COMPLEXITY_PINS = _env_mapping("GOLFLINK_MODEL_COMPLEXITY_PINS", "")
+
+# 이전 프레임 랜드마크 주변만 잘라 추론
+ROI_CROPPING = _env_bool("GOLFLINK_ROI_CROPPING", True)
+# 랜드마크 경계 상자 대비 여유 비율
+ROI_PADDING = _env_float("GOLFLINK_ROI_PADDING", 0.25)
+# 잘라낸 영역의 최대 변 길이 (픽셀, 이보다 크면 축소)
+ROI_INPUT_SIZE = _env_int("GOLFLINK_ROI_INPUT_SIZE", 384)
+# 경계 상자 계산에 사용할 랜드마크 최소 가시성 및 개수
+ROI_MIN_VISIBILITY = _env_float("GOLFLINK_ROI_MIN_VISIBILITY", 0.5)
+ROI_MIN_LANDMARKS = _env_int("GOLFLINK_ROI_MIN_LANDMARKS", 8)
+
+# 움직임이 없는 프레임은 추론을 건너뛰고 이전 결과 재사용
+MOTION_GATING = _env_bool("GOLFLINK_MOTION_GATING", True)
+# 움직임 감지용 썸네일 너비 (픽셀)
+MOTION_THUMBNAIL_WIDTH = _env_int("GOLFLINK_MOTION_THUMBNAIL_WIDTH", 96)
+# 변화로 볼 픽셀 밝기 차이 및 변화 픽셀 비율
+MOTION_PIXEL_THRESHOLD = _env_int("GOLFLINK_MOTION_PIXEL_THRESHOLD", 20)
+MOTION_MIN_CHANGED_RATIO = _env_float("GOLFLINK_MOTION_MIN_CHANGED_RATIO", 0.01)
+# 연속으로 건너뛸 수 있는 최대 프레임 수
+MOTION_MAX_SKIPPED_FRAMES = _env_int("GOLFLINK_MOTION_MAX_SKIPPED_FRAMES", 30)
+
+# 실시간 분석 WebSocket
+# 이보다 오래된 프레임(timestamp 기준)은 분석하지 않고 버림
+FRAME_MAX_AGE_MS = _env_float("GOLFLINK_FRAME_MAX_AGE_MS", 500.0)
+# 연결별로 동시에 추론 중일 수 있는 프레임 수
+PIPELINE_INFLIGHT_FRAMES = _env_int("GOLFLINK_PIPELINE_INFLIGHT_FRAMES", 2)
+# 연결별 전송 대기 메시지 수
+PIPELINE_SEND_QUEUE = _env_int("GOLFLINK_PIPELINE_SEND_QUEUE", 4)
+# WebSocket permessage-deflate 압축 (python main.py로 실행할 때 적용)
+WS_PER_MESSAGE_DEFLATE = _env_bool("GOLFLINK_WS_PER_MESSAGE_DEFLATE", True)
+# 서버 부하에 따라 클라이언트에 캡처 fps/해상도/JPEG 품질을 지시하는 control 메시지 전송
+CAPTURE_CONTROL = _env_bool("GOLFLINK_CAPTURE_CONTROL", True)
+# 캡처 설정 평가 주기 (초)
+CAPTURE_CONTROL_INTERVAL_S = _env_float("GOLFLINK_CAPTURE_CONTROL_INTERVAL_S", 1.0)
+# 프레임 수신부터 추론 완료까지 목표 지연 시간 (ms)
+CAPTURE_LATENCY_TARGET_MS = _env_float("GOLFLINK_CAPTURE_LATENCY_TARGET_MS", 150.0)
+# 이 비율 이상 프레임을 버리면 캡처 단계를 낮춤
+CAPTURE_DROP_RATIO_HIGH = _env_float("GOLFLINK_CAPTURE_DROP_RATIO_HIGH", 0.3)
+# 추론 풀 사용률 기준 (이상이면 낮추고, 이하일 때만 다시 올림)
+CAPTURE_NODE_LOAD_HIGH = _env_float("GOLFLINK_CAPTURE_NODE_LOAD_HIGH", 0.75)
+CAPTURE_NODE_LOAD_LOW = _env_float("GOLFLINK_CAPTURE_NODE_LOAD_LOW", 0.4)
+
+# 실시간 분석 세션 수락 제어
+# 한도와 준비 상태는 서버 워커 프로세스마다 따로 적용되므로, 수를 세는 한도의 기본값은
+# 노드 전체 한도를 서버 워커 수로 나눈 값 (노드 전체 한도 = 설정값 x SERVER_WORKERS)
+# 프로세스가 동시에 받는 최대 세션 수 (INFERENCE_WORKERS가 이미 프로세스별 값)
+ADMISSION_MAX_SESSIONS = _env_int("GOLFLINK_ADMISSION_MAX_SESSIONS", INFERENCE_WORKERS * 4)
+# 추론 풀 사용률이 이 값 이상이면 새 세션을 받지 않음
+ADMISSION_MAX_LOAD = _env_float("GOLFLINK_ADMISSION_MAX_LOAD", 0.8)
+# 최근 프레임 추론 왕복 지연 시간이 이 값 이상이면 새 세션을 받지 않음 (ms)
+ADMISSION_MAX_LATENCY_MS = _env_float("GOLFLINK_ADMISSION_MAX_LATENCY_MS", 120.0)
+# 프로세스마다 수락을 기다릴 수 있는 세션 수 (0이면 바로 거절)
+ADMISSION_QUEUE_SIZE = _env_int("GOLFLINK_ADMISSION_QUEUE_SIZE", max(1, 8 // max(1, SERVER_WORKERS)))
+# 프로세스마다 브라우저에서 자세를 추정하는 세션(?inference=client)의 최대 수 (추론 풀을 쓰지 않으므로 별도 한도, 대기 없이 수락/거절)
+ADMISSION_MAX_CLIENT_SESSIONS = _env_int("GOLFLINK_ADMISSION_MAX_CLIENT_SESSIONS", max(1, 256 // max(1, SERVER_WORKERS)))
+# 대기열에서 기다리는 최대 시간 (초)
+ADMISSION_QUEUE_TIMEOUT_S = _env_float("GOLFLINK_ADMISSION_QUEUE_TIMEOUT_S", 15.0)
+# 대기 중 부하 지표 확인 주기 (초)
+ADMISSION_POLL_INTERVAL_S = _env_float("GOLFLINK_ADMISSION_POLL_INTERVAL_S", 0.5)
+# 거절 시 클라이언트에 알려주는 재시도 대기 시간 (초)
+ADMISSION_RETRY_AFTER_S = _env_int("GOLFLINK_ADMISSION_RETRY_AFTER_S", 5)
+
+# 실시간 분석 세션 상태 저장소 (memory: 단일 워커, sqlite: 같은 호스트의 여러 워커 프로세스가 파일 공유)
+# SQLite WAL은 네트워크 파일 시스템에서 안전하지 않으므로 여러 호스트 간 공유에는 사용할 수 없음
+SESSION_STORE = os.getenv("GOLFLINK_SESSION_STORE", "sqlite")
+SESSION_STORE_PATH = os.getenv("GOLFLINK_SESSION_STORE_PATH", "session_state.db")
+# 이 수만큼 프레임이 쌓일 때마다 저장소에 기록 (연결 종료 시에는 항상 기록)
+SESSION_CHECKPOINT_FRAMES = _env_int("GOLFLINK_SESSION_CHECKPOINT_FRAMES", 30)
+# 끊긴 세션을 다시 이어갈 수 있는 시간 (초, 지나면 훈련 기록으로 저장)
+SESSION_RESUME_TTL_S = _env_float("GOLFLINK_SESSION_RESUME_TTL_S", 600.0)
+# 만료된 세션 확인 주기 (초)
+SESSION_EXPIRE_INTERVAL_S = _env_float("GOLFLINK_SESSION_EXPIRE_INTERVAL_S", 60.0)
+# 세션별로 보존하는 최근 프레임 수 (0이면 전체 보존)
+SESSION_MAX_FRAMES = _env_int("GOLFLINK_SESSION_MAX_FRAMES", 0)
+# 세션 진행 중 현재까지의 요약(summary 메시지) 전송 주기 (초, 0이면 보내지 않음)
+LIVE_SUMMARY_INTERVAL_S = _env_float("GOLFLINK_LIVE_SUMMARY_INTERVAL_S", 5.0)
+# 세션 프레임을 로컬 디스크의 추가 전용 로그에 기록하고 메모리에는 최근 프레임만 유지
+FRAME_LOG = _env_bool("GOLFLINK_FRAME_LOG", True)
+FRAME_LOG_DIR = os.getenv("GOLFLINK_FRAME_LOG_DIR", "frame_logs")
+# 프레임 로그 fsync 주기 (초)
+FRAME_LOG_FSYNC_INTERVAL_S = _env_float("GOLFLINK_FRAME_LOG_FSYNC_INTERVAL_S", 1.0)
+# 프레임 로그 사용 시 메모리에 남기는 최근 프레임 수 (SESSION_MAX_FRAMES가 0일 때)
+FRAME_LOG_WINDOW_FRAMES = _env_int("GOLFLINK_FRAME_LOG_WINDOW_FRAMES", 300)
+
+# 사용자/훈련 기록 데이터베이스 (SQLite)
+DB_PATH = os.getenv("GOLFLINK_DB_PATH", "golflink.db")
+# 재사용하는 연결 수 (동시에 실행할 수 있는 쿼리 수)
+DB_POOL_SIZE = _env_int("GOLFLINK_DB_POOL_SIZE", 8)
+# 쓰기 잠금을 기다리는 최대 시간 (초)
+DB_BUSY_TIMEOUT_S = _env_float("GOLFLINK_DB_BUSY_TIMEOUT_S", 10.0)
+# 연결별 페이지 캐시 크기 (KB) 및 메모리 매핑 크기 (MB)
+DB_CACHE_SIZE_KB = _env_int("GOLFLINK_DB_CACHE_SIZE_KB", 8192)
+DB_MMAP_SIZE_MB = _env_int("GOLFLINK_DB_MMAP_SIZE_MB", 64)
+# 변경(세션 결과, 성취도, 포인트, 레벨)을 모아 한 트랜잭션으로 기록
+DB_WRITE_BEHIND = _env_bool("GOLFLINK_DB_WRITE_BEHIND", True)
+# 이 수만큼 쌓이거나 이 시간(초)이 지나면 기록
+DB_WRITE_BATCH_SIZE = _env_int("GOLFLINK_DB_WRITE_BATCH_SIZE", 200)
+DB_WRITE_INTERVAL_S = _env_float("GOLFLINK_DB_WRITE_INTERVAL_S", 0.2)
+# 훈련 이력 API 페이지 크기 (기본값 / 최댓값)
+HISTORY_PAGE_SIZE = _env_int("GOLFLINK_HISTORY_PAGE_SIZE", 50)
+HISTORY_MAX_PAGE_SIZE = _env_int("GOLFLINK_HISTORY_MAX_PAGE_SIZE", 200)
+
+# 업로드 영상 오프라인 분석
+# 영상 분석 워커 프로세스 수 (실시간 추론 풀과 별도)
+VIDEO_ANALYSIS_WORKERS = _env_int("GOLFLINK_VIDEO_ANALYSIS_WORKERS", 2)
+# 워커 하나가 처리하는 프레임 구간 길이
+VIDEO_CHUNK_FRAMES = _env_int("GOLFLINK_VIDEO_CHUNK_FRAMES", 240)
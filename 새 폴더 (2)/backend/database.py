@@ -1,263 +1,665 @@
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import asyncio
+import base64
+import functools
+import itertools
 import sqlite3
 import json
 import os
+import zlib
+
+try:
+    import msgpack
+except ImportError:  # msgpack 미설치 시 세션 데이터를 JSON으로 저장
+    msgpack = None
+
+import config
+from db_pool import ConnectionPool
+from frame_log import FrameLog, read_records
+from landmark_batch import ANGLE_NAMES
+from write_behind import WriteBehindQueue, WriteOp
+
+# 프레임 로그를 나누어 압축하는 조각 크기
+_FRAME_CHUNK_BYTES = 256 * 1024
+_COMPRESS_LEVEL = 6
+
+# 이력/세션 조회에서 읽는 요약 열 (세션 데이터와 프레임은 별도 테이블)
+_SESSION_COLUMNS = (
+    "session_id", "user_id", "mode", "duration", "start_time", "end_time",
+    "total_frames", "swing_count", "average_score"
+)
+
+# 프레임별 지표 테이블의 각도 열 (PoseAnalyzer._calculate_angles 출력과 같은 이름)
+_METRIC_COLUMNS = ("session_id", "frame_index", "user_id", "recorded_at", "timestamp", "swing_phase", "score") + ANGLE_NAMES
 
 class Database:
     """데이터베이스 관리"""
     
-    def __init__(self, db_path: str = "golflink.db"):
-        self.db_path = db_path
+    def __init__(self, db_path: Optional[str] = None, pool_size: Optional[int] = None,
+                 write_behind: Optional[bool] = None):
+        self.db_path = db_path or config.DB_PATH
+        # 요청마다 연결을 여는 대신 설정을 마친 연결을 재사용
+        self.pool = ConnectionPool(self.db_path, pool_size)
         self._init_database()
+        # 변경은 모아서 일괄 기록 (같은 사용자/세션 조회 전에는 먼저 기록)
+        use_write_behind = config.DB_WRITE_BEHIND if write_behind is None else write_behind
+        self.writes: Optional[WriteBehindQueue] = WriteBehindQueue(self.pool) if use_write_behind else None
     
     def _init_database(self):
         """데이터베이스 초기화"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # 사용자 테이블
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                user_id TEXT PRIMARY KEY,
-                username TEXT,
-                email TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                level INTEGER DEFAULT 1,
-                points INTEGER DEFAULT 0,
-                consecutive_days INTEGER DEFAULT 0,
-                last_training_date DATE
-            )
-        ''')
-        
-        # 훈련 세션 테이블
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS training_sessions (
-                session_id TEXT PRIMARY KEY,
-                user_id TEXT,
-                mode TEXT,
-                duration INTEGER,
-                start_time TIMESTAMP,
-                end_time TIMESTAMP,
-                total_frames INTEGER,
-                swing_count INTEGER,
-                average_score REAL,
-                session_data TEXT,
-                FOREIGN KEY (user_id) REFERENCES users (user_id)
-            )
-        ''')
-        
-        # 성취도 테이블
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS achievements (
-                achievement_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT,
-                achievement_type TEXT,
-                achievement_name TEXT,
-                achieved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (user_id)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            
+            # 사용자 테이블
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS users (
+                    user_id TEXT PRIMARY KEY,
+                    username TEXT,
+                    email TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    level INTEGER DEFAULT 1,
+                    points INTEGER DEFAULT 0,
+                    consecutive_days INTEGER DEFAULT 0,
+                    last_training_date DATE
+                )
+            ''')
+            
+            # 훈련 세션 테이블
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS training_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    user_id TEXT,
+                    mode TEXT,
+                    duration INTEGER,
+                    start_time TIMESTAMP,
+                    end_time TIMESTAMP,
+                    total_frames INTEGER,
+                    swing_count INTEGER,
+                    average_score REAL,
+                    session_data TEXT,
+                    FOREIGN KEY (user_id) REFERENCES users (user_id)
+                )
+            ''')
+            
+            # 사용자별 이력 조회 (user_id로 찾고 (start_time, session_id) 역순 정렬, 커서 페이지 탐색)
+            # 정렬과 범위 탐색만 인덱스로 처리하며, 그 밖의 열은 행마다 테이블에서 읽음
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_training_sessions_user_start
+                ON training_sessions (user_id, start_time DESC, session_id DESC)
+            ''')
+            
+            # 사용자별 통계 집계 (세션 생성/갱신과 같은 트랜잭션에서 갱신)
+            has_user_stats = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'user_stats'"
+            ).fetchone()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS user_stats (
+                    user_id TEXT PRIMARY KEY,
+                    total_sessions INTEGER DEFAULT 0,
+                    score_sum REAL DEFAULT 0,
+                    total_swings INTEGER DEFAULT 0,
+                    last_training TIMESTAMP
+                )
+            ''')
+            if not has_user_stats:
+                # 기존 데이터베이스는 세션 기록으로 한 번 채움
+                cursor.execute('''
+                    INSERT INTO user_stats (user_id, total_sessions, score_sum, total_swings, last_training)
+                    SELECT user_id, COUNT(*), COALESCE(SUM(average_score), 0), COALESCE(SUM(swing_count), 0), MAX(start_time)
+                    FROM training_sessions
+                    GROUP BY user_id
+                ''')
+            
+            # 훈련 세션 상세 데이터 (요약/통계 JSON 구조를 압축한 BLOB, 세션 조회 시에만 읽음)
+            # training_sessions.session_data는 이전 버전에서 기록한 세션에만 남아 있음
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS training_session_data (
+                    session_id TEXT PRIMARY KEY,
+                    encoding TEXT,
+                    data BLOB,
+                    FOREIGN KEY (session_id) REFERENCES training_sessions (session_id)
+                )
+            ''')
+            
+            # 훈련 세션 프레임 로그 (프레임 로그 파일을 조각마다 압축한 BLOB)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS training_session_frame_chunks (
+                    session_id TEXT,
+                    chunk_index INTEGER,
+                    data BLOB,
+                    PRIMARY KEY (session_id, chunk_index),
+                    FOREIGN KEY (session_id) REFERENCES training_sessions (session_id)
+                )
+            ''')
+            
+            # 프레임별 지표 (세션 간 각도 추이 분석용, 각도마다 열 하나)
+            angle_columns = "".join(f"{name} REAL,\n" for name in ANGLE_NAMES)
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS training_frame_metrics (
+                    session_id TEXT,
+                    frame_index INTEGER,
+                    user_id TEXT,
+                    recorded_at TIMESTAMP,
+                    timestamp REAL,
+                    swing_phase TEXT,
+                    score REAL,
+                    {angle_columns}
+                    PRIMARY KEY (session_id, frame_index)
+                ) WITHOUT ROWID
+            ''')
+            # 사용자별 스윙 단계 + 기간 조회
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_training_frame_metrics_user_phase
+                ON training_frame_metrics (user_id, swing_phase, recorded_at)
+            ''')
+            
+            # 성취도 테이블
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS achievements (
+                    achievement_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT,
+                    achievement_type TEXT,
+                    achievement_name TEXT,
+                    achieved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES users (user_id)
+                )
+            ''')
+            
+            conn.commit()
+    
+    def close(self):
+        """남은 변경을 기록하고 연결 풀 닫기"""
+        if self.writes is not None:
+            self.writes.close()
+        self.pool.close()
+    
+    def flush(self):
+        """쓰기 지연 큐에 쌓인 변경을 모두 기록"""
+        if self.writes is not None:
+            self.writes.flush()
+    
+    def _write(self, keys: Tuple[str, ...], op: WriteOp):
+        """변경 기록 (쓰기 지연 큐를 쓰면 큐에 넣고 바로 반환)"""
+        if self.writes is not None:
+            self.writes.submit(keys, op)
+            return
+        with self.pool.connection() as conn:
+            op(conn)
+            conn.commit()
+    
+    def _read_your_writes(self, key: str):
+        """key에 대한 변경이 큐에 남아 있으면 먼저 기록 (자신이 쓴 값을 바로 읽도록)"""
+        if self.writes is not None and self.writes.has_pending(key):
+            self.writes.flush()
+    
+    def _session_keys(self, session_id: str) -> Tuple[str, ...]:
+        """세션 변경의 키 (세션 + 세션 소유 사용자)"""
+        with self.pool.connection() as conn:
+            row = conn.execute('SELECT user_id FROM training_sessions WHERE session_id = ?', (session_id,)).fetchone()
+        keys = (f"session:{session_id}",)
+        return keys + (f"user:{row['user_id']}",) if row else keys
     
     def create_user(self, user_id: str, username: str, email: str = "") -> bool:
         """사용자 생성"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('''
-                INSERT OR IGNORE INTO users (user_id, username, email)
-                VALUES (?, ?, ?)
-            ''', (user_id, username, email))
-            conn.commit()
-            return True
-        except Exception as e:
-            print(f"Error creating user: {e}")
-            return False
-        finally:
-            conn.close()
+        self._read_your_writes(f"user:{user_id}")
+        with self.pool.connection() as conn:
+            try:
+                conn.execute('''
+                    INSERT OR IGNORE INTO users (user_id, username, email)
+                    VALUES (?, ?, ?)
+                ''', (user_id, username, email))
+                conn.commit()
+                return True
+            except Exception as e:
+                print(f"Error creating user: {e}")
+                return False
     
     def get_user(self, user_id: str) -> Optional[Dict]:
         """사용자 정보 조회"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM users WHERE user_id = ?', (user_id,))
-        row = cursor.fetchone()
-        conn.close()
+        self._read_your_writes(f"user:{user_id}")
+        with self.pool.connection() as conn:
+            row = conn.execute('SELECT * FROM users WHERE user_id = ?', (user_id,)).fetchone()
         
         if row:
             return dict(row)
         return None
     
-    def create_training_session(self, user_id: str, mode: str, duration: int) -> str:
-        """훈련 세션 생성"""
-        session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{user_id}"
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO training_sessions 
-            (session_id, user_id, mode, duration, start_time, total_frames, swing_count, average_score)
-            VALUES (?, ?, ?, ?, ?, 0, 0, 0.0)
-        ''', (session_id, user_id, mode, duration, datetime.now()))
-        
-        conn.commit()
-        conn.close()
+    def create_training_session(self, user_id: str, mode: str, duration: int, session_id: Optional[str] = None,
+                                start_time: Optional[datetime] = None) -> str:
+        """훈련 세션 생성 (실시간 분석 세션을 기록할 때는 그 세션의 ID와 시작 시각 사용)"""
+        session_id = session_id or f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{user_id}"
+        self._read_your_writes(f"user:{user_id}")
+        with self.pool.connection() as conn:
+            start_time = start_time or datetime.now()
+            conn.execute('''
+                INSERT INTO training_sessions
+                (session_id, user_id, mode, duration, start_time, total_frames, swing_count, average_score)
+                VALUES (?, ?, ?, ?, ?, 0, 0, 0.0)
+            ''', (session_id, user_id, mode, duration, start_time))
+            conn.execute('''
+                INSERT INTO user_stats (user_id, total_sessions, score_sum, total_swings, last_training)
+                VALUES (?, 1, 0, 0, ?)
+                ON CONFLICT (user_id) DO UPDATE SET
+                    total_sessions = total_sessions + 1,
+                    last_training = MAX(COALESCE(last_training, ''), excluded.last_training)
+            ''', (user_id, start_time))
+            conn.commit()
         
         return session_id
     
-    def update_training_session(self, session_id: str, session_data: Dict):
-        """훈련 세션 업데이트"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+    def update_training_session(self, session_id: str, session_data: Dict, frame_log: Optional[FrameLog] = None):
+        """훈련 세션 업데이트 (쓰기 지연 큐에 넣어 다른 변경과 함께 기록)
+        
+        session_data는 압축해 training_session_data 테이블에 기록한다.
+        frame_log를 넘기면 프레임 기록은 session_data에 넣지 않고, 로그 파일을
+        조각마다 압축해 training_session_frame_chunks 테이블에 기록한다.
+        프레임별 각도/점수는 training_frame_metrics 테이블에도 기록한다.
+        """
+        frames = None
+        frame_chunks = None
+        if frame_log is not None:
+            session_data = {key: value for key, value in session_data.items() if key != "frames"}
+            # 호출 후 프레임 로그 파일이 삭제될 수 있으므로 압축한 내용을 복사해 큐에 넣음
+            frame_chunks = _compress_frame_log(frame_log)
+        else:
+            frames = list(session_data.get("frames") or [])
+        
+        # 호출 시점의 내용으로 기록되도록 미리 인코딩
+        self._write(self._session_keys(session_id), functools.partial(
+            self._write_training_session,
+            session_id=session_id,
+            ended_at=datetime.now(),
+            total_frames=session_data.get("total_frames", 0),
+            swing_count=session_data.get("swing_count", 0),
+            average_score=session_data.get("average_score", 0),
+            encoded=_encode_session_data(session_data),
+            frames=frames,
+            frame_chunks=frame_chunks
+        ))
+    
+    def _write_training_session(self, conn: sqlite3.Connection, session_id: str, ended_at: datetime,
+                                total_frames: int, swing_count: int, average_score: float,
+                                encoded: Tuple[str, bytes], frames: Optional[List[Dict]],
+                                frame_chunks: Optional[List[bytes]] = None):
+        # 사용자 통계에 이전 값과의 차이 반영 (세션 갱신과 같은 트랜잭션)
+        conn.execute('''
+            UPDATE user_stats
+            SET score_sum = score_sum + ? - (SELECT COALESCE(average_score, 0) FROM training_sessions WHERE session_id = ?),
+                total_swings = total_swings + ? - (SELECT COALESCE(swing_count, 0) FROM training_sessions WHERE session_id = ?)
+            WHERE user_id = (SELECT user_id FROM training_sessions WHERE session_id = ?)
+        ''', (average_score, session_id, swing_count, session_id, session_id))
+        conn.execute('''
             UPDATE training_sessions
             SET end_time = ?,
                 total_frames = ?,
                 swing_count = ?,
                 average_score = ?,
-                session_data = ?
+                session_data = NULL
             WHERE session_id = ?
-        ''', (
-            datetime.now(),
-            session_data.get("total_frames", 0),
-            session_data.get("swing_count", 0),
-            session_data.get("average_score", 0),
-            json.dumps(session_data),
-            session_id
-        ))
+        ''', (ended_at, total_frames, swing_count, average_score, session_id))
+        conn.execute('''
+            INSERT OR REPLACE INTO training_session_data (session_id, encoding, data)
+            VALUES (?, ?, ?)
+        ''', (session_id, *encoded))
+        if frame_chunks is not None:
+            conn.execute('DELETE FROM training_session_frame_chunks WHERE session_id = ?', (session_id,))
+            conn.executemany('''
+                INSERT INTO training_session_frame_chunks (session_id, chunk_index, data)
+                VALUES (?, ?, ?)
+            ''', ((session_id, index, chunk) for index, chunk in enumerate(frame_chunks)))
+            # 프레임별 지표는 복사한 조각을 차례로 풀어 읽음
+            self._insert_frame_metrics(conn, session_id, read_records(_ChunkReader(iter(frame_chunks))))
+        elif frames:
+            self._insert_frame_metrics(conn, session_id, frames)
+    
+    def _insert_frame_metrics(self, conn: sqlite3.Connection, session_id: str, frames: Iterable[Dict]):
+        """프레임 기록에서 각도/점수를 뽑아 한 번의 executemany로 기록 (각도가 없는 프레임은 제외)"""
+        row = conn.execute('SELECT user_id FROM training_sessions WHERE session_id = ?', (session_id,)).fetchone()
+        user_id = row["user_id"] if row else None
+        conn.execute('DELETE FROM training_frame_metrics WHERE session_id = ?', (session_id,))
+        
+        def rows():
+            for index, frame in enumerate(frames):
+                pose_data = frame.get("pose_data") or {}
+                angles = pose_data.get("angles")
+                if not angles:
+                    continue
+                posture_score = (frame.get("feedback") or {}).get("posture_score") or pose_data.get("posture_score")
+                yield (
+                    session_id, index, user_id, frame.get("datetime"), frame.get("timestamp"),
+                    pose_data.get("swing_phase"), posture_score.get("score") if posture_score else None,
+                    *(angles.get(name) for name in ANGLE_NAMES)
+                )
+        
+        conn.executemany(f'''
+            INSERT INTO training_frame_metrics ({", ".join(_METRIC_COLUMNS)})
+            VALUES ({", ".join("?" * len(_METRIC_COLUMNS))})
+        ''', rows())
+    
+    def get_angle_trend(self, user_id: str, angle_name: str, swing_phase: Optional[str] = None,
+                        days: int = 90) -> List[Dict]:
+        """최근 days일 동안 각도의 일별 추이 (swing_phase를 지정하면 해당 단계 프레임만)"""
+        if angle_name not in ANGLE_NAMES:
+            raise ValueError(f"알 수 없는 각도입니다: {angle_name}")
+        
+        self._read_your_writes(f"user:{user_id}")
+        since = (datetime.now() - timedelta(days=days)).isoformat()
+        phase_filter = "AND swing_phase = ?" if swing_phase else ""
+        params = (user_id, swing_phase, since) if swing_phase else (user_id, since)
+        with self.pool.connection() as conn:
+            rows = conn.execute(f'''
+                SELECT date(recorded_at) AS date,
+                       AVG({angle_name}) AS average,
+                       MIN({angle_name}) AS minimum,
+                       MAX({angle_name}) AS maximum,
+                       COUNT({angle_name}) AS frames
+                FROM training_frame_metrics
+                WHERE user_id = ? {phase_filter} AND recorded_at >= ?
+                GROUP BY date(recorded_at)
+                ORDER BY date
+            ''', params).fetchall()
         
-        conn.commit()
-        conn.close()
+        return [dict(row) for row in rows]
     
     def get_training_session(self, session_id: str) -> Optional[Dict]:
-        """훈련 세션 조회"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM training_sessions WHERE session_id = ?', (session_id,))
-        row = cursor.fetchone()
-        conn.close()
+        """훈련 세션 조회 (요약 열 + 압축을 푼 세션 데이터)"""
+        self._read_your_writes(f"session:{session_id}")
+        columns = ", ".join(f"s.{column}" for column in _SESSION_COLUMNS)
+        with self.pool.connection() as conn:
+            row = conn.execute(f'''
+                SELECT {columns}, d.encoding, d.data, s.session_data AS legacy_data
+                FROM training_sessions s
+                LEFT JOIN training_session_data d ON d.session_id = s.session_id
+                WHERE s.session_id = ?
+            ''', (session_id,)).fetchone()
         
         if row:
-            data = dict(row)
-            if data.get("session_data"):
-                data["session_data"] = json.loads(data["session_data"])
+            data = {column: row[column] for column in _SESSION_COLUMNS}
+            if row["data"] is not None:
+                data["session_data"] = _decode_session_data(row["encoding"], row["data"])
+            elif row["legacy_data"]:
+                data["session_data"] = json.loads(row["legacy_data"])
+            else:
+                data["session_data"] = None
             return data
         return None
     
+    def iter_session_frames(self, session_id: str) -> Iterator[Dict]:
+        """훈련 세션 프레임 기록을 차례로 읽음 (조각 단위로 풀어 읽으므로 세션 길이와 무관하게 메모리 일정)"""
+        self._read_your_writes(f"session:{session_id}")
+        with self.pool.connection() as conn:
+            chunks = (data for (data,) in conn.execute(
+                'SELECT data FROM training_session_frame_chunks WHERE session_id = ? ORDER BY chunk_index',
+                (session_id,)
+            ))
+            first = next(chunks, None)
+            if first is None:
+                return
+            yield from read_records(_ChunkReader(itertools.chain((first,), chunks)))
+    
     def get_user_history(self, user_id: str, limit: int = 50) -> List[Dict]:
-        """사용자 훈련 이력 조회"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT * FROM training_sessions
-            WHERE user_id = ?
-            ORDER BY start_time DESC
-            LIMIT ?
-        ''', (user_id, limit))
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        return [dict(row) for row in rows]
+        """사용자 훈련 이력 조회 (최근 limit개)"""
+        return self.get_user_history_page(user_id, limit)["history"]
+    
+    def get_user_history_page(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                              fields: Optional[Iterable[str]] = None, since: Optional[str] = None,
+                              until: Optional[str] = None) -> Dict:
+        """사용자 훈련 이력 페이지 조회 (최근 순)
+        
+        cursor는 이전 페이지의 next_cursor로, 마지막 행의 (start_time, session_id)
+        다음부터 인덱스를 따라 읽으므로 몇 번째 페이지든 조회 비용이 같다.
+        인덱스는 정렬 순서만 제공하므로 session_id, start_time 외의 열은 페이지의
+        행 수만큼 테이블을 조회한다.
+        fields로 돌려받을 열을 고를 수 있다 (session_id, start_time은 항상 포함).
+        since/until은 start_time 범위 (since 이상, until 미만)이다.
+        다음 페이지가 없으면 next_cursor는 None이다.
+        """
+        limit = min(max(limit or config.HISTORY_PAGE_SIZE, 1), config.HISTORY_MAX_PAGE_SIZE)
+        columns = list(_SESSION_COLUMNS)
+        if fields is not None:
+            unknown = [field for field in fields if field not in _SESSION_COLUMNS]
+            if unknown:
+                raise ValueError(f"알 수 없는 필드입니다: {', '.join(unknown)}")
+            columns = [column for column in _SESSION_COLUMNS
+                       if column in fields or column in ("session_id", "start_time")]
+        
+        conditions = ["user_id = ?"]
+        params: List[Any] = [user_id]
+        if cursor is not None:
+            conditions.append("(start_time, session_id) < (?, ?)")
+            params.extend(_decode_cursor(cursor))
+        if since is not None:
+            conditions.append("start_time >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("start_time < ?")
+            params.append(until)
+        
+        self._read_your_writes(f"user:{user_id}")
+        with self.pool.connection() as conn:
+            # 한 행을 더 읽어 다음 페이지가 있는지 확인
+            rows = conn.execute(f'''
+                SELECT {", ".join(columns)} FROM training_sessions
+                WHERE {" AND ".join(conditions)}
+                ORDER BY start_time DESC, session_id DESC
+                LIMIT ?
+            ''', (*params, limit + 1)).fetchall()
+        
+        history = [dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = history[-1]
+            next_cursor = _encode_cursor(last["start_time"], last["session_id"])
+        return {"history": history, "next_cursor": next_cursor}
     
     def get_user_stats(self, user_id: str) -> Dict:
-        """사용자 통계 조회"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # 총 훈련 횟수
-        cursor.execute('SELECT COUNT(*) FROM training_sessions WHERE user_id = ?', (user_id,))
-        total_sessions = cursor.fetchone()[0]
-        
-        # 평균 점수
-        cursor.execute('SELECT AVG(average_score) FROM training_sessions WHERE user_id = ?', (user_id,))
-        avg_score = cursor.fetchone()[0] or 0
-        
-        # 총 스윙 횟수
-        cursor.execute('SELECT SUM(swing_count) FROM training_sessions WHERE user_id = ?', (user_id,))
-        total_swings = cursor.fetchone()[0] or 0
-        
-        # 최근 훈련일
-        cursor.execute('''
-            SELECT MAX(start_time) FROM training_sessions WHERE user_id = ?
-        ''', (user_id,))
-        last_training = cursor.fetchone()[0]
-        
-        conn.close()
+        """사용자 통계 조회 (user_stats 집계 테이블에서 한 번에 읽음)"""
+        self._read_your_writes(f"user:{user_id}")
+        with self.pool.connection() as conn:
+            row = conn.execute('''
+                SELECT total_sessions, score_sum, total_swings, last_training
+                FROM user_stats WHERE user_id = ?
+            ''', (user_id,)).fetchone()
+        
+        if row is None or not row["total_sessions"]:
+            return {
+                "total_sessions": 0,
+                "average_score": 0,
+                "total_swings": 0,
+                "last_training": None
+            }
         
         return {
-            "total_sessions": total_sessions,
-            "average_score": round(avg_score, 2),
-            "total_swings": total_swings,
-            "last_training": last_training
+            "total_sessions": row["total_sessions"],
+            "average_score": round(row["score_sum"] / row["total_sessions"], 2),
+            "total_swings": row["total_swings"],
+            "last_training": row["last_training"]
         }
     
     def get_user_achievements(self, user_id: str) -> List[Dict]:
         """사용자 성취도 조회"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT * FROM achievements
-            WHERE user_id = ?
-            ORDER BY achieved_at DESC
-        ''', (user_id,))
-        
-        rows = cursor.fetchall()
-        conn.close()
+        self._read_your_writes(f"user:{user_id}")
+        with self.pool.connection() as conn:
+            rows = conn.execute('''
+                SELECT * FROM achievements
+                WHERE user_id = ?
+                ORDER BY achieved_at DESC
+            ''', (user_id,)).fetchall()
         
         return [dict(row) for row in rows]
     
     def add_achievement(self, user_id: str, achievement_type: str, achievement_name: str):
         """성취도 추가"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO achievements (user_id, achievement_type, achievement_name)
-            VALUES (?, ?, ?)
-        ''', (user_id, achievement_type, achievement_name))
+        def write(conn: sqlite3.Connection):
+            conn.execute('''
+                INSERT INTO achievements (user_id, achievement_type, achievement_name)
+                VALUES (?, ?, ?)
+            ''', (user_id, achievement_type, achievement_name))
         
-        conn.commit()
-        conn.close()
+        self._write((f"user:{user_id}",), write)
     
     def update_user_points(self, user_id: str, points: int):
         """사용자 포인트 업데이트"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE users
-            SET points = points + ?
-            WHERE user_id = ?
-        ''', (points, user_id))
-        
-        conn.commit()
-        conn.close()
+        def write(conn: sqlite3.Connection):
+            conn.execute('''
+                UPDATE users
+                SET points = points + ?
+                WHERE user_id = ?
+            ''', (points, user_id))
+        
+        self._write((f"user:{user_id}",), write)
     
     def update_user_level(self, user_id: str, level: int):
         """사용자 레벨 업데이트"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE users
-            SET level = ?
-            WHERE user_id = ?
-        ''', (level, user_id))
-        
-        conn.commit()
-        conn.close()
+        def write(conn: sqlite3.Connection):
+            conn.execute('''
+                UPDATE users
+                SET level = ?
+                WHERE user_id = ?
+            ''', (level, user_id))
+        
+        self._write((f"user:{user_id}",), write)
+
+
+def _encode_session_data(session_data: Dict) -> Tuple[str, bytes]:
+    """세션 데이터를 압축 바이너리로 변환 (인코딩 이름, 데이터)"""
+    if msgpack is not None:
+        return "msgpack+zlib", zlib.compress(msgpack.packb(session_data), _COMPRESS_LEVEL)
+    return "json+zlib", zlib.compress(json.dumps(session_data).encode("utf-8"), _COMPRESS_LEVEL)
+
+
+def _decode_session_data(encoding: str, data: bytes) -> Dict:
+    raw = zlib.decompress(data)
+    if encoding == "msgpack+zlib":
+        if msgpack is None:
+            raise RuntimeError("msgpack이 설치되어 있지 않아 세션 데이터를 읽을 수 없습니다.")
+        return msgpack.unpackb(raw)
+    return json.loads(raw)
+
+
+def _encode_cursor(start_time: str, session_id: str) -> str:
+    """이력 페이지 커서 (마지막 행의 정렬 키) 인코딩"""
+    raw = json.dumps([start_time, session_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        start_time, session_id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("잘못된 커서입니다")
+    if not isinstance(start_time, str) or not isinstance(session_id, str):
+        raise ValueError("잘못된 커서입니다")
+    return start_time, session_id
+
+
+def _compress_frame_log(frame_log: FrameLog) -> List[bytes]:
+    """프레임 로그 파일을 조각마다 압축 (파일 전체를 압축 전 크기로 메모리에 올리지 않음)"""
+    frame_log.flush()
+    remaining = frame_log.size
+    chunks = []
+    with open(frame_log.path, "rb") as source:
+        while remaining > 0:
+            chunk = source.read(min(_FRAME_CHUNK_BYTES, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            chunks.append(zlib.compress(chunk, _COMPRESS_LEVEL))
+    return chunks
 
+
+class _ChunkReader:
+    """압축된 조각을 차례로 풀어 이어 읽는 스트림 (read_records용)"""
+    
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._buffer = b""
+        self._offset = 0
+    
+    def read(self, size: int) -> bytes:
+        while len(self._buffer) - self._offset < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer = self._buffer[self._offset:] + zlib.decompress(chunk)
+            self._offset = 0
+        data = self._buffer[self._offset:self._offset + size]
+        self._offset += len(data)
+        return data
+
+
+class AsyncDatabase:
+    """Database의 비동기 래퍼
+
+    모든 쿼리를 데이터베이스 전용 스레드 풀에서 실행하므로, FastAPI
+    핸들러가 기다리는 동안 이벤트 루프(실시간 분석 WebSocket)가 멈추지
+    않는다. 스레드 수는 연결 풀 크기와 같아 스레드가 연결을 기다리지 않는다.
+    반환 형식은 Database와 같다.
+    """
+    
+    def __init__(self, database: Optional[Database] = None):
+        self.database = database or Database()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.database.pool.size,
+            thread_name_prefix="golflink-db"
+        )
+    
+    async def _run(self, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
+    async def create_user(self, user_id: str, username: str, email: str = "") -> bool:
+        return await self._run(self.database.create_user, user_id, username, email)
+    
+    async def get_user(self, user_id: str) -> Optional[Dict]:
+        return await self._run(self.database.get_user, user_id)
+    
+    async def create_training_session(self, user_id: str, mode: str, duration: int, session_id: Optional[str] = None,
+                                      start_time: Optional[datetime] = None) -> str:
+        return await self._run(self.database.create_training_session, user_id, mode, duration, session_id, start_time)
+    
+    async def update_training_session(self, session_id: str, session_data: Dict, frame_log: Optional[FrameLog] = None):
+        await self._run(self.database.update_training_session, session_id, session_data, frame_log)
+    
+    async def get_training_session(self, session_id: str) -> Optional[Dict]:
+        return await self._run(self.database.get_training_session, session_id)
+    
+    async def get_user_history(self, user_id: str, limit: int = 50) -> List[Dict]:
+        return await self._run(self.database.get_user_history, user_id, limit)
+    
+    async def get_user_history_page(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                                    fields: Optional[Iterable[str]] = None, since: Optional[str] = None,
+                                    until: Optional[str] = None) -> Dict:
+        return await self._run(self.database.get_user_history_page, user_id, limit, cursor, fields, since, until)
+    
+    async def get_user_stats(self, user_id: str) -> Dict:
+        return await self._run(self.database.get_user_stats, user_id)
+    
+    async def get_angle_trend(self, user_id: str, angle_name: str, swing_phase: Optional[str] = None,
+                              days: int = 90) -> List[Dict]:
+        return await self._run(self.database.get_angle_trend, user_id, angle_name, swing_phase, days)
+    
+    async def get_user_achievements(self, user_id: str) -> List[Dict]:
+        return await self._run(self.database.get_user_achievements, user_id)
+    
+    async def add_achievement(self, user_id: str, achievement_type: str, achievement_name: str):
+        await self._run(self.database.add_achievement, user_id, achievement_type, achievement_name)
+    
+    async def update_user_points(self, user_id: str, points: int):
+        await self._run(self.database.update_user_points, user_id, points)
+    
+    async def update_user_level(self, user_id: str, level: int):
+        await self._run(self.database.update_user_level, user_id, level)
+    
+    def get_write_stats(self) -> Dict:
+        """쓰기 지연 큐 통계 (사용하지 않으면 빈 딕셔너리)"""
+        writes = self.database.writes
+        return writes.get_stats() if writes is not None else {}
+    
+    def close(self):
+        """진행 중인 쿼리를 마친 뒤 스레드 풀과 연결 풀 종료"""
+        self._executor.shutdown(wait=True)
+        self.database.close()
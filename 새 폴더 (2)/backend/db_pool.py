@@ -0,0 +1,121 @@
+from typing import Deque, Iterator, List, Optional
+from collections import deque
+from contextlib import contextmanager
+import sqlite3
+import threading
+
+import config
+
+# 연결별로 캐시하는 컴파일된 SQL 문 수 (같은 쿼리는 다시 파싱하지 않음)
+_CACHED_STATEMENTS = 256
+
+
+class ConnectionPool:
+    """SQLite 연결 풀
+
+    요청마다 연결을 열고 스키마를 다시 읽는 대신, 미리 설정을 마친 연결을
+    재사용한다. WAL 모드를 사용하므로 쓰기 중에도 다른 연결의 읽기가
+    막히지 않는다. 연결은 한 번에 한 스레드만 사용하며, 풀이 비어 있고
+    최대 개수만큼 열려 있으면 반환될 때까지 기다린다. 반환된 연결은 먼저
+    기다린 스레드에 바로 넘겨, 조회가 몰려도 기록 요청이 밀리지 않는다.
+    """
+
+    def __init__(self, path: str, size: Optional[int] = None, timeout: Optional[float] = None):
+        self.path = path
+        self.size = size or config.DB_POOL_SIZE
+        self.timeout = config.DB_BUSY_TIMEOUT_S if timeout is None else timeout
+        # 최근에 쓴 연결부터 재사용 (페이지 캐시가 따뜻한 연결 우선)
+        self._idle: List[sqlite3.Connection] = []
+        # 연결을 기다리는 스레드 (먼저 온 순서대로 받음)
+        self._waiters: Deque["_Waiter"] = deque()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=_CACHED_STATEMENTS
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL에서는 NORMAL이어도 손상되지 않음 (전원 장애 시 마지막 커밋만 유실될 수 있음)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{config.DB_CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size={config.DB_MMAP_SIZE_MB * 1024 * 1024}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            if self._idle and not self._waiters:
+                return self._idle.pop()
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+                waiter = _Waiter()
+                self._waiters.append(waiter)
+
+        if create:
+            try:
+                return self._open()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        if waiter.event.wait(self.timeout):
+            return waiter.conn
+        with self._lock:
+            if waiter.conn is None:
+                self._waiters.remove(waiter)
+                raise TimeoutError(f"No database connection available within {self.timeout}s")
+        # 시간 초과와 동시에 연결을 넘겨받은 경우
+        return waiter.conn
+
+    def _release(self, conn: sqlite3.Connection):
+        # 커밋하지 않은 트랜잭션이 다음 사용자에게 넘어가지 않도록 정리
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if self._closed:
+                self._created -= 1
+                conn.close()
+            elif self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.conn = conn
+                waiter.event.set()
+            else:
+                self._idle.append(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """연결을 빌려 사용 (블록을 벗어나면 풀에 반환)"""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def close(self):
+        """사용 중이지 않은 연결을 모두 닫음 (사용 중인 연결은 반환될 때 닫힘)"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+        for conn in idle:
+            conn.close()
+
+
+class _Waiter:
+    """연결을 기다리는 스레드 (반환된 연결을 직접 넘겨받음)"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.conn: Optional[sqlite3.Connection] = None
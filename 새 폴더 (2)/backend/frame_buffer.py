@@ -0,0 +1,89 @@
+from typing import Dict, Optional, Tuple
+import asyncio
+import time
+
+
+class LatestFrameSlot:
+    """연결별 최신 프레임 보관소
+
+    분석이 수신 속도를 따라가지 못하면 대기 중인 프레임을 새 프레임으로
+    교체하고, 허용 지연 시간보다 오래된 프레임은 버린다.
+    """
+
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self._pending: Optional[Tuple[Dict, float]] = None
+        self._event = asyncio.Event()
+        self._closed = False
+        # 클라이언트 timestamp와 서버 시계의 차이 (최소 관측값)
+        self._clock_offset: Optional[float] = None
+
+        self.received = 0
+        self.processed = 0
+        self.dropped = {"replaced": 0, "stale": 0, "queue_full": 0}
+
+    def put(self, message: Dict):
+        """새 프레임 저장 (대기 중인 이전 프레임은 폐기)"""
+        received_at = time.time()
+        timestamp = message.get("timestamp")
+        if timestamp:
+            offset = received_at - timestamp
+            if self._clock_offset is None or offset < self._clock_offset:
+                self._clock_offset = offset
+
+        self.received += 1
+        if self._pending is not None:
+            self.dropped["replaced"] += 1
+        self._pending = (message, received_at)
+        self._event.set()
+
+    async def get(self) -> Optional[Dict]:
+        """다음 처리할 프레임 반환 (슬롯이 닫히고 비어 있으면 None)"""
+        while True:
+            if self._pending is None:
+                if self._closed:
+                    return None
+                self._event.clear()
+                await self._event.wait()
+                continue
+
+            message, received_at = self._pending
+            self._pending = None
+
+            if self.frame_age(message, received_at) > self.max_age:
+                self.dropped["stale"] += 1
+                continue
+            return message
+
+    def close(self):
+        """더 이상 프레임이 들어오지 않음을 표시"""
+        self._closed = True
+        self._event.set()
+
+    def frame_age(self, message: Dict, received_at: float) -> float:
+        """프레임 timestamp 기준 경과 시간 (초)
+
+        클라이언트와 서버의 시계 차이는 지금까지 관측된 최소 차이로 보정한다.
+        """
+        now = time.time()
+        timestamp = message.get("timestamp")
+        if not timestamp or self._clock_offset is None:
+            return now - received_at
+        return now - (timestamp + self._clock_offset)
+
+    def mark_processed(self):
+        """프레임 처리 완료 기록"""
+        self.processed += 1
+
+    def mark_dropped(self, reason: str):
+        """분석 단계에서 버린 프레임 기록"""
+        self.dropped[reason] = self.dropped.get(reason, 0) + 1
+
+    def get_stats(self) -> Dict:
+        """수신/처리/폐기 프레임 수 반환"""
+        return {
+            "received": self.received,
+            "processed": self.processed,
+            "dropped": sum(self.dropped.values()),
+            "dropped_by_reason": dict(self.dropped)
+        }
@@ -0,0 +1,199 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import datetime
+import numpy as np
+
+import config
+from landmark_batch import ANGLE_NAMES, POSE_LANDMARKS
+
+# 저장하는 랜드마크 순서 (pose_data["landmarks"]의 이름)
+LANDMARK_NAMES = tuple(POSE_LANDMARKS)
+
+_INITIAL_CAPACITY = 256
+
+
+class Interner:
+    """문자열 ↔ 작은 정수 코드 변환표"""
+
+    def __init__(self, values: Iterable[Optional[str]] = ()):
+        self.values: List[Optional[str]] = []
+        self.codes: Dict[Optional[str], int] = {}
+        for value in values:
+            self.code(value)
+
+    def code(self, value: Optional[str]) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class FrameColumns:
+    """세션 프레임별 데이터의 열 단위 저장소
+
+    프레임마다 중첩 딕셔너리를 보관하는 대신 timestamp, 랜드마크, 각도,
+    점수를 NumPy 배열에, 스윙 단계와 피드백 심각도를 작은 정수 코드로
+    저장한다. max_frames를 지정하면 최근 프레임만 남기는 링 버퍼로
+    동작한다. 인덱스는 세션 시작부터의 절대 프레임 번호이다.
+    """
+
+    def __init__(self, max_frames: Optional[int] = None):
+        self.max_frames = config.SESSION_MAX_FRAMES if max_frames is None else max_frames
+        # 지금까지 추가된 전체 프레임 수 (버퍼에서 밀려난 프레임 포함)
+        self.count = 0
+
+        self.phases = Interner()
+        self.severities = Interner()
+        # 피드백 세부 항목의 각도 이름 (프레임별 비트 마스크로 저장)
+        self.detail_names = Interner(ANGLE_NAMES)
+
+        self._capacity = 0
+        self._allocate(min(_INITIAL_CAPACITY, self.max_frames) if self.max_frames else _INITIAL_CAPACITY)
+
+    def _allocate(self, capacity: int):
+        """용량 확장 (링 버퍼로 순환하기 전에만 호출)"""
+        def grow(old: Optional[np.ndarray], shape: Tuple, dtype, fill) -> np.ndarray:
+            new = np.full((capacity,) + shape, fill, dtype=dtype)
+            if old is not None:
+                new[:self.count] = old[:self.count]
+            return new
+
+        first = self._capacity == 0
+        self.timestamps = grow(None if first else self.timestamps, (), np.float64, 0.0)
+        self.recorded_at = grow(None if first else self.recorded_at, (), np.float64, 0.0)
+        self.landmarks = grow(None if first else self.landmarks, (len(LANDMARK_NAMES), 3), np.float32, np.nan)
+        self.angles = grow(None if first else self.angles, (len(ANGLE_NAMES),), np.float32, np.nan)
+        self.scores = grow(None if first else self.scores, (), np.float32, np.nan)
+        self.phase_codes = grow(None if first else self.phase_codes, (), np.uint8, 0)
+        self.severity_codes = grow(None if first else self.severity_codes, (), np.uint8, 0)
+        self.detail_masks = grow(None if first else self.detail_masks, (), np.uint32, 0)
+        self.detected = grow(None if first else self.detected, (), np.bool_, False)
+        self.motion_skipped = grow(None if first else self.motion_skipped, (), np.bool_, False)
+        self._capacity = capacity
+
+    def __len__(self) -> int:
+        """버퍼에 남아 있는 프레임 수"""
+        return min(self.count, self._capacity)
+
+    @property
+    def start(self) -> int:
+        """버퍼에 남아 있는 가장 오래된 프레임 번호"""
+        return self.count - len(self)
+
+    def append(self, timestamp: float, pose_data: Dict, feedback: Dict, recorded_at: float):
+        """프레임 하나 추가"""
+        if self.count >= self._capacity and (not self.max_frames or self._capacity < self.max_frames):
+            capacity = self._capacity * 2
+            self._allocate(min(capacity, self.max_frames) if self.max_frames else capacity)
+
+        i = self.count % self._capacity
+        self.timestamps[i] = timestamp or 0.0
+        self.recorded_at[i] = recorded_at
+
+        self.landmarks[i] = np.nan
+        landmarks = pose_data.get("landmarks")
+        if landmarks:
+            for j, name in enumerate(LANDMARK_NAMES):
+                point = landmarks.get(name)
+                if point is not None:
+                    self.landmarks[i, j] = point[:3]
+
+        self.angles[i] = np.nan
+        angles = pose_data.get("angles")
+        if angles:
+            for j, name in enumerate(ANGLE_NAMES):
+                value = angles.get(name)
+                if value is not None:
+                    self.angles[i, j] = value
+
+        posture_score = feedback.get("posture_score")
+        self.scores[i] = posture_score.get("score", 0) if posture_score else np.nan
+        self.phase_codes[i] = self.phases.code(pose_data.get("swing_phase"))
+        self.severity_codes[i] = self.severities.code(feedback.get("severity"))
+
+        mask = 0
+        for detail in feedback.get("details", []):
+            angle_name = detail.get("angle_name")
+            if angle_name:
+                bit = self.detail_names.code(angle_name)
+                if bit < 32:
+                    mask |= 1 << bit
+        self.detail_masks[i] = mask
+
+        self.detected[i] = bool(pose_data.get("detected"))
+        self.motion_skipped[i] = bool(pose_data.get("motion_skipped"))
+        self.count += 1
+
+    def column(self, name: str) -> np.ndarray:
+        """버퍼에 남아 있는 프레임의 열 (시간 순서)"""
+        array = getattr(self, name)
+        if self.count <= self._capacity:
+            return array[:self.count]
+        split = self.count % self._capacity
+        return np.concatenate((array[split:], array[:split]))
+
+    def record(self, index: int) -> Dict:
+        """프레임 하나를 딕셔너리로 변환 (메시지 문자열 등 저장하지 않은 값은 제외)
+
+        세션 저장소 기록과 세션 데이터 출력에 사용하며, 다시 append하면
+        같은 열 값이 된다.
+        """
+        if not self.start <= index < self.count:
+            raise IndexError(f"Frame {index} is not retained")
+        i = index % self._capacity
+        return build_record(
+            self.timestamps[i], self.recorded_at[i], self.landmarks[i], self.angles[i], self.scores[i],
+            self.phases.values[self.phase_codes[i]], self.severities.values[self.severity_codes[i]],
+            self.detail_names.values, int(self.detail_masks[i]), self.detected[i], self.motion_skipped[i]
+        )
+
+    def records(self, start: int = 0) -> List[Dict]:
+        """start번째 이후 버퍼에 남아 있는 프레임 목록"""
+        return [self.record(index) for index in range(max(start, self.start), self.count)]
+
+
+def build_record(timestamp: float, recorded_at: float, landmarks: np.ndarray, angles: np.ndarray, score: float,
+                 phase: Optional[str], severity: Optional[str], detail_names: List[Optional[str]], detail_mask: int,
+                 detected: bool, motion_skipped: bool) -> Dict:
+    """열 값으로 프레임 기록 딕셔너리 구성 (FrameColumns, FrameLog 공용)"""
+    landmark_dict = {
+        name: tuple(float(v) for v in landmarks[j])
+        for j, name in enumerate(LANDMARK_NAMES)
+        if not np.isnan(landmarks[j, 0])
+    }
+    angle_dict = {
+        name: float(angles[j])
+        for j, name in enumerate(ANGLE_NAMES)
+        if not np.isnan(angles[j])
+    }
+    posture_score = None if np.isnan(score) else {"score": float(score)}
+
+    pose_data = {
+        "detected": bool(detected),
+        "landmarks": landmark_dict or None,
+        "angles": angle_dict or None,
+        "posture_score": posture_score
+    }
+    if phase is not None:
+        pose_data["swing_phase"] = phase
+    if motion_skipped:
+        pose_data["motion_skipped"] = True
+
+    return {
+        "timestamp": float(timestamp),
+        "pose_data": pose_data,
+        "feedback": {
+            "severity": severity,
+            "posture_score": posture_score,
+            "details": [
+                {"angle_name": name}
+                for bit, name in enumerate(detail_names)
+                if detail_mask >> bit & 1
+            ]
+        },
+        "datetime": datetime.fromtimestamp(float(recorded_at)).isoformat()
+    }
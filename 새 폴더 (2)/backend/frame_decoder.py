@@ -0,0 +1,71 @@
+from typing import Optional, Tuple
+import cv2
+import numpy as np
+
+import config
+
+# JPEG DCT 축소 디코딩 배율 → imread 플래그
+_REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+# 크기 정보를 담은 SOF 마커 (DHT/JPG/DAC 제외)
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def jpeg_size(data) -> Optional[Tuple[int, int]]:
+    """JPEG 헤더에서 (너비, 높이) 읽기 (JPEG가 아니면 None)"""
+    length = len(data)
+    if length < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+
+    pos = 2
+    while pos + 9 < length:
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        segment_length = (int(data[pos + 2]) << 8) | int(data[pos + 3])
+        if marker in _SOF_MARKERS:
+            height = (int(data[pos + 5]) << 8) | int(data[pos + 6])
+            width = (int(data[pos + 7]) << 8) | int(data[pos + 8])
+            return width, height
+        pos += 2 + segment_length
+    return None
+
+
+class FrameDecoder:
+    """세션별 프레임 디코더
+
+    JPEG는 자세 모델에 필요한 해상도까지만 DCT 단계에서 축소해 디코딩한다.
+    """
+
+    def __init__(self, target_size: Optional[int] = None):
+        # 디코딩 결과의 긴 변이 이 값 이상이 되도록 유지
+        self.target_size = target_size or config.DECODE_TARGET_SIZE
+        self.last_scale = 1
+
+    def choose_scale(self, width: int, height: int) -> int:
+        """해상도를 목표 이하로 떨어뜨리지 않는 가장 큰 축소 배율"""
+        long_side = max(width, height)
+        scale = 1
+        for candidate in (2, 4, 8):
+            if long_side / candidate >= self.target_size:
+                scale = candidate
+        return scale
+
+    def decode(self, payload: bytes, offset: int = 0) -> np.ndarray:
+        """JPEG/PNG 바이트를 BGR 프레임으로 디코딩 (offset 이후를 복사 없이 참조)"""
+        buffer = np.frombuffer(payload, np.uint8, offset=offset)
+        size = jpeg_size(memoryview(payload)[offset:])
+        self.last_scale = self.choose_scale(*size) if size else 1
+
+        frame = cv2.imdecode(buffer, _REDUCED_FLAGS[self.last_scale])
+        if frame is None:
+            raise ValueError("이미지를 디코딩할 수 없습니다.")
+        return frame
@@ -0,0 +1,183 @@
+from typing import BinaryIO, Dict, Iterator, List, Optional
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+import config
+from frame_columns import LANDMARK_NAMES, FrameColumns, build_record
+from landmark_batch import ANGLE_NAMES
+
+# 파일 형식: 헤더 뒤에 레코드가 이어진다.
+#   b"S" + 문자열 표 항목 (표 번호, 코드, 길이, UTF-8 바이트) - 새 스윙 단계/심각도/각도 이름이 처음 나올 때
+#   b"F" + 프레임 (timestamp, 기록 시각, 점수, 단계 코드, 심각도 코드, 세부 항목 마스크, 플래그, 랜드마크, 각도)
+_MAGIC = b"GLFL\x01"
+_STRING_HEADER = struct.Struct("<BBH")
+_FRAME_HEADER = struct.Struct("<ddfBBIB")
+_LANDMARK_BYTES = len(LANDMARK_NAMES) * 3 * 4
+_ANGLE_BYTES = len(ANGLE_NAMES) * 4
+_FRAME_BYTES = _FRAME_HEADER.size + _LANDMARK_BYTES + _ANGLE_BYTES
+# None 값을 나타내는 문자열 길이
+_NONE_LENGTH = 0xFFFF
+
+_FLAG_DETECTED = 1
+_FLAG_MOTION_SKIPPED = 2
+
+# 문자열 표 번호 (FrameColumns의 Interner 순서)
+_PHASES, _SEVERITIES, _DETAIL_NAMES = range(3)
+
+
+class FrameLog:
+    """세션 프레임 추가 전용 바이너리 로그
+
+    분석된 프레임을 도착 순서대로 로컬 디스크 파일에 덧붙인다. 메모리에는
+    최근 프레임만 남기고, 리포트나 데이터베이스 기록이 전체 프레임을
+    필요로 할 때 이 파일에서 차례로 읽는다. 디스크 기록은 fsync_interval
+    초마다 fsync한다.
+    """
+
+    def __init__(self, path: str, fsync_interval: Optional[float] = None):
+        self.path = path
+        self.fsync_interval = config.FRAME_LOG_FSYNC_INTERVAL_S if fsync_interval is None else fsync_interval
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "wb")
+        self._file.write(_MAGIC)
+        self._lock = threading.Lock()
+        self._last_sync = time.monotonic()
+        # 이미 기록한 문자열 표 항목 수
+        self._written = [0, 0, 0]
+        self.count = 0
+        self.size = len(_MAGIC)
+
+    def append(self, columns: FrameColumns, index: int):
+        """FrameColumns에 방금 추가된 index번째 프레임 기록"""
+        i = index % len(columns.timestamps)
+        with self._lock:
+            chunks = self._new_strings(columns)
+            flags = (_FLAG_DETECTED if columns.detected[i] else 0) | (_FLAG_MOTION_SKIPPED if columns.motion_skipped[i] else 0)
+            chunks.append(b"F" + _FRAME_HEADER.pack(
+                columns.timestamps[i], columns.recorded_at[i], columns.scores[i],
+                columns.phase_codes[i], columns.severity_codes[i], int(columns.detail_masks[i]), flags
+            ))
+            chunks.append(columns.landmarks[i].tobytes())
+            chunks.append(columns.angles[i].tobytes())
+
+            for chunk in chunks:
+                self._file.write(chunk)
+                self.size += len(chunk)
+            self.count += 1
+
+            if time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+
+    def _new_strings(self, columns: FrameColumns) -> List[bytes]:
+        """아직 기록하지 않은 문자열 표 항목"""
+        chunks = []
+        for table, interner in enumerate((columns.phases, columns.severities, columns.detail_names)):
+            for code in range(self._written[table], len(interner)):
+                value = interner.values[code]
+                data = b"" if value is None else value.encode("utf-8")
+                length = _NONE_LENGTH if value is None else len(data)
+                chunks.append(b"S" + _STRING_HEADER.pack(table, code, length) + data)
+            self._written[table] = len(interner)
+        return chunks
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_sync = time.monotonic()
+
+    def flush(self):
+        """버퍼에 남은 기록을 파일에 씀 (읽기 전에 호출)"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def iter_records(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict]:
+        """start번째부터 stop번째 전까지의 프레임 기록을 파일에서 차례로 읽음"""
+        self.flush()
+        stop = self.count if stop is None else min(stop, self.count)
+        with open(self.path, "rb") as stream:
+            yield from read_records(stream, start, stop)
+
+    def close(self, delete: bool = False):
+        """파일 닫기 (delete가 True이면 파일 삭제)"""
+        with self._lock:
+            if not self._file.closed:
+                if not delete:
+                    self._sync()
+                self._file.close()
+        if delete:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+
+def read_records(stream: BinaryIO, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict]:
+    """프레임 로그 스트림에서 프레임 기록 읽기 (파일, SQLite BLOB 등 read()를 지원하는 객체)
+
+    마지막 레코드가 중간에 잘려 있으면 (기록 중 프로세스 종료) 거기서 멈춘다.
+    """
+    if stream.read(len(_MAGIC)) != _MAGIC:
+        raise ValueError("프레임 로그 형식이 아닙니다.")
+
+    tables: List[List[Optional[str]]] = [[], [], []]
+    index = 0
+    while stop is None or index < stop:
+        tag = stream.read(1)
+        if tag == b"S":
+            header = stream.read(_STRING_HEADER.size)
+            if len(header) < _STRING_HEADER.size:
+                return
+            table, code, length = _STRING_HEADER.unpack(header)
+            if length == _NONE_LENGTH:
+                value = None
+            else:
+                data = stream.read(length)
+                if len(data) < length:
+                    return
+                value = data.decode("utf-8")
+            if code != len(tables[table]):
+                raise ValueError(f"프레임 로그 문자열 표가 올바르지 않습니다: {table}/{code}")
+            tables[table].append(value)
+        elif tag == b"F":
+            data = stream.read(_FRAME_BYTES)
+            if len(data) < _FRAME_BYTES:
+                return
+            if index >= start:
+                yield _decode_frame(data, tables)
+            index += 1
+        else:
+            return
+
+
+def _decode_frame(data: bytes, tables: List[List[Optional[str]]]) -> Dict:
+    timestamp, recorded_at, score, phase_code, severity_code, detail_mask, flags = _FRAME_HEADER.unpack_from(data)
+    offset = _FRAME_HEADER.size
+    landmarks = np.frombuffer(data, np.float32, len(LANDMARK_NAMES) * 3, offset).reshape(len(LANDMARK_NAMES), 3)
+    angles = np.frombuffer(data, np.float32, len(ANGLE_NAMES), offset + _LANDMARK_BYTES)
+    return build_record(
+        timestamp, recorded_at, landmarks, angles, np.float32(score),
+        tables[_PHASES][phase_code], tables[_SEVERITIES][severity_code], tables[_DETAIL_NAMES],
+        detail_mask, flags & _FLAG_DETECTED, flags & _FLAG_MOTION_SKIPPED
+    )
+
+
+def purge_frame_logs(directory: Optional[str] = None, max_age: Optional[float] = None) -> int:
+    """max_age초 동안 갱신되지 않은 프레임 로그 삭제 (프로세스 비정상 종료로 남은 파일 정리)"""
+    directory = directory or config.FRAME_LOG_DIR
+    max_age = config.SESSION_RESUME_TTL_S if max_age is None else max_age
+    if not os.path.isdir(directory):
+        return 0
+
+    cutoff = time.time() - max_age
+    purged = 0
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.endswith(".frames") and os.path.getmtime(path) < cutoff:
+            os.remove(path)
+            purged += 1
+    return purged
@@ -0,0 +1,73 @@
+from typing import Dict, Tuple
+import base64
+import json
+import struct
+
+import numpy as np
+
+# 바이너리 메시지 형식 (little-endian, 12바이트 헤더 + 본문)
+#   version(u8) | type(u8) | mode(u8) | reserved(u8) | timestamp(f64, 초)
+# 본문: frame → JPEG 바이트, landmarks → float32 33x3 (x, y, z), 비어 있으면 미검출
+FRAME_HEADER = struct.Struct("<BBBxd")
+PROTOCOL_VERSION = 1
+
+MESSAGE_TYPES = {
+    1: "frame",
+    2: "end_session",
+    3: "landmarks",
+}
+
+# 랜드마크 메시지 본문 크기 (33개 x (x, y, z) float32)
+LANDMARK_PAYLOAD_SHAPE = (33, 3)
+
+TRAINING_MODES = {
+    0: "beginner",
+    1: "intermediate",
+    2: "professional",
+}
+
+
+def parse_binary_message(data: bytes) -> Dict:
+    """바이너리 메시지 해석
+
+    이미지 바이트는 잘라내지 않고 원본 버퍼와 오프셋으로 전달한다.
+    """
+    if len(data) < FRAME_HEADER.size:
+        raise ValueError("메시지가 헤더보다 짧습니다.")
+
+    version, message_type, mode, timestamp = FRAME_HEADER.unpack_from(data)
+    if version != PROTOCOL_VERSION:
+        raise ValueError(f"지원하지 않는 프로토콜 버전입니다: {version}")
+
+    message = {
+        "type": MESSAGE_TYPES.get(message_type, "unknown"),
+        "timestamp": timestamp,
+        "mode": TRAINING_MODES.get(mode, "intermediate"),
+    }
+    if message["type"] == "frame":
+        message["frame_bytes"] = data
+        message["frame_offset"] = FRAME_HEADER.size
+    elif message["type"] == "landmarks":
+        if len(data) == FRAME_HEADER.size:
+            message["landmarks"] = None
+        else:
+            points = np.frombuffer(data, dtype="<f4", offset=FRAME_HEADER.size)
+            if points.size != LANDMARK_PAYLOAD_SHAPE[0] * LANDMARK_PAYLOAD_SHAPE[1]:
+                raise ValueError("랜드마크 메시지 크기가 올바르지 않습니다.")
+            message["landmarks"] = points.reshape(LANDMARK_PAYLOAD_SHAPE)
+    return message
+
+
+def parse_text_message(text: str) -> Dict:
+    """기존 JSON 메시지 해석 (이전 클라이언트 호환)"""
+    return json.loads(text)
+
+
+def frame_payload(message: Dict) -> Tuple[bytes, int]:
+    """프레임 메시지에서 (이미지 버퍼, 시작 오프셋) 반환"""
+    if "frame_bytes" in message:
+        return message["frame_bytes"], message["frame_offset"]
+
+    # JSON 메시지: data URL의 Base64 부분 디코딩
+    frame_base64 = message.get("frame")
+    return base64.b64decode(frame_base64.split(",")[1]), 0
@@ -0,0 +1,476 @@
+from typing import Dict, List, Optional, Union
+import asyncio
+import itertools
+import logging
+import multiprocessing as mp
+import threading
+import time
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+# 최근 지연 시간 지수 이동 평균의 가중치
+_LATENCY_SMOOTHING = 0.2
+# 연속으로 비정상 종료한 워커를 다시 시작하기 전 최대 대기 시간 (초)
+_RESTART_BACKOFF_MAX_S = 30.0
+# 세션 분석기를 아직 준비하지 못해 프레임을 처리하지 않았다는 워커 응답
+_ANALYZER_NOT_READY = "analyzer_not_ready"
+
+
+class InferencePoolFull(Exception):
+    """워커가 지금 프레임을 받을 수 없는 경우 (처리 대기열이 가득 참)"""
+
+
+class InferenceWorkerUnavailable(InferencePoolFull):
+    """워커를 다시 시작하는 중이거나 세션 분석기를 준비 중인 경우 (잠시 뒤 다시 받을 수 있음)"""
+
+
+def _warm_up(analyzer) -> None:
+    """빈 프레임으로 모든 단계의 MediaPipe 그래프를 미리 초기화"""
+    import numpy as np
+
+    blank = np.zeros((256, 256, 3), dtype=np.uint8)
+    for pose in analyzer.poses.values():
+        pose.process(blank)
+    analyzer.reset()
+
+
+class _SpareAnalyzers:
+    """다음 세션에 바로 배정할 예열된 분석기 보관함
+
+    분석기 생성과 예열은 백그라운드 스레드에서 하므로, 새 세션이 열려도
+    워커 루프(다른 세션의 프레임 처리)가 멈추지 않는다.
+    """
+
+    def __init__(self, count: int = 1):
+        self.count = count
+        self._ready: List = []
+        self._lock = threading.Lock()
+        self._wanted = threading.Event()
+        self._wanted.set()
+        self._thread = threading.Thread(target=self._run, name="spare-analyzer", daemon=True)
+        self._thread.start()
+
+    def take(self):
+        """예열된 분석기 반환 (없으면 None, 보충은 백그라운드에서)"""
+        with self._lock:
+            analyzer = self._ready.pop() if self._ready else None
+        self._wanted.set()
+        return analyzer
+
+    def give_back(self, analyzer) -> None:
+        """종료된 세션의 분석기 반환 (메모리 사용량을 제한하기 위해 count개까지만 보관)"""
+        with self._lock:
+            if len(self._ready) >= self.count:
+                return
+        analyzer.reset()
+        with self._lock:
+            self._ready.append(analyzer)
+
+    def _run(self):
+        from pose_analyzer import PoseAnalyzer
+
+        failures = 0
+        while True:
+            self._wanted.wait()
+            self._wanted.clear()
+            while True:
+                with self._lock:
+                    if len(self._ready) >= self.count:
+                        break
+                try:
+                    analyzer = PoseAnalyzer()
+                    _warm_up(analyzer)
+                except Exception:
+                    # 스레드가 끝나면 새 세션이 계속 거절되므로 기록하고 점점 늦게 다시 시도
+                    delay = min(_RESTART_BACKOFF_MAX_S, 2.0 ** failures)
+                    failures += 1
+                    logger.exception(f"Failed to prepare a spare pose analyzer, retrying in {delay:.0f}s")
+                    time.sleep(delay)
+                    continue
+                failures = 0
+                with self._lock:
+                    self._ready.append(analyzer)
+
+
+def _worker_main(worker_id: int, task_queue, result_queue) -> None:
+    """추론 워커 프로세스 진입점
+
+    세션마다 별도의 PoseAnalyzer를 두어 MediaPipe 추적 상태가
+    스트림 간에 섞이지 않도록 한다.
+    """
+    from frame_decoder import FrameDecoder
+    from pose_analyzer import PoseAnalyzer
+
+    # 세션이 없는 단일 요청용 분석기 (서로 무관한 요청이 이전 요청의 결과/영역을 재사용하지 않도록
+    # 움직임 감지와 ROI 자르기는 세션별 분석기에서만 사용)
+    shared = PoseAnalyzer(motion_gating=False, roi_cropping=False)
+    _warm_up(shared)
+    # 새 세션에 배정할 예열된 분석기 (백그라운드에서 준비)
+    spare = _SpareAnalyzers()
+    # 세션별 분석기 (None이면 예열된 분석기를 기다리는 중)
+    sessions: Dict[str, Optional[PoseAnalyzer]] = {}
+    # 세션별 디코더 (세션이 없는 요청은 공용 디코더 사용)
+    shared_decoder = FrameDecoder()
+    decoders: Dict[str, FrameDecoder] = {}
+
+    result_queue.put(("ready", worker_id, None, None))
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+
+        op, request_id, session_id, payload, offset, options = task
+
+        if op == "open":
+            # 예열된 분석기가 없으면 여기서 만들지 않고 (다른 세션이 멈추므로) 준비될 때까지 프레임을 거절
+            sessions[session_id] = spare.take()
+            decoders[session_id] = FrameDecoder()
+            continue
+
+        if op == "close":
+            analyzer = sessions.pop(session_id, None)
+            decoders.pop(session_id, None)
+            if analyzer is not None:
+                spare.give_back(analyzer)
+            continue
+
+        if session_id in sessions:
+            analyzer = sessions[session_id]
+            if analyzer is None:
+                analyzer = sessions[session_id] = spare.take()
+            if analyzer is None:
+                result_queue.put(("result", worker_id, request_id, (None, _ANALYZER_NOT_READY, 0.0)))
+                continue
+        else:
+            analyzer = shared
+        decoder = decoders.get(session_id, shared_decoder)
+        started = time.perf_counter()
+        try:
+            if isinstance(payload, dict):
+                result = analyzer.analyze_pose_from_data(payload)
+            else:
+                result = analyzer.analyze_pose(decoder.decode(payload, offset), **(options or {}))
+            error = None
+        except Exception as e:
+            result = None
+            error = str(e)
+        elapsed = time.perf_counter() - started
+
+        result_queue.put(("result", worker_id, request_id, (result, error, elapsed)))
+
+
+class _WorkerHandle:
+    """부모 프로세스에서 관리하는 워커 상태"""
+
+    def __init__(self, worker_id: int, process, task_queue):
+        self.worker_id = worker_id
+        self.process = process
+        self.task_queue = task_queue
+        self.ready = False
+        # 비정상 종료 후 다시 시작해 준비 완료를 기다리는 중
+        self.restarting = False
+        # 현재 프로세스의 종료를 처리했는지 여부, 다시 시작할 시각, 연속 비정상 종료 횟수
+        self.exit_handled = False
+        self.restart_at = 0.0
+        self.consecutive_crashes = 0
+        self.restarts = 0
+        self.sessions = set()
+        self.inflight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_latency = 0.0
+        self.last_latency = 0.0
+        # 제출부터 결과 수신까지 걸린 시간의 지수 이동 평균 (대기열 대기 포함)
+        self.recent_latency = 0.0
+        # 모델 복잡도 단계별 처리 프레임 수
+        self.tier_counts: Dict[int, int] = {}
+
+    def get_stats(self) -> Dict:
+        """워커 통계 반환"""
+        return {
+            "worker_id": self.worker_id,
+            "pid": self.process.pid,
+            "alive": self.process.is_alive(),
+            "ready": self.ready,
+            "restarting": self.restarting,
+            "restarts": self.restarts,
+            "sessions": len(self.sessions),
+            "inflight": self.inflight,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_latency_ms": round(self.total_latency / self.completed * 1000, 2) if self.completed else 0.0,
+            "last_latency_ms": round(self.last_latency * 1000, 2),
+            "recent_latency_ms": round(self.recent_latency * 1000, 2),
+            "model_complexity_frames": dict(self.tier_counts),
+        }
+
+
+class InferencePool:
+    """자세 추론 워커 프로세스 풀
+
+    각 워커는 자체 MediaPipe Pose 인스턴스를 보유하며,
+    WebSocket 세션은 하나의 워커에 고정된다. 워커가 비정상 종료되면
+    처리 중인 요청을 실패 처리하고 워커를 다시 시작해 고정된 세션을
+    다시 연다 (추적 상태는 처음부터 다시 시작).
+    """
+
+    def __init__(self, num_workers: Optional[int] = None, queue_depth: Optional[int] = None):
+        self.num_workers = num_workers or config.INFERENCE_WORKERS
+        self.queue_depth = queue_depth or config.INFERENCE_QUEUE_DEPTH
+        self._workers: List[_WorkerHandle] = []
+        self._affinity: Dict[str, _WorkerHandle] = {}
+        self._pending: Dict[int, tuple] = {}
+        self._request_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._result_queue = None
+        self._collector: Optional[threading.Thread] = None
+        self._monitor: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        # MediaPipe는 fork 안전하지 않으므로 spawn 사용
+        self._ctx = mp.get_context("spawn")
+
+    def _spawn(self, worker_id: int) -> tuple:
+        """워커 프로세스 시작 (프로세스, 작업 큐 반환)"""
+        task_queue = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, task_queue, self._result_queue),
+            name=f"pose-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        return process, task_queue
+
+    def start(self):
+        """워커 프로세스 시작"""
+        if self._workers:
+            return
+
+        self._stopping.clear()
+        self._result_queue = self._ctx.Queue()
+        for worker_id in range(self.num_workers):
+            self._workers.append(_WorkerHandle(worker_id, *self._spawn(worker_id)))
+
+        self._collector = threading.Thread(target=self._collect_results, name="pose-result-collector", daemon=True)
+        self._collector.start()
+        self._monitor = threading.Thread(target=self._monitor_workers, name="pose-worker-monitor", daemon=True)
+        self._monitor.start()
+        logger.info(f"Inference pool started with {self.num_workers} workers")
+
+    def shutdown(self, timeout: float = 5.0):
+        """워커 프로세스 종료"""
+        self._stopping.set()
+        if self._monitor is not None:
+            self._monitor.join(timeout)
+        for worker in self._workers:
+            worker.task_queue.put(None)
+        for worker in self._workers:
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                worker.process.terminate()
+
+        if self._result_queue is not None:
+            self._result_queue.put(None)
+        if self._collector is not None:
+            self._collector.join(timeout)
+
+        # 응답을 기다리는 요청 정리
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for loop, future, _, _ in pending:
+            loop.call_soon_threadsafe(self._set_exception, future, RuntimeError("Inference pool shut down"))
+
+        self._workers = []
+        self._affinity = {}
+        logger.info("Inference pool stopped")
+
+    def open_session(self, session_id: str) -> int:
+        """세션을 가장 여유 있는 워커에 배정"""
+        with self._lock:
+            worker = min(self._workers, key=lambda w: (w.restarting, len(w.sessions), w.inflight))
+            worker.sessions.add(session_id)
+            self._affinity[session_id] = worker
+            # 워커를 다시 시작하며 작업 큐가 바뀔 수 있으므로 잠금 안에서 제출
+            worker.task_queue.put(("open", None, session_id, None, 0, None))
+        return worker.worker_id
+
+    def close_session(self, session_id: str):
+        """세션 배정 해제"""
+        with self._lock:
+            worker = self._affinity.pop(session_id, None)
+            if worker is None:
+                return
+            worker.sessions.discard(session_id)
+            worker.task_queue.put(("close", None, session_id, None, 0, None))
+
+    async def analyze(self, payload: Union[bytes, Dict], session_id: Optional[str] = None,
+                      mode: Optional[str] = None, offset: int = 0) -> Dict:
+        """워커에서 자세 분석 실행
+
+        payload가 bytes이면 offset부터 시작하는 인코딩된 이미지로, dict이면
+        analyze_pose_from_data 입력으로 처리한다.
+        """
+        options = {"mode": mode} if mode else None
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        with self._lock:
+            worker = self._affinity.get(session_id)
+            if worker is None:
+                worker = min(self._workers, key=lambda w: (w.restarting, w.inflight))
+            if worker.restarting or not worker.process.is_alive():
+                worker.rejected += 1
+                raise InferenceWorkerUnavailable(f"Inference worker {worker.worker_id} is restarting")
+            if worker.inflight >= self.queue_depth:
+                worker.rejected += 1
+                raise InferencePoolFull(f"Inference worker {worker.worker_id} queue is full")
+
+            request_id = next(self._request_ids)
+            self._pending[request_id] = (loop, future, worker, time.perf_counter())
+            worker.inflight += 1
+            worker.submitted += 1
+            worker.task_queue.put(("analyze", request_id, session_id, payload, offset, options))
+
+        return await future
+
+    def load(self) -> float:
+        """풀 사용률 (처리 중인 프레임 수 / 전체 대기열 용량, 0~1)"""
+        with self._lock:
+            capacity = len(self._workers) * self.queue_depth
+            inflight = sum(worker.inflight for worker in self._workers)
+        return inflight / capacity if capacity else 0.0
+
+    def latency(self) -> float:
+        """세션이 배정된 워커들의 최근 프레임 왕복 지연 시간 평균 (초)"""
+        with self._lock:
+            latencies = [worker.recent_latency for worker in self._workers if worker.sessions]
+        return sum(latencies) / len(latencies) if latencies else 0.0
+
+    def get_stats(self) -> Dict:
+        """풀 및 워커별 통계 반환"""
+        with self._lock:
+            workers = [worker.get_stats() for worker in self._workers]
+        return {
+            "num_workers": self.num_workers,
+            "queue_depth": self.queue_depth,
+            "active_sessions": sum(w["sessions"] for w in workers),
+            "inflight": sum(w["inflight"] for w in workers),
+            "load": round(self.load(), 3),
+            "workers": workers
+        }
+
+    def _collect_results(self):
+        """워커 결과를 대기 중인 Future로 전달 (백그라운드 스레드)"""
+        while True:
+            message = self._result_queue.get()
+            if message is None:
+                break
+
+            kind, worker_id, request_id, body = message
+            if kind == "ready":
+                with self._lock:
+                    if worker_id < len(self._workers):
+                        worker = self._workers[worker_id]
+                        worker.ready = True
+                        worker.restarting = False
+                        worker.consecutive_crashes = 0
+                logger.info(f"Inference worker {worker_id} ready")
+                continue
+
+            result, error, elapsed = body
+            with self._lock:
+                entry = self._pending.pop(request_id, None)
+                if entry is None:
+                    continue
+                loop, future, worker, submitted_at = entry
+                worker.inflight -= 1
+                if error == _ANALYZER_NOT_READY:
+                    worker.rejected += 1
+                elif error is None:
+                    worker.completed += 1
+                    worker.total_latency += elapsed
+                    worker.last_latency = elapsed
+                    round_trip = time.perf_counter() - submitted_at
+                    worker.recent_latency += _LATENCY_SMOOTHING * (round_trip - worker.recent_latency)
+                    tier = result.get("model_complexity") if result else None
+                    if tier is not None:
+                        worker.tier_counts[tier] = worker.tier_counts.get(tier, 0) + 1
+                else:
+                    worker.failed += 1
+
+            if error is None:
+                loop.call_soon_threadsafe(self._set_result, future, result)
+            elif error == _ANALYZER_NOT_READY:
+                exc = InferenceWorkerUnavailable(f"Inference worker {worker_id} is preparing the session analyzer")
+                loop.call_soon_threadsafe(self._set_exception, future, exc)
+            else:
+                loop.call_soon_threadsafe(self._set_exception, future, RuntimeError(error))
+
+    def _monitor_workers(self):
+        """워커 프로세스 비정상 종료 감지 및 재시작 (백그라운드 스레드)"""
+        while not self._stopping.wait(config.INFERENCE_WORKER_CHECK_INTERVAL_S):
+            for worker in list(self._workers):
+                if worker.process.is_alive():
+                    continue
+                if not worker.exit_handled:
+                    self._handle_exit(worker)
+                if time.monotonic() >= worker.restart_at and not self._stopping.is_set():
+                    self._restart(worker)
+
+    def _handle_exit(self, worker: _WorkerHandle):
+        """종료된 워커의 처리 중인 요청을 실패 처리하고 재시작 시각 결정"""
+        with self._lock:
+            worker.exit_handled = True
+            worker.ready = False
+            worker.restarting = True
+            lost = [request_id for request_id, entry in self._pending.items() if entry[2] is worker]
+            entries = [self._pending.pop(request_id) for request_id in lost]
+            worker.inflight = 0
+            worker.failed += len(entries)
+            # 바로 다시 죽는 워커(모델 로드 실패 등)는 점점 늦게 재시작
+            delay = min(_RESTART_BACKOFF_MAX_S, 2.0 ** worker.consecutive_crashes - 1)
+            worker.consecutive_crashes += 1
+            worker.restart_at = time.monotonic() + delay
+
+        logger.error(
+            f"Inference worker {worker.worker_id} exited with code {worker.process.exitcode}, "
+            f"failing {len(entries)} pending requests and restarting in {delay:.0f}s"
+        )
+        for loop, future, _, _ in entries:
+            exc = InferenceWorkerUnavailable(f"Inference worker {worker.worker_id} exited")
+            loop.call_soon_threadsafe(self._set_exception, future, exc)
+
+    def _restart(self, worker: _WorkerHandle):
+        """워커 프로세스를 새로 시작하고 고정된 세션을 다시 엶"""
+        process, task_queue = self._spawn(worker.worker_id)
+        with self._lock:
+            old_queue = worker.task_queue
+            worker.process = process
+            worker.task_queue = task_queue
+            worker.exit_handled = False
+            worker.restarts += 1
+            for session_id in worker.sessions:
+                task_queue.put(("open", None, session_id, None, 0, None))
+        # 읽을 프로세스가 없으므로 남은 작업을 버림
+        old_queue.cancel_join_thread()
+        old_queue.close()
+        logger.info(f"Inference worker {worker.worker_id} restarted (pid {process.pid}, {len(worker.sessions)} sessions)")
+
+    @staticmethod
+    def _set_result(future: asyncio.Future, result):
+        if not future.done():
+            future.set_result(result)
+
+    @staticmethod
+    def _set_exception(future: asyncio.Future, exc: Exception):
+        if not future.done():
+            future.set_exception(exc)
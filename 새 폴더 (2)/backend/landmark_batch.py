@@ -0,0 +1,145 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+# MediaPipe Pose 랜드마크 수
+NUM_LANDMARKS = 33
+
+# 관절 인덱스 (MediaPipe)
+POSE_LANDMARKS = {
+    'LEFT_SHOULDER': 11,
+    'RIGHT_SHOULDER': 12,
+    'LEFT_ELBOW': 13,
+    'RIGHT_ELBOW': 14,
+    'LEFT_WRIST': 15,
+    'RIGHT_WRIST': 16,
+    'LEFT_HIP': 23,
+    'RIGHT_HIP': 24,
+    'LEFT_KNEE': 25,
+    'RIGHT_KNEE': 26,
+    'LEFT_ANKLE': 27,
+    'RIGHT_ANKLE': 28,
+    'NOSE': 0,
+    'LEFT_EYE': 2,
+    'RIGHT_EYE': 5,
+}
+
+# 세 점 관절 각도 정의: 각도 이름 → (점1, 꼭짓점, 점3)
+JOINT_ANGLES = (
+    ('left_shoulder', ('LEFT_HIP', 'LEFT_SHOULDER', 'LEFT_ELBOW')),
+    ('right_shoulder', ('RIGHT_HIP', 'RIGHT_SHOULDER', 'RIGHT_ELBOW')),
+    ('left_elbow', ('LEFT_SHOULDER', 'LEFT_ELBOW', 'LEFT_WRIST')),
+    ('right_elbow', ('RIGHT_SHOULDER', 'RIGHT_ELBOW', 'RIGHT_WRIST')),
+    ('spine', ('LEFT_SHOULDER', 'LEFT_HIP', 'LEFT_KNEE')),
+    ('left_knee', ('LEFT_HIP', 'LEFT_KNEE', 'LEFT_ANKLE')),
+)
+
+# 어깨 회전 각도 정의: (왼쪽 어깨, 오른쪽 어깨, 코)
+SHOULDER_ROTATION = ('LEFT_SHOULDER', 'RIGHT_SHOULDER', 'NOSE')
+
+# 각도 출력 순서 (_calculate_angles와 동일)
+ANGLE_NAMES = tuple(name for name, _ in JOINT_ANGLES) + ('shoulder_rotation',)
+
+_JOINT_INDICES = np.array(
+    [[POSE_LANDMARKS[name] for name in points] for _, points in JOINT_ANGLES],
+    dtype=np.intp
+)
+_ROTATION_INDICES = np.array([POSE_LANDMARKS[name] for name in SHOULDER_ROTATION], dtype=np.intp)
+
+
+class LandmarkBatch:
+    """(N, 33, 3) float64 배열 기반 랜드마크 묶음
+
+    검출되지 않은 랜드마크는 NaN으로 저장한다.
+    """
+
+    def __init__(self, data: np.ndarray):
+        data = np.asarray(data, dtype=np.float64)
+        if data.ndim == 2:
+            data = data[np.newaxis]
+        if data.ndim != 3 or data.shape[1:] != (NUM_LANDMARKS, 3):
+            raise ValueError(f"Expected landmark array of shape (N, {NUM_LANDMARKS}, 3), got {data.shape}")
+        self.data = data
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    @classmethod
+    def empty(cls, num_frames: int) -> "LandmarkBatch":
+        """NaN으로 채운 묶음 생성"""
+        return cls(np.full((num_frames, NUM_LANDMARKS, 3), np.nan, dtype=np.float64))
+
+    @classmethod
+    def from_dicts(cls, frames: Iterable[Optional[Dict[str, Tuple[float, float, float]]]]) -> "LandmarkBatch":
+        """이름 → (x, y, z) 딕셔너리 목록으로 생성"""
+        frames = list(frames)
+        batch = cls.empty(len(frames))
+        for i, landmarks in enumerate(frames):
+            if not landmarks:
+                continue
+            for name, point in landmarks.items():
+                idx = POSE_LANDMARKS.get(name)
+                if idx is not None:
+                    batch.data[i, idx] = point
+        return batch
+
+    @classmethod
+    def from_pose_landmarks(cls, pose_landmarks_list: List) -> "LandmarkBatch":
+        """MediaPipe pose_landmarks 목록으로 생성 (33개 전체)"""
+        batch = cls.empty(len(pose_landmarks_list))
+        for i, pose_landmarks in enumerate(pose_landmarks_list):
+            if pose_landmarks is None:
+                continue
+            batch.data[i] = [(lm.x, lm.y, lm.z) for lm in pose_landmarks.landmark]
+        return batch
+
+    def to_dict(self, index: int) -> Dict[str, Tuple[float, float, float]]:
+        """한 프레임을 이름 → (x, y, z) 딕셔너리로 변환"""
+        frame = self.data[index]
+        return {
+            name: tuple(float(v) for v in frame[idx])
+            for name, idx in POSE_LANDMARKS.items()
+            if not np.isnan(frame[idx]).any()
+        }
+
+
+def calculate_angles_batch(batch: LandmarkBatch) -> Dict[str, np.ndarray]:
+    """N개 프레임의 주요 관절 각도를 한 번에 계산
+
+    반환값은 각도 이름 → (N,) float64 배열이며, 필요한 랜드마크가
+    없는 프레임은 NaN이다.
+    """
+    xy = batch.data[:, :, :2]
+
+    # 세 점 관절 각도: (N, 관절 수, 2)
+    p1 = xy[:, _JOINT_INDICES[:, 0]]
+    p2 = xy[:, _JOINT_INDICES[:, 1]]
+    p3 = xy[:, _JOINT_INDICES[:, 2]]
+    vec1 = p1 - p2
+    vec2 = p3 - p2
+
+    dot = vec1[..., 0] * vec2[..., 0] + vec1[..., 1] * vec2[..., 1]
+    norm1 = np.sqrt(vec1[..., 0] * vec1[..., 0] + vec1[..., 1] * vec1[..., 1])
+    norm2 = np.sqrt(vec2[..., 0] * vec2[..., 0] + vec2[..., 1] * vec2[..., 1])
+    cos_angle = np.clip(dot / (norm1 * norm2 + 1e-6), -1.0, 1.0)
+    joint_angles = np.arccos(cos_angle) * 180 / np.pi
+
+    # 어깨 회전: 어깨 중심에서 코까지 벡터의 수평선 대비 각도
+    left = xy[:, _ROTATION_INDICES[0]]
+    right = xy[:, _ROTATION_INDICES[1]]
+    nose = xy[:, _ROTATION_INDICES[2]]
+    center = (left + right) / 2
+    rotation = np.arctan2(nose[:, 1] - center[:, 1], nose[:, 0] - center[:, 0]) * 180 / np.pi
+
+    angles = {name: joint_angles[:, i] for i, (name, _) in enumerate(JOINT_ANGLES)}
+    angles['shoulder_rotation'] = rotation
+    return angles
+
+
+def angles_for_frame(angles: Dict[str, np.ndarray], index: int) -> Dict[str, float]:
+    """배치 결과에서 한 프레임의 각도 딕셔너리 추출 (NaN 제외)"""
+    result = {}
+    for name in ANGLE_NAMES:
+        value = angles[name][index]
+        if not np.isnan(value):
+            result[name] = float(value)
+    return result
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, File, UploadFile, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, File, Form, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, StreamingResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
@@ -8,17 +8,27 @@ import mediapipe as mp
 import json
 import asyncio
 import base64
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 import logging
 from datetime import datetime
 import os
+import uuid
 
+import config
+from admission import CLOSE_TRY_AGAIN_LATER, AdmissionController, AdmissionRejected
 from ai_coach import AICoach
+from inference_pool import InferencePool, InferencePoolFull
+from pipeline import PosePipeline
 from pose_analyzer import PoseAnalyzer
+from response_encoder import ResponseEncoder
+from session_store import create_session_store
 from training_session import TrainingSession
 from report_generator import ReportGenerator
-from database import Database
+from database import AsyncDatabase
+from frame_log import purge_frame_logs
+from frame_protocol import TRAINING_MODES
+from video_analysis import VideoAnalyzer, probe_video, remove_upload, save_upload
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -39,10 +49,22 @@ if os.path.exists("reports"):
     app.mount("/api/reports", StaticFiles(directory="reports"), name="reports")
 
 # 전역 변수
-pose_analyzer = PoseAnalyzer()
+inference_pool = InferencePool()
+# 실시간 분석 세션 수락 제어
+admission = AdmissionController(inference_pool)
+# 클라이언트가 보낸 랜드마크 분석용 (모델 없이 각도/자세 평가만 수행)
+landmark_analyzer = PoseAnalyzer(load_models=False)
+# 연결별 실시간 분석 파이프라인
+active_pipelines = {}
+# 실시간 분석 세션 상태 (여러 워커 프로세스 간 세션 재개용)
+session_store = create_session_store()
 ai_coach = AICoach()
-db = Database()
+# 데이터베이스 쿼리는 전용 스레드 풀에서 실행 (이벤트 루프를 막지 않음)
+db = AsyncDatabase()
 report_generator = ReportGenerator()
+video_analyzer = VideoAnalyzer()
+# 서버 실행 중 계속 도는 백그라운드 태스크 (종료 시 취소)
+background_tasks = set()
 
 class TrainingMode(BaseModel):
     mode: str  # "beginner", "intermediate", "professional"
@@ -53,6 +75,22 @@ class FeedbackRequest(BaseModel):
     timestamp: float
     user_id: Optional[str] = None
 
+@app.on_event("startup")
+async def startup():
+    inference_pool.start()
+    # 비정상 종료로 남은 프레임 로그 정리
+    purge_frame_logs()
+    background_tasks.add(asyncio.create_task(expire_sessions_periodically()))
+
+@app.on_event("shutdown")
+async def shutdown():
+    for task in background_tasks:
+        task.cancel()
+    inference_pool.shutdown()
+    video_analyzer.shutdown()
+    session_store.close()
+    await asyncio.to_thread(db.close)
+
 @app.get("/")
 async def root():
     return {"message": "GolfLink AI Coach API", "version": "1.0.0"}
@@ -67,71 +105,212 @@ async def websocket_pose_analysis(websocket: WebSocket):
     await websocket.accept()
     logger.info("WebSocket connection established")
     
-    session = TrainingSession()
+    # 응답 형식 협상 (기본값: 기존 전체 JSON 응답)
+    encoder = ResponseEncoder.from_query(websocket.query_params)
+    if encoder.compact:
+        await encoder.send(websocket, encoder.describe())
+    
+    # ?inference=client: 브라우저에서 자세를 추정해 랜드마크만 보내는 세션 (추론 풀을 쓰지 않음)
+    client_inference = websocket.query_params.get("inference") == "client"
+    
+    # 과부하 시 새 세션은 대기열에서 기다리거나 거절 (기존 세션 보호)
+    if not await admit_session(websocket, encoder, client_inference):
+        return
+    
+    stream_id = uuid.uuid4().hex
+    # 훈련 기록을 남길 사용자 (사용자 ID는 임시로 'default' 사용)
+    user_id = websocket.query_params.get("user_id", "default")
+    session = None
+    ended = False
     
     try:
-        while True:
-            # 프론트엔드에서 프레임 데이터 수신
-            data = await websocket.receive_json()
-            
-            if data.get("type") == "frame":
-                frame_base64 = data.get("frame")
-                timestamp = data.get("timestamp", 0)
-                mode = data.get("mode", "intermediate")
-                
-                # Base64 이미지 디코딩
-                image_data = base64.b64decode(frame_base64.split(",")[1])
-                nparr = np.frombuffer(image_data, np.uint8)
-                frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                
-                # 자세 분석
-                pose_results = pose_analyzer.analyze_pose(frame)
-                
-                # AI 코칭 피드백 생성
-                feedback = ai_coach.generate_feedback(
-                    pose_results, 
-                    mode=mode,
-                    timestamp=timestamp
-                )
-                
-                # 세션 데이터 기록
-                session.add_frame(pose_results, feedback, timestamp)
-                
-                # 결과 전송
-                await websocket.send_json({
-                    "type": "analysis",
-                    "pose_data": pose_results,
-                    "feedback": feedback,
-                    "timestamp": timestamp
-                })
-            
-            elif data.get("type") == "end_session":
-                # 세션 종료 및 리포트 생성
-                session_data = session.get_session_data()
-                report_url = await report_generator.generate_report(session_data)
-                
-                await websocket.send_json({
-                    "type": "session_end",
-                    "report_url": report_url,
-                    "summary": session_data.get("summary", {})
-                })
-                break
+        # ?session_id=로 끊긴 세션 재개 (다른 워커 프로세스에서 시작한 세션도 가능)
+        # ?mode=: 훈련 기록에 남길 난이도 (재개한 세션은 저장된 난이도 유지)
+        mode = websocket.query_params.get("mode")
+        if mode not in TRAINING_MODES.values():
+            mode = "intermediate"
+        session, resumed = await asyncio.to_thread(
+            open_training_session, websocket.query_params.get("session_id"), stream_id, mode, user_id
+        )
+        await encoder.send(websocket, {
+            "type": "session",
+            "session_id": session.session_id,
+            "resumed": resumed,
+            "frames": session.frame_count
+        })
+        
+        # 수신/디코딩/추론/전송 스테이지를 동시에 실행 (추론 워커는 첫 이미지 프레임에서 배정)
+        pipeline = PosePipeline(
+            websocket, stream_id, session, encoder, inference_pool, landmark_analyzer, ai_coach, session_store,
+            client_inference=client_inference
+        )
+        active_pipelines[stream_id] = pipeline
+        
+        await pipeline.run()
+        ended = True
+        
+        # 세션 종료, 훈련 기록 저장 및 리포트 생성
+        session_data = session.get_session_data(include_frames=False)
+        await save_training_session(session, user_id, session_data)
+        report_url = await report_generator.generate_report(session_data)
+        
+        await encoder.send(websocket, {
+            "type": "session_end",
+            "report_url": report_url,
+            "summary": session_data.get("summary", {}),
+            "frame_stats": pipeline.frame_stats()
+        })
                 
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
-        await websocket.send_json({
+        await encoder.send(websocket, {
             "type": "error",
             "message": str(e)
         })
+    finally:
+        active_pipelines.pop(stream_id, None)
+        inference_pool.close_session(stream_id)
+        try:
+            if session is not None:
+                try:
+                    await asyncio.to_thread(close_training_session, session, stream_id, ended)
+                except Exception as e:
+                    logger.error(f"Failed to save session state: {e}")
+        finally:
+            # 핸들러가 취소되어도 수락 슬롯은 반드시 반환
+            admission.release(client_inference)
+
+def open_training_session(resume_id: Optional[str], owner: str, mode: str = "intermediate", user_id: str = "default"):
+    """저장된 세션 재개 또는 새 세션 생성 (세션, 재개 여부 반환)"""
+    if resume_id:
+        state = session_store.claim(resume_id, owner)
+        if state is not None:
+            logger.info(f"Resuming session {resume_id} with {len(state['frames'])} frames")
+            return TrainingSession.restore(state), True
+    
+    session = TrainingSession(mode=mode)
+    # 재개되지 않고 만료되면 이 사용자의 훈련 기록으로 저장
+    session_store.create(session.session_id, owner, {**session.to_meta(), "user_id": user_id})
+    return session, False
+
+def close_training_session(session: TrainingSession, owner: str, ended: bool):
+    """종료된 세션은 삭제하고, 끊긴 세션은 재개할 수 있도록 남은 프레임 기록"""
+    try:
+        if ended:
+            session_store.delete(session.session_id, owner)
+        elif not session_store.checkpoint(session, owner):
+            # 다른 연결이 재개했거나 만료되어 삭제된 세션 (이 연결의 남은 프레임은 기록되지 않음)
+            logger.warning(
+                f"Checkpoint of session {session.session_id} rejected, "
+                f"{session.frame_count - session.persisted_frames} frames not saved"
+            )
+    finally:
+        session.close()
+
+async def expire_sessions():
+    """재개되지 않고 만료된 세션을 훈련 기록으로 저장"""
+    states = await asyncio.to_thread(session_store.pop_expired, config.SESSION_RESUME_TTL_S)
+    for state in states:
+        session = await asyncio.to_thread(TrainingSession.restore, state)
+        try:
+            # 프레임이 없는 세션은 기록하지 않음
+            if session.frame_count:
+                logger.info(f"Saving expired session {session.session_id} with {session.frame_count} frames")
+                # 마지막으로 프레임을 기록한 시각을 종료 시각으로 사용
+                session_data = session.get_session_data(
+                    include_frames=False, end_time=datetime.fromtimestamp(state["updated_at"])
+                )
+                await save_training_session(session, state.get("user_id", "default"), session_data)
+        finally:
+            session.close()
+    return len(states)
+
+async def expire_sessions_periodically():
+    """만료된 세션을 주기적으로 훈련 기록으로 저장 (백그라운드 태스크)"""
+    while True:
+        await asyncio.sleep(config.SESSION_EXPIRE_INTERVAL_S)
+        try:
+            await expire_sessions()
+        except Exception as e:
+            logger.error(f"Failed to expire sessions: {e}")
+
+async def save_training_session(session: TrainingSession, user_id: str, session_data: Dict):
+    """끝난 세션을 훈련 기록으로 저장 (프레임 로그는 세션을 닫아 삭제하기 전에 복사, 실패해도 리포트는 생성)"""
+    if session.frame_log is None:
+        # 프레임 로그가 없으면 메모리에 남은 프레임으로 프레임별 지표 기록
+        session_data = {**session_data, "frames": session.frame_records(session.first_frame)}
+    try:
+        await db.create_training_session(
+            user_id,
+            session.mode,
+            round(session_data["duration"] / 60),
+            session_id=session.session_id,
+            start_time=session.start_time
+        )
+        await db.update_training_session(session.session_id, session_data, frame_log=session.frame_log)
+    except Exception as e:
+        logger.error(f"Failed to save training session {session.session_id}: {e}")
+
+async def admit_session(websocket: WebSocket, encoder: ResponseEncoder, client_inference: bool = False) -> bool:
+    """세션 수락 (거절 시 재시도 대기 시간을 알리고 1013 코드로 연결 종료)"""
+    if client_inference:
+        # 브라우저 추론 세션은 추론 풀 부하와 무관하므로 대기 없이 수락 또는 거절
+        reason = admission.try_admit_client()
+        if reason is None:
+            return True
+        await reject_session(websocket, encoder, AdmissionRejected(reason, admission.retry_after))
+        return False
+    
+    reason = admission.try_admit()
+    if reason is None:
+        return True
+    
+    ticket = None
+    try:
+        ticket = admission.enqueue(reason)
+        await encoder.send(websocket, {
+            "type": "queued",
+            "reason": reason,
+            "position": admission.queue_position(ticket),
+            "timeout": admission.queue_timeout
+        })
+        await admission.wait_for_slot(ticket, reason)
+    except AdmissionRejected as e:
+        await reject_session(websocket, encoder, e)
+        return False
+    except Exception:
+        # 대기 중 연결이 끊긴 경우
+        admission.leave(ticket)
+        return False
+    
+    try:
+        await encoder.send(websocket, {"type": "admitted"})
+    except Exception:
+        admission.release()
+        return False
+    return True
+
+async def reject_session(websocket: WebSocket, encoder: ResponseEncoder, e: AdmissionRejected):
+    """거절 사유와 재시도 대기 시간을 알리고 연결 종료"""
+    logger.info(f"Pose session rejected ({e.reason}), retry after {e.retry_after}s")
+    await encoder.send(websocket, {
+        "type": "rejected",
+        "reason": e.reason,
+        "retry_after": e.retry_after
+    })
+    await websocket.close(code=CLOSE_TRY_AGAIN_LATER, reason=f"retry_after={e.retry_after}")
 
 @app.post("/api/analyze-frame")
 async def analyze_frame(request: FeedbackRequest):
     """단일 프레임 분석"""
     try:
         # 자세 분석
-        pose_results = pose_analyzer.analyze_pose_from_data(request.frame_data)
+        if "landmarks" in request.frame_data:
+            pose_results = landmark_analyzer.analyze_pose_from_data(request.frame_data)
+        else:
+            pose_results = await inference_pool.analyze(request.frame_data)
         
         # AI 피드백 생성
         feedback = ai_coach.generate_feedback(pose_results)
@@ -141,13 +320,89 @@ async def analyze_frame(request: FeedbackRequest):
             "feedback": feedback,
             "timestamp": request.timestamp
         })
+    except InferencePoolFull as e:
+        # 워커 대기열이 가득 찼거나 재시작 중 (잠시 뒤 다시 요청하면 처리 가능)
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(admission.retry_after)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+class UploadStreamingResponse(StreamingResponse):
+    """응답이 끝나면 업로드 임시 파일을 삭제하는 스트리밍 응답
+
+    클라이언트가 응답 시작 전에 끊거나 전송 중 오류가 나면 제너레이터의 finally나
+    BackgroundTask가 실행되지 않으므로, 응답 처리 전체를 감싸 항상 삭제한다.
+    """
+    
+    def __init__(self, path: str, content, **kwargs):
+        super().__init__(content, **kwargs)
+        self.path = path
+    
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            try:
+                # 남은 구간 작업 취소 (분석 제너레이터의 finally 실행)
+                await self.body_iterator.aclose()
+            finally:
+                remove_upload(self.path)
+
+@app.post("/api/analyze-video")
+async def analyze_video(file: UploadFile = File(...), mode: str = Form("intermediate")):
+    """스윙 영상 업로드 분석 (프레임별 결과를 NDJSON으로 스트리밍)"""
+    path = await save_upload(file)
+    try:
+        info = await asyncio.to_thread(probe_video, path)
+    except BaseException as e:
+        remove_upload(path)
+        if isinstance(e, ValueError):
+            raise HTTPException(status_code=400, detail=str(e))
+        raise
+    
+    async def stream_results():
+        async for record in video_analyzer.analyze(path, mode=mode, info=info):
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+    
+    return UploadStreamingResponse(path, stream_results(), media_type="application/x-ndjson")
+
+@app.get("/api/inference/stats")
+async def get_inference_stats():
+    """추론 워커 풀 통계 조회"""
+    return inference_pool.get_stats()
+
+@app.get("/api/admission/stats")
+async def get_admission_stats():
+    """실시간 분석 세션 수락/대기/거절 통계 조회"""
+    return admission.get_stats()
+
+@app.get("/api/db/stats")
+async def get_db_stats():
+    """데이터베이스 쓰기 지연 큐 통계 조회"""
+    return db.get_write_stats()
+
+@app.get("/health/ready")
+async def readiness_check():
+    """로드 밸런서용 준비 상태 (새 세션을 받을 수 없으면 503)
+
+    여러 서버 워커로 실행하면 요청을 받은 워커 프로세스의 상태만 반영한다.
+    """
+    if not admission.accepting():
+        return JSONResponse(
+            {"status": "overloaded", "reason": admission.overload_reason() or "queued_sessions"},
+            status_code=503,
+            headers={"Retry-After": str(admission.retry_after)}
+        )
+    return {"status": "ready"}
+
+@app.get("/api/pipeline/stats")
+async def get_pipeline_stats():
+    """연결별 분석 파이프라인 스테이지 통계 조회"""
+    return {"pipelines": [pipeline.get_stats() for pipeline in active_pipelines.values()]}
+
 @app.post("/api/training/start")
 async def start_training(training_mode: TrainingMode):
     """훈련 세션 시작"""
-    session_id = db.create_training_session(
+    session_id = await db.create_training_session(
         user_id="default",
         mode=training_mode.mode,
         duration=training_mode.duration
@@ -157,21 +412,33 @@ async def start_training(training_mode: TrainingMode):
 @app.get("/api/training/session/{session_id}")
 async def get_session(session_id: str):
     """훈련 세션 정보 조회"""
-    session = db.get_training_session(session_id)
+    session = await db.get_training_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     return session
 
 @app.get("/api/training/user/{user_id}/history")
-async def get_training_history(user_id: str):
-    """사용자 훈련 이력 조회"""
-    history = db.get_user_history(user_id)
-    return {"history": history}
+async def get_training_history(user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                               fields: Optional[str] = None, since: Optional[str] = None,
+                               until: Optional[str] = None):
+    """사용자 훈련 이력 조회 (최근 순 페이지, 다음 페이지는 next_cursor를 cursor로 전달)
+    
+    fields: 쉼표로 구분한 열 이름 (예: mode,start_time,average_score)
+    since/until: ISO 날짜/시각, start_time 범위 (since 이상, until 미만)
+    """
+    try:
+        # 저장된 start_time과 같은 형식으로 맞춰 문자열 비교
+        since = str(datetime.fromisoformat(since)) if since else None
+        until = str(datetime.fromisoformat(until)) if until else None
+        field_list = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+        return await db.get_user_history_page(user_id, limit, cursor, field_list, since, until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/api/report/generate")
 async def generate_report(session_id: str):
     """훈련 리포트 생성"""
-    session_data = db.get_training_session(session_id)
+    session_data = await db.get_training_session(session_id)
     if not session_data:
         raise HTTPException(status_code=404, detail="Session not found")
     
@@ -187,16 +454,32 @@ async def generate_report(session_id: str):
 @app.get("/api/user/{user_id}/stats")
 async def get_user_stats(user_id: str):
     """사용자 통계 조회"""
-    stats = db.get_user_stats(user_id)
+    stats = await db.get_user_stats(user_id)
     return stats
 
+@app.get("/api/user/{user_id}/angles/{angle_name}/trend")
+async def get_angle_trend(user_id: str, angle_name: str, phase: Optional[str] = None, days: int = 90):
+    """관절 각도의 일별 추이 조회 (예: impact 단계 left_elbow, 최근 90일)"""
+    try:
+        trend = await db.get_angle_trend(user_id, angle_name, phase, days)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"angle": angle_name, "phase": phase, "days": days, "trend": trend}
+
 @app.get("/api/user/{user_id}/achievements")
 async def get_achievements(user_id: str):
     """사용자 성취도 조회"""
-    achievements = db.get_user_achievements(user_id)
+    achievements = await db.get_user_achievements(user_id)
     return achievements
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # 여러 워커로 실행하려면 앱을 import 경로로 전달해야 함
+    uvicorn.run(
+        "main:app" if config.SERVER_WORKERS > 1 else app,
+        host="0.0.0.0",
+        port=8000,
+        workers=config.SERVER_WORKERS,
+        ws_per_message_deflate=config.WS_PER_MESSAGE_DEFLATE
+    )
 
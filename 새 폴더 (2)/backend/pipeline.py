@@ -0,0 +1,330 @@
+from typing import Dict, Optional
+from fastapi import WebSocketDisconnect
+import asyncio
+import logging
+import time
+
+import config
+from capture_control import CaptureController
+from frame_buffer import LatestFrameSlot
+from frame_protocol import frame_payload, parse_binary_message, parse_text_message
+from inference_pool import InferencePoolFull, InferenceWorkerUnavailable
+from session_store import SessionSuperseded
+
+logger = logging.getLogger(__name__)
+
+# 스테이지 사이 큐의 종료 표시
+_END = object()
+
+
+class StageStats:
+    """파이프라인 스테이지 처리 통계"""
+
+    def __init__(self, name: str, output_queue: Optional[asyncio.Queue] = None, output_name: Optional[str] = None):
+        self.name = name
+        self.output_queue = output_queue
+        self.output_name = output_name
+        self.processed = 0
+        self.busy_seconds = 0.0
+
+    def record(self, started: float):
+        self.processed += 1
+        self.busy_seconds += time.perf_counter() - started
+
+    def get_stats(self) -> Dict:
+        stats = {
+            "stage": self.name,
+            "processed": self.processed,
+            "avg_ms": round(self.busy_seconds / self.processed * 1000, 2) if self.processed else 0.0
+        }
+        if self.output_queue is not None:
+            stats["output"] = {
+                "queue": self.output_name,
+                "size": self.output_queue.qsize(),
+                "capacity": self.output_queue.maxsize
+            }
+        return stats
+
+
+class PosePipeline:
+    """WebSocket 연결별 수신 → 디코딩 → 추론 → 전송 파이프라인
+
+    각 스테이지는 별도 태스크로 동시에 실행되며 크기가 제한된 큐로
+    연결된다. 큐는 FIFO이고 스테이지마다 소비자가 하나이므로 프레임
+    순서가 유지된다. 이미지 디코딩/추론은 워커 프로세스에서, 나머지
+    CPU 작업은 스레드에서 실행해 이벤트 루프를 막지 않는다.
+    """
+
+    def __init__(self, websocket, stream_id: str, session, encoder, inference_pool, landmark_analyzer, ai_coach,
+                 session_store=None, client_inference: bool = False):
+        self.websocket = websocket
+        self.stream_id = stream_id
+        self.session = session
+        self.session_store = session_store
+        self.encoder = encoder
+        self.inference_pool = inference_pool
+        self.landmark_analyzer = landmark_analyzer
+        self.ai_coach = ai_coach
+        # 브라우저 추론 세션은 랜드마크만 분석 (이미지 프레임은 버림)
+        self.client_inference = client_inference
+        # 추론 워커 세션은 첫 이미지 프레임에서 엶 (랜드마크만 보내는 세션은 워커를 쓰지 않음)
+        self.worker_id: Optional[int] = None
+
+        # 분석이 밀리면 가장 최근 프레임만 남김
+        self.frame_slot = LatestFrameSlot(max_age=config.FRAME_MAX_AGE_MS / 1000)
+        # 추론 중인 프레임 (워커가 쉬지 않도록 미리 제출)
+        self.inflight: asyncio.Queue = asyncio.Queue(maxsize=config.PIPELINE_INFLIGHT_FRAMES)
+        # 전송 대기 메시지
+        self.outbox: asyncio.Queue = asyncio.Queue(maxsize=config.PIPELINE_SEND_QUEUE)
+
+        self.stages = [
+            StageStats("receive", output_name="latest_frame"),
+            StageStats("decode", self.inflight, "inflight"),
+            StageStats("infer", self.outbox, "outbox"),
+            StageStats("send"),
+        ]
+        self._last_feedback: Optional[Dict] = None
+        # 스레드에서 실행 중인 코칭 (세션 기록/체크포인트, 태스크를 취소해도 스레드는 계속 실행됨)
+        self._coaching: Optional[asyncio.Future] = None
+        self._last_summary = time.monotonic()
+        # 서버 부하에 따른 클라이언트 캡처 fps/해상도/JPEG 품질 조절
+        self.capture = CaptureController() if config.CAPTURE_CONTROL else None
+
+    def frame_stats(self) -> Dict:
+        """수신/처리/폐기/건너뛴 프레임 수"""
+        return {**self.frame_slot.get_stats(), "skipped": self.session.skipped_frames}
+
+    def get_stats(self) -> Dict:
+        """스테이지 구성 및 처리 통계"""
+        return {
+            "stream_id": self.stream_id,
+            "stages": [stage.get_stats() for stage in self.stages],
+            "frame_stats": self.frame_stats(),
+            "capture": self.capture.get_stats() if self.capture else None
+        }
+
+    async def run(self):
+        """모든 스테이지 실행 (end_session 수신 후 처리 중인 프레임까지 전송하면 종료)
+
+        연결이 끊기면 WebSocketDisconnect가 전달된다. 반환하거나 예외를 전달하기
+        전에 실행 중인 코칭 스레드가 끝나기를 기다리므로, 이후에는 세션을 바로
+        기록하거나 닫을 수 있다.
+        """
+        if self.capture:
+            # 클라이언트가 서버 기준 캡처 설정으로 시작하도록 먼저 전송
+            await self.outbox.put(self.capture.control_message())
+        tasks = [
+            asyncio.create_task(self._receive()),
+            asyncio.create_task(self._decode()),
+            asyncio.create_task(self._infer()),
+            asyncio.create_task(self._send()),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await self._finish_coaching()
+
+    async def _finish_coaching(self):
+        """실행 중인 코칭 스레드가 끝날 때까지 대기 (취소하지 않음)"""
+        coaching = self._coaching
+        if coaching is None:
+            return
+        await asyncio.wait({coaching})
+        # 취소된 추론 스테이지 대신 결과 확인 (예외는 추론 스테이지에서 이미 전달됨)
+        if not coaching.cancelled():
+            coaching.exception()
+
+    async def _receive(self):
+        """수신 스테이지: 메시지를 해석해 최신 프레임 슬롯에 저장"""
+        stage = self.stages[0]
+        try:
+            while True:
+                message = await self.websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+
+                started = time.perf_counter()
+                # 바이너리 프레임 또는 기존 JSON 메시지 (해석할 수 없는 메시지만 버리고 연결은 유지)
+                try:
+                    if message.get("bytes") is not None:
+                        data = parse_binary_message(message["bytes"])
+                    else:
+                        data = parse_text_message(message["text"])
+                    if not isinstance(data, dict):
+                        raise ValueError("메시지는 JSON 객체여야 합니다.")
+                except ValueError as e:
+                    logger.debug(f"Pose stream {self.stream_id} dropped an invalid message: {e}")
+                    self.frame_slot.mark_dropped("invalid_message")
+                    continue
+
+                if data.get("type") in ("frame", "landmarks"):
+                    data["received_at"] = started
+                    self.frame_slot.put(data)
+                    stage.record(started)
+                elif data.get("type") == "end_session":
+                    break
+        finally:
+            self.frame_slot.close()
+
+    async def _decode(self):
+        """디코딩 스테이지: 이미지 버퍼 추출 후 추론 제출"""
+        stage = self.stages[1]
+        loop = asyncio.get_running_loop()
+        while True:
+            data = await self.frame_slot.get()
+            if data is None:
+                break
+
+            started = time.perf_counter()
+            if data.get("type") == "landmarks":
+                # 브라우저에서 추정한 랜드마크: 이미지 디코딩/추론 없이 분석
+                result = loop.run_in_executor(None, self.landmark_analyzer.analyze_landmarks, data.get("landmarks"))
+            elif self.client_inference:
+                # 추론 풀 한도에 포함되지 않은 세션은 서버 추론을 쓰지 않음
+                self.frame_slot.mark_dropped("client_inference")
+                continue
+            else:
+                if self.worker_id is None:
+                    # 세션을 하나의 추론 워커에 고정 (MediaPipe 추적 상태 유지)
+                    self.worker_id = self.inference_pool.open_session(self.stream_id)
+                    logger.info(f"Pose stream {self.stream_id} assigned to worker {self.worker_id}")
+                try:
+                    if "frame_bytes" in data:
+                        image_data, image_offset = frame_payload(data)
+                    else:
+                        # JSON 메시지의 Base64 디코딩은 스레드에서 실행
+                        image_data, image_offset = await asyncio.to_thread(frame_payload, data)
+                except (ValueError, TypeError, AttributeError, IndexError) as e:
+                    # frame 필드가 없거나 data URL/Base64 형식이 잘못된 프레임
+                    logger.debug(f"Pose stream {self.stream_id} dropped an invalid frame: {e}")
+                    self.frame_slot.mark_dropped("invalid_frame")
+                    continue
+                # 이미지 디코딩은 워커에서 수행
+                result = asyncio.ensure_future(self.inference_pool.analyze(
+                    image_data,
+                    session_id=self.stream_id,
+                    mode=data.get("mode", "intermediate"),
+                    offset=image_offset
+                ))
+            stage.record(started)
+
+            # 추론 중인 프레임 수가 한도에 도달하면 대기
+            await self.inflight.put((data, result))
+
+        await self.inflight.put(_END)
+
+    async def _infer(self):
+        """추론 스테이지: 제출 순서대로 결과를 받아 코칭 피드백 생성 및 세션 기록"""
+        stage = self.stages[2]
+        try:
+            while True:
+                item = await self.inflight.get()
+                if item is _END:
+                    break
+
+                data, result = item
+                try:
+                    pose_results = await result
+                except InferenceWorkerUnavailable:
+                    # 워커 재시작/분석기 준비 중에는 프레임만 버리고 세션은 유지
+                    self.frame_slot.mark_dropped("worker_unavailable")
+                    await self._update_capture()
+                    continue
+                except InferencePoolFull:
+                    self.frame_slot.mark_dropped("queue_full")
+                    await self._update_capture()
+                    continue
+                except (ValueError, TypeError, RuntimeError) as e:
+                    # 잘못된 랜드마크 배열, 디코딩할 수 없는 이미지 등은 그 프레임만 버림
+                    reason = "invalid_landmarks" if data.get("type") == "landmarks" else "inference_error"
+                    logger.debug(f"Pose stream {self.stream_id} dropped a frame ({reason}): {e}")
+                    self.frame_slot.mark_dropped(reason)
+                    await self._update_capture()
+                    continue
+
+                started = time.perf_counter()
+                if self.capture and data.get("type") == "frame":
+                    self.capture.record(started - data["received_at"])
+                # 연결이 끊겨 이 스테이지가 취소되어도 코칭 스레드는 run()이 끝나기 전에 기다림
+                self._coaching = asyncio.ensure_future(asyncio.to_thread(self._coach, pose_results, data))
+                feedback = await asyncio.shield(self._coaching)
+                self.frame_slot.mark_processed()
+                message = self.encoder.analysis_message(
+                    pose_results,
+                    feedback,
+                    data.get("timestamp", 0),
+                    self.frame_stats()
+                )
+                stage.record(started)
+
+                await self.outbox.put(message)
+                await self._update_capture()
+                await self._send_summary()
+        finally:
+            # 남은 추론 요청 정리
+            while not self.inflight.empty():
+                item = self.inflight.get_nowait()
+                if item is not _END:
+                    item[1].cancel()
+
+        await self.outbox.put(_END)
+
+    async def _send_summary(self):
+        """주기적으로 현재까지의 세션 요약 전송 (누적 통계라 프레임 수와 무관하게 즉시 생성)"""
+        interval = config.LIVE_SUMMARY_INTERVAL_S
+        if not interval or not self.encoder.live_summary:
+            return
+        now = time.monotonic()
+        if now - self._last_summary < interval:
+            return
+        self._last_summary = now
+        await self.outbox.put({"type": "summary", **self.session.get_summary()})
+
+    async def _update_capture(self):
+        """평가 주기마다 캡처 설정을 조절하고, 바뀌면 control 메시지 전송"""
+        if self.capture is None:
+            return
+        control = self.capture.update(self.frame_slot.get_stats(), self.inference_pool.load())
+        if control is not None:
+            logger.info(f"Pose stream {self.stream_id} capture level {control['level']} ({control['reason']})")
+            await self.outbox.put(control)
+
+    def _coach(self, pose_results: Dict, data: Dict) -> Dict:
+        """AI 코칭 피드백 생성 및 세션 기록 (정지 프레임은 이전 피드백 재사용)"""
+        timestamp = data.get("timestamp", 0)
+        if pose_results.get("motion_skipped") and self._last_feedback is not None:
+            feedback = {**self._last_feedback, "timestamp": timestamp}
+        else:
+            feedback = self.ai_coach.generate_feedback(
+                pose_results,
+                mode=data.get("mode", "intermediate"),
+                timestamp=timestamp
+            )
+        self._last_feedback = feedback
+
+        # 세션 데이터 기록
+        self.session.add_frame(pose_results, feedback, timestamp)
+        # 일정 프레임마다 세션 저장소에 기록 (연결이 끊겨도 다른 워커에서 이어갈 수 있도록)
+        if self.session.frame_count - self.session.persisted_frames >= config.SESSION_CHECKPOINT_FRAMES:
+            self.checkpoint()
+        return feedback
+
+    def checkpoint(self):
+        """기록하지 않은 프레임을 세션 저장소에 기록"""
+        if self.session_store is None:
+            return
+        if not self.session_store.checkpoint(self.session, self.stream_id):
+            raise SessionSuperseded(f"Session {self.session.session_id} was resumed on another connection")
+
+    async def _send(self):
+        """전송 스테이지: 분석 결과를 클라이언트로 전송"""
+        stage = self.stages[3]
+        while True:
+            message = await self.outbox.get()
+            if message is _END:
+                break
+            started = time.perf_counter()
+            await self.encoder.send(self.websocket, message)
+            stage.record(started)
@@ -3,53 +3,229 @@ import numpy as np
 import mediapipe as mp
 from typing import Dict, List, Optional, Tuple
 import math
+import time
+
+import config
+from landmark_batch import NUM_LANDMARKS, LandmarkBatch, POSE_LANDMARKS, angles_for_frame, calculate_angles_batch
+
+# MediaPipe Pose 모델 복잡도 단계 (0: lite, 1: full, 2: heavy)
+MODEL_COMPLEXITY_TIERS = (0, 1, 2)
+
+class ComplexityController:
+    """프레임 추론 지연 시간에 따라 모델 복잡도 단계를 조절"""
+    
+    def __init__(self, target_ms: float, initial_tier: int = 2, smoothing: float = 0.2, cooldown_frames: int = 30):
+        self.target_ms = target_ms
+        self.tier = initial_tier
+        self.smoothing = smoothing
+        self.cooldown_frames = cooldown_frames
+        self.latency_ms: Optional[float] = None
+        self.frames_since_switch = 0
+        self.switch_count = 0
+    
+    def record(self, latency_ms: float) -> int:
+        """지연 시간 기록 후 다음 프레임에 사용할 단계 반환"""
+        if self.latency_ms is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latency_ms += self.smoothing * (latency_ms - self.latency_ms)
+        self.frames_since_switch += 1
+        
+        if self.frames_since_switch < self.cooldown_frames:
+            return self.tier
+        
+        if self.latency_ms > self.target_ms and self.tier > MODEL_COMPLEXITY_TIERS[0]:
+            self._switch(self.tier - 1)
+        # 한 단계 올리면 지연 시간이 대략 두 배가 되므로 여유가 충분할 때만 올림
+        elif self.latency_ms < self.target_ms * 0.5 and self.tier < MODEL_COMPLEXITY_TIERS[-1]:
+            self._switch(self.tier + 1)
+        
+        return self.tier
+    
+    def _switch(self, tier: int):
+        self.tier = tier
+        self.latency_ms = None
+        self.frames_since_switch = 0
+        self.switch_count += 1
 
 class PoseAnalyzer:
     """골프 스윙 자세 분석기"""
     
-    def __init__(self):
+    def __init__(self, model_complexity: Optional[int] = None, adaptive: Optional[bool] = None,
+                 latency_target_ms: Optional[float] = None, pinned_tiers: Optional[Dict[str, int]] = None,
+                 roi_cropping: Optional[bool] = None, motion_gating: Optional[bool] = None,
+                 load_models: bool = True):
         self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
-            model_complexity=2,
+        self.default_complexity = config.MODEL_COMPLEXITY if model_complexity is None else model_complexity
+        self.adaptive = config.ADAPTIVE_MODEL_COMPLEXITY if adaptive is None else adaptive
+        # 훈련 모드별 고정 단계 (예: {"professional": 2})
+        self.pinned_tiers = config.MODEL_COMPLEXITY_PINS if pinned_tiers is None else pinned_tiers
+        self.controller = ComplexityController(
+            latency_target_ms or config.MODEL_LATENCY_TARGET_MS,
+            initial_tier=self.default_complexity
+        )
+        
+        # 사용할 수 있는 모든 단계의 Pose 인스턴스를 미리 생성
+        # (클라이언트 랜드마크만 분석하는 경우 모델을 불러오지 않음)
+        tiers = {self.default_complexity} | set(self.pinned_tiers.values())
+        if self.adaptive:
+            tiers |= set(MODEL_COMPLEXITY_TIERS)
+        self.poses = {tier: self._create_pose(tier) for tier in sorted(tiers)} if load_models else {}
+        self.model_complexity = self.default_complexity
+        self.pose = self.poses.get(self.model_complexity)
+        self.mp_drawing = mp.solutions.drawing_utils
+        
+        # 이전 프레임 랜드마크 기반 관심 영역 (x0, y0, x1, y1 픽셀)
+        self.roi_cropping = config.ROI_CROPPING if roi_cropping is None else roi_cropping
+        self.roi: Optional[Tuple[int, int, int, int]] = None
+        self._roi_frame_shape: Optional[Tuple[int, int]] = None
+        
+        # 움직임이 없으면 이전 결과를 재사용
+        self.motion_gating = config.MOTION_GATING if motion_gating is None else motion_gating
+        self._reference_thumbnail: Optional[np.ndarray] = None
+        
+        # 프레임마다 새로 할당하지 않도록 재사용하는 변환 버퍼
+        self._buffers: Dict[str, np.ndarray] = {}
+        self._last_result: Optional[Dict] = None
+        self._consecutive_skips = 0
+        self.skipped_frames = 0
+        
+        # 관절 인덱스 (MediaPipe)
+        self.LANDMARKS = dict(POSE_LANDMARKS)
+    
+    def _create_pose(self, model_complexity: int):
+        """MediaPipe Pose 인스턴스 생성"""
+        return self.mp_pose.Pose(
+            model_complexity=model_complexity,
             enable_segmentation=False,
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
         )
-        self.mp_drawing = mp.solutions.drawing_utils
+    
+    def reset(self):
+        """모든 단계의 추적 상태 초기화"""
+        for pose in self.poses.values():
+            pose.reset()
+        self.model_complexity = self.default_complexity
+        self.pose = self.poses.get(self.model_complexity)
+        self.controller = ComplexityController(self.controller.target_ms, initial_tier=self.default_complexity)
+        self.roi = None
+        self._reference_thumbnail = None
+        self._last_result = None
+        self._consecutive_skips = 0
+        self.skipped_frames = 0
+    
+    def _select_tier(self, mode: Optional[str]) -> int:
+        """이번 프레임에 사용할 모델 복잡도 단계 결정"""
+        if mode in self.pinned_tiers:
+            return self.pinned_tiers[mode]
+        if self.adaptive:
+            return self.controller.tier
+        return self.default_complexity
+    
+    def analyze_pose(self, frame: np.ndarray, mode: Optional[str] = None) -> Dict:
+        """프레임에서 자세 분석"""
+        # 정지 프레임은 추론하지 않고 마지막 결과 재사용
+        if self.motion_gating:
+            thumbnail = self._make_thumbnail(frame)
+            if self._last_result is not None and not self._has_motion(thumbnail):
+                self._consecutive_skips += 1
+                self.skipped_frames += 1
+                return {**self._last_result, "motion_skipped": True}
+            self._adopt_reference_thumbnail(thumbnail)
+            self._consecutive_skips = 0
         
-        # 관절 인덱스 (MediaPipe)
-        self.LANDMARKS = {
-            'LEFT_SHOULDER': 11,
-            'RIGHT_SHOULDER': 12,
-            'LEFT_ELBOW': 13,
-            'RIGHT_ELBOW': 14,
-            'LEFT_WRIST': 15,
-            'RIGHT_WRIST': 16,
-            'LEFT_HIP': 23,
-            'RIGHT_HIP': 24,
-            'LEFT_KNEE': 25,
-            'RIGHT_KNEE': 26,
-            'LEFT_ANKLE': 27,
-            'RIGHT_ANKLE': 28,
-            'NOSE': 0,
-            'LEFT_EYE': 2,
-            'RIGHT_EYE': 5,
-        }
+        result = self._run_inference(frame, mode)
+        if self.motion_gating:
+            self._last_result = result
+        return result
+    
+    def _buffer(self, name: str, shape: Tuple) -> np.ndarray:
+        """이름별 재사용 버퍼 반환 (크기가 바뀐 경우에만 새로 할당)"""
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=np.uint8)
+            self._buffers[name] = buffer
+        return buffer
+    
+    def _make_thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        """움직임 감지용 작은 흑백 썸네일 생성"""
+        height, width = frame.shape[:2]
+        size = (config.MOTION_THUMBNAIL_WIDTH, max(1, round(config.MOTION_THUMBNAIL_WIDTH * height / width)))
+        small = cv2.resize(
+            frame, size,
+            dst=self._buffer("thumbnail_bgr", (size[1], size[0], 3)),
+            interpolation=cv2.INTER_AREA
+        )
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self._buffer("thumbnail", (size[1], size[0])))
+    
+    def _adopt_reference_thumbnail(self, thumbnail: np.ndarray):
+        """썸네일을 기준으로 채택 (다음 썸네일은 이전 기준 버퍼에 기록)"""
+        previous = self._reference_thumbnail
+        self._reference_thumbnail = thumbnail
+        if previous is not None:
+            self._buffers["thumbnail"] = previous
+        else:
+            self._buffers.pop("thumbnail", None)
+    
+    def _has_motion(self, thumbnail: np.ndarray) -> bool:
+        """마지막 추론 프레임 대비 움직임 여부"""
+        if self._reference_thumbnail is None or self._reference_thumbnail.shape != thumbnail.shape:
+            return True
+        # 정지 상태가 너무 오래 지속되면 주기적으로 다시 추론
+        if self._consecutive_skips >= config.MOTION_MAX_SKIPPED_FRAMES:
+            return True
+        diff = cv2.absdiff(thumbnail, self._reference_thumbnail, dst=self._buffer("motion_diff", thumbnail.shape))
+        cv2.threshold(diff, config.MOTION_PIXEL_THRESHOLD, 255, cv2.THRESH_BINARY, dst=diff)
+        changed_ratio = cv2.countNonZero(diff) / diff.size
+        return changed_ratio >= config.MOTION_MIN_CHANGED_RATIO
+    
+    def _run_inference(self, frame: np.ndarray, mode: Optional[str]) -> Dict:
+        """MediaPipe 추론 및 자세 평가"""
+        tier = self._select_tier(mode)
+        if tier != self.model_complexity:
+            # 다른 단계의 이전 추적 상태는 오래되었으므로 초기화 후 전환
+            self.poses[tier].reset()
+            self.model_complexity = tier
+            self.pose = self.poses[tier]
         
-    def analyze_pose(self, frame: np.ndarray) -> Dict:
-        """프레임에서 자세 분석"""
-        # BGR to RGB 변환
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        # 입력 해상도가 바뀌면 이전 관심 영역 좌표는 무효
+        if self.roi is not None and frame.shape[:2] != self._roi_frame_shape:
+            self._set_roi(None)
+        
+        # 관심 영역만 잘라 축소한 뒤 BGR to RGB 변환
+        roi = self.roi if self.roi_cropping else None
+        rgb_frame = self._prepare_input(frame, roi)
         
         # MediaPipe 포즈 추정
+        started = time.perf_counter()
         results = self.pose.process(rgb_frame)
+        if roi is not None and not results.pose_landmarks:
+            # 관심 영역에서 추적을 놓치면 전체 프레임으로 재시도
+            roi = None
+            self._set_roi(None)
+            results = self.pose.process(self._prepare_input(frame, None))
+        inference_ms = (time.perf_counter() - started) * 1000
+        
+        if self.roi_cropping:
+            if results.pose_landmarks:
+                if roi is not None:
+                    self._map_from_roi(results.pose_landmarks, roi, frame.shape)
+                self._update_roi(results.pose_landmarks, frame.shape)
+            else:
+                self._set_roi(None)
+        
+        # 고정 단계가 아닌 경우에만 지연 시간으로 단계 조절
+        if self.adaptive and mode not in self.pinned_tiers:
+            self.controller.record(inference_ms)
         
         if not results.pose_landmarks:
             return {
                 "detected": False,
                 "landmarks": None,
                 "angles": None,
-                "swing_phase": "none"
+                "swing_phase": "none",
+                "model_complexity": tier
             }
         
         # 랜드마크 추출
@@ -70,9 +246,85 @@ class PoseAnalyzer:
             "angles": angles,
             "swing_phase": swing_phase,
             "posture_score": posture_score,
+            "model_complexity": tier,
             "timestamp": None
         }
     
+    def _prepare_input(self, frame: np.ndarray, roi: Optional[Tuple[int, int, int, int]]) -> np.ndarray:
+        """모델 입력 이미지 생성 (관심 영역이 있으면 잘라서 축소)"""
+        # MediaPipe는 입력을 복사해 처리하므로 변환 버퍼를 다음 프레임에 재사용할 수 있음
+        if roi is None:
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._buffer("rgb", frame.shape))
+        
+        x0, y0, x1, y1 = roi
+        crop = frame[y0:y1, x0:x1]
+        scale = config.ROI_INPUT_SIZE / max(x1 - x0, y1 - y0)
+        if scale < 1.0:
+            size = (max(1, round((x1 - x0) * scale)), max(1, round((y1 - y0) * scale)))
+            crop = cv2.resize(
+                crop, size,
+                dst=self._buffer("roi_bgr", (size[1], size[0], 3)),
+                interpolation=cv2.INTER_AREA
+            )
+        return cv2.cvtColor(crop, cv2.COLOR_BGR2RGB, dst=self._buffer("roi_rgb", crop.shape))
+    
+    def _map_from_roi(self, pose_landmarks, roi: Tuple[int, int, int, int], frame_shape: Tuple):
+        """관심 영역 기준 정규화 좌표를 전체 프레임 기준으로 변환"""
+        height, width = frame_shape[:2]
+        x0, y0, x1, y1 = roi
+        roi_width = x1 - x0
+        roi_height = y1 - y0
+        for landmark in pose_landmarks.landmark:
+            landmark.x = (landmark.x * roi_width + x0) / width
+            landmark.y = (landmark.y * roi_height + y0) / height
+            # z는 이미지 너비와 같은 척도
+            landmark.z = landmark.z * roi_width / width
+    
+    def _update_roi(self, pose_landmarks, frame_shape: Tuple):
+        """현재 랜드마크로 다음 프레임의 관심 영역 계산"""
+        height, width = frame_shape[:2]
+        points = [
+            (landmark.x * width, landmark.y * height)
+            for landmark in pose_landmarks.landmark
+            if landmark.visibility >= config.ROI_MIN_VISIBILITY
+        ]
+        if len(points) < config.ROI_MIN_LANDMARKS:
+            self._set_roi(None)
+            return
+        
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        bx0, bx1, by0, by1 = min(xs), max(xs), min(ys), max(ys)
+        
+        # 랜드마크가 현재 영역 안쪽에 머물러 있으면 영역 유지 (추적 안정성)
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            margin = config.ROI_PADDING / 2 * max(bx1 - bx0, by1 - by0)
+            if bx0 - margin >= x0 and by0 - margin >= y0 and bx1 + margin <= x1 and by1 + margin <= y1:
+                return
+        
+        # 정사각형 영역으로 패딩 (스윙 중 팔 동작 여유)
+        side = max(bx1 - bx0, by1 - by0) * (1 + 2 * config.ROI_PADDING)
+        cx = (bx0 + bx1) / 2
+        cy = (by0 + by1) / 2
+        x0 = max(0, int(cx - side / 2))
+        y0 = max(0, int(cy - side / 2))
+        x1 = min(width, int(math.ceil(cx + side / 2)))
+        y1 = min(height, int(math.ceil(cy + side / 2)))
+        
+        # 영역이 프레임 대부분을 차지하면 자르는 이점이 없음
+        if x1 - x0 <= 0 or y1 - y0 <= 0 or (x1 - x0) * (y1 - y0) >= 0.8 * width * height:
+            self._set_roi(None)
+        else:
+            self._roi_frame_shape = (height, width)
+            self._set_roi((x0, y0, x1, y1))
+    
+    def _set_roi(self, roi: Optional[Tuple[int, int, int, int]]):
+        """관심 영역 변경 (입력 좌표계가 바뀌므로 추적 상태 초기화)"""
+        if roi != self.roi:
+            self.roi = roi
+            self.pose.reset()
+    
     def analyze_pose_from_data(self, frame_data: Dict) -> Dict:
         """프레임 데이터에서 자세 분석 (직렬화된 데이터용)"""
         # 이미 구현된 analyze_pose 사용
@@ -80,8 +332,47 @@ class PoseAnalyzer:
         if "frame" in frame_data:
             frame = np.array(frame_data["frame"])
             return self.analyze_pose(frame)
+        # 클라이언트에서 추정한 랜드마크인 경우
+        if "landmarks" in frame_data:
+            return self.analyze_landmarks(frame_data["landmarks"])
         return {"detected": False}
     
+    def analyze_landmarks(self, points) -> Dict:
+        """클라이언트가 보낸 33개 랜드마크로 자세 분석 (이미지 추론 없음)
+
+        points는 (33, 3) 또는 (33, 4) 형태의 [x, y, z(, visibility)] 목록이며,
+        자세가 검출되지 않은 경우 None이다.
+        """
+        if points is None:
+            return {
+                "detected": False,
+                "landmarks": None,
+                "angles": None,
+                "swing_phase": "none",
+                "source": "client"
+            }
+        
+        # 프레임 단위 계산과 같은 결과가 나오도록 float64로 계산
+        array = np.asarray(points, dtype=np.float64)
+        if array.ndim != 2 or array.shape[0] != NUM_LANDMARKS or array.shape[1] not in (3, 4):
+            raise ValueError(f"랜드마크는 {NUM_LANDMARKS}개의 [x, y, z] 값이어야 합니다.")
+        
+        batch = LandmarkBatch(array[:, :3])
+        landmarks = batch.to_dict(0)
+        angles = angles_for_frame(calculate_angles_batch(batch), 0)
+        swing_phase = self._detect_swing_phase(landmarks, angles)
+        posture_score = self._evaluate_posture(landmarks, angles)
+        
+        return {
+            "detected": True,
+            "landmarks": landmarks,
+            "angles": angles,
+            "swing_phase": swing_phase,
+            "posture_score": posture_score,
+            "source": "client",
+            "timestamp": None
+        }
+    
     def _extract_landmarks(self, pose_landmarks) -> Dict[str, Tuple[float, float, float]]:
         """랜드마크 좌표 추출"""
         landmarks = {}
@@ -90,99 +381,25 @@ class PoseAnalyzer:
             landmarks[name] = (landmark.x, landmark.y, landmark.z)
         return landmarks
     
-    def _calculate_angle(self, point1: Tuple, point2: Tuple, point3: Tuple) -> float:
-        """세 점 사이의 각도 계산"""
-        # 벡터 생성
-        vec1 = np.array([point1[0] - point2[0], point1[1] - point2[1]])
-        vec2 = np.array([point3[0] - point2[0], point3[1] - point2[1]])
-        
-        # 각도 계산 (라디안 → 도)
-        cos_angle = np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2) + 1e-6)
-        cos_angle = np.clip(cos_angle, -1.0, 1.0)
-        angle = np.arccos(cos_angle) * 180 / np.pi
-        return angle
-    
     def _calculate_angles(self, landmarks: Dict) -> Dict[str, float]:
-        """주요 관절 각도 계산"""
+        """주요 관절 각도 계산
+
+        배치 엔진(calculate_angles_batch)을 한 프레임에 대해 실행하므로
+        오프라인 일괄 계산 결과와 정확히 일치한다.
+        """
         angles = {}
         
         try:
-            # 왼쪽 어깨 각도
-            if all(k in landmarks for k in ['LEFT_HIP', 'LEFT_SHOULDER', 'LEFT_ELBOW']):
-                angles['left_shoulder'] = self._calculate_angle(
-                    landmarks['LEFT_HIP'],
-                    landmarks['LEFT_SHOULDER'],
-                    landmarks['LEFT_ELBOW']
-                )
-            
-            # 오른쪽 어깨 각도
-            if all(k in landmarks for k in ['RIGHT_HIP', 'RIGHT_SHOULDER', 'RIGHT_ELBOW']):
-                angles['right_shoulder'] = self._calculate_angle(
-                    landmarks['RIGHT_HIP'],
-                    landmarks['RIGHT_SHOULDER'],
-                    landmarks['RIGHT_ELBOW']
-                )
-            
-            # 왼쪽 팔꿈치 각도
-            if all(k in landmarks for k in ['LEFT_SHOULDER', 'LEFT_ELBOW', 'LEFT_WRIST']):
-                angles['left_elbow'] = self._calculate_angle(
-                    landmarks['LEFT_SHOULDER'],
-                    landmarks['LEFT_ELBOW'],
-                    landmarks['LEFT_WRIST']
-                )
-            
-            # 오른쪽 팔꿈치 각도
-            if all(k in landmarks for k in ['RIGHT_SHOULDER', 'RIGHT_ELBOW', 'RIGHT_WRIST']):
-                angles['right_elbow'] = self._calculate_angle(
-                    landmarks['RIGHT_SHOULDER'],
-                    landmarks['RIGHT_ELBOW'],
-                    landmarks['RIGHT_WRIST']
-                )
-            
-            # 허리 각도 (어깨-엉덩이-무릎)
-            if all(k in landmarks for k in ['LEFT_SHOULDER', 'LEFT_HIP', 'LEFT_KNEE']):
-                angles['spine'] = self._calculate_angle(
-                    landmarks['LEFT_SHOULDER'],
-                    landmarks['LEFT_HIP'],
-                    landmarks['LEFT_KNEE']
-                )
-            
-            # 무릎 각도
-            if all(k in landmarks for k in ['LEFT_HIP', 'LEFT_KNEE', 'LEFT_ANKLE']):
-                angles['left_knee'] = self._calculate_angle(
-                    landmarks['LEFT_HIP'],
-                    landmarks['LEFT_KNEE'],
-                    landmarks['LEFT_ANKLE']
-                )
-            
-            # 스윙 회전 각도 (어깨 회전)
-            if all(k in landmarks for k in ['LEFT_SHOULDER', 'NOSE', 'RIGHT_SHOULDER']):
-                shoulder_angle = self._calculate_shoulder_rotation(
-                    landmarks['LEFT_SHOULDER'],
-                    landmarks['RIGHT_SHOULDER'],
-                    landmarks['NOSE']
-                )
-                angles['shoulder_rotation'] = shoulder_angle
-            
+            batch = LandmarkBatch.from_dicts([landmarks])
+            angles = angles_for_frame(calculate_angles_batch(batch), 0)
         except Exception as e:
             print(f"Angle calculation error: {e}")
         
         return angles
     
-    def _calculate_shoulder_rotation(self, left_shoulder: Tuple, right_shoulder: Tuple, nose: Tuple) -> float:
-        """어깨 회전 각도 계산"""
-        # 어깨 중심점
-        shoulder_center = (
-            (left_shoulder[0] + right_shoulder[0]) / 2,
-            (left_shoulder[1] + right_shoulder[1]) / 2
-        )
-        
-        # 코에서 어깨 중심까지의 벡터
-        vec = (nose[0] - shoulder_center[0], nose[1] - shoulder_center[1])
-        
-        # 수평선과의 각도
-        angle = math.atan2(vec[1], vec[0]) * 180 / math.pi
-        return angle
+    def calculate_angles_batch(self, landmarks: LandmarkBatch) -> Dict[str, np.ndarray]:
+        """N개 프레임의 관절 각도 일괄 계산 (오프라인 분석/재처리용)"""
+        return calculate_angles_batch(landmarks)
     
     def _detect_swing_phase(self, landmarks: Dict, angles: Dict) -> str:
         """스윙 단계 판별"""
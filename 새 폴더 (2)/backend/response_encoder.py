@@ -0,0 +1,95 @@
+from typing import Dict, Iterable, Optional
+
+try:
+    import msgpack
+except ImportError:  # msgpack 미설치 시 JSON만 지원
+    msgpack = None
+
+# 압축 응답에서 구독할 수 있는 pose_data 필드
+POSE_FIELDS = ("detected", "landmarks", "angles", "swing_phase", "posture_score", "model_complexity", "source")
+DEFAULT_COMPACT_FIELDS = ("detected", "angles", "swing_phase", "posture_score")
+
+
+class ResponseEncoder:
+    """실시간 분석 응답 인코더
+
+    기본값은 기존과 같은 전체 JSON 응답이다. 클라이언트가 협상하면
+    구독한 필드만 보내고, 피드백은 내용이 바뀐 경우에만 보내며,
+    MessagePack 바이너리 메시지를 사용할 수 있다.
+    """
+
+    def __init__(self, response_format: str = "json", fields: Optional[Iterable[str]] = None,
+                 feedback_on_change: bool = False, include_frame_stats: bool = True, live_summary: bool = True):
+        if response_format == "msgpack" and msgpack is None:
+            response_format = "json"
+        self.response_format = response_format
+        self.compact = fields is not None or feedback_on_change or response_format == "msgpack"
+        self.fields = tuple(f for f in (fields or DEFAULT_COMPACT_FIELDS) if f in POSE_FIELDS)
+        self.feedback_on_change = feedback_on_change
+        self.include_frame_stats = include_frame_stats
+        # 세션 진행 중 summary 메시지 수신 여부
+        self.live_summary = live_summary
+        self._last_feedback_key = None
+
+    @classmethod
+    def from_query(cls, query_params) -> "ResponseEncoder":
+        """WebSocket 쿼리 파라미터로 응답 형식 협상
+
+        예: /ws/pose-analysis?format=msgpack&fields=swing_phase,posture_score&feedback=on_change&stats=0&summary=0
+        """
+        fields = query_params.get("fields")
+        return cls(
+            response_format=query_params.get("format", "json"),
+            fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+            feedback_on_change=query_params.get("feedback") == "on_change",
+            include_frame_stats=query_params.get("stats", "1") != "0",
+            live_summary=query_params.get("summary", "1") != "0"
+        )
+
+    def describe(self) -> Dict:
+        """협상된 응답 형식"""
+        return {
+            "type": "response_format",
+            "format": self.response_format,
+            "compact": self.compact,
+            "fields": list(self.fields) if self.compact else list(POSE_FIELDS),
+            "feedback": "on_change" if self.feedback_on_change else "always",
+            "summary": self.live_summary
+        }
+
+    def analysis_message(self, pose_data: Dict, feedback: Dict, timestamp: float, frame_stats: Dict) -> Dict:
+        """분석 결과 메시지 생성"""
+        if not self.compact:
+            return {
+                "type": "analysis",
+                "pose_data": pose_data,
+                "feedback": feedback,
+                "timestamp": timestamp,
+                "frame_stats": frame_stats
+            }
+
+        message = {
+            "type": "analysis",
+            "pose_data": {f: pose_data[f] for f in self.fields if pose_data.get(f) is not None},
+            "timestamp": timestamp
+        }
+        if not self.feedback_on_change or self._feedback_changed(feedback):
+            message["feedback"] = feedback
+        if self.include_frame_stats:
+            message["frame_stats"] = frame_stats
+        return message
+
+    def _feedback_changed(self, feedback: Dict) -> bool:
+        """timestamp를 제외한 피드백 내용 변경 여부"""
+        key = repr(sorted((k, v) for k, v in feedback.items() if k != "timestamp"))
+        if key == self._last_feedback_key:
+            return False
+        self._last_feedback_key = key
+        return True
+
+    async def send(self, websocket, message: Dict):
+        """협상된 형식으로 메시지 전송"""
+        if self.response_format == "msgpack":
+            await websocket.send_bytes(msgpack.packb(message, use_bin_type=True, use_single_float=True))
+        else:
+            await websocket.send_json(message)
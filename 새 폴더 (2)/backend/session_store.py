@@ -0,0 +1,254 @@
+from typing import Dict, Iterator, List, Optional
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+import json
+import sqlite3
+import threading
+import time
+
+import config
+
+
+class SessionSuperseded(Exception):
+    """같은 세션이 다른 연결에서 재개되어 더 이상 기록할 수 없는 경우"""
+
+
+class SessionStore(ABC):
+    """실시간 분석 세션 상태 저장소
+
+    세션 메타데이터와 분석된 프레임을 점진적으로 기록해 두어, 연결이
+    끊긴 클라이언트가 다른 워커 프로세스에 다시 접속해도 세션을 이어갈
+    수 있게 한다. 세션마다 마지막으로 접속한 연결(owner)만 기록할 수
+    있으므로, 끊긴 이전 연결이 늦게 기록해도 상태가 섞이지 않는다.
+    """
+
+    @abstractmethod
+    def create(self, session_id: str, owner: str, meta: Dict) -> None:
+        """새 세션 등록"""
+
+    @abstractmethod
+    def claim(self, session_id: str, owner: str) -> Optional[Dict]:
+        """세션 소유권을 가져오고 저장된 상태 반환 (없거나 만료되면 None)
+
+        반환값: 세션 메타데이터 + "frames" (저장된 프레임 기록 목록)
+        """
+
+    @abstractmethod
+    def append_frames(self, session_id: str, owner: str, start_index: int, frames: List[Dict]) -> bool:
+        """start_index번째부터의 프레임 기록 추가 (소유권을 잃었으면 False)"""
+
+    @abstractmethod
+    def delete(self, session_id: str, owner: str) -> None:
+        """종료된 세션 삭제 (다른 연결이 재개한 세션은 유지)"""
+
+    @abstractmethod
+    def pop_expired(self, max_age: float) -> List[Dict]:
+        """max_age초 동안 갱신되지 않은 세션을 삭제하고 저장된 상태 목록 반환
+
+        반환값: claim()과 같은 형식 + "updated_at" (마지막 기록 시각, Unix 시간)
+        여러 프로세스가 동시에 호출해도 세션마다 한 번만 반환된다.
+        """
+
+    def close(self) -> None:
+        pass
+
+    def checkpoint(self, session, owner: str) -> bool:
+        """세션에서 아직 기록하지 않은 프레임을 저장소에 기록 (소유권을 잃었으면 False)"""
+        # 프레임 로그 없이 보존 구간을 벗어나 기록하지 못한 프레임은 건너뜀
+        start_index = max(session.persisted_frames, session.first_frame)
+        frames = session.frame_records(start_index)
+        if not frames:
+            return True
+        if not self.append_frames(session.session_id, owner, start_index, frames):
+            return False
+        session.persisted_frames = start_index + len(frames)
+        return True
+
+
+class MemorySessionStore(SessionStore):
+    """프로세스 메모리 저장소 (단일 워커 실행용)"""
+
+    def __init__(self):
+        self._sessions: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def create(self, session_id: str, owner: str, meta: Dict) -> None:
+        with self._lock:
+            self._sessions[session_id] = {"meta": dict(meta), "owner": owner, "frames": [], "updated_at": time.time()}
+
+    def claim(self, session_id: str, owner: str) -> Optional[Dict]:
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                return None
+            state["owner"] = owner
+            state["updated_at"] = time.time()
+            return {**state["meta"], "frames": list(state["frames"])}
+
+    def append_frames(self, session_id: str, owner: str, start_index: int, frames: List[Dict]) -> bool:
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None or state["owner"] != owner:
+                return False
+            # 이미 기록된 구간은 건너뜀
+            del state["frames"][start_index:]
+            state["frames"].extend(frames)
+            state["updated_at"] = time.time()
+            return True
+
+    def delete(self, session_id: str, owner: str) -> None:
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is not None and state["owner"] == owner:
+                del self._sessions[session_id]
+
+    def pop_expired(self, max_age: float) -> List[Dict]:
+        cutoff = time.time() - max_age
+        with self._lock:
+            expired = [sid for sid, state in self._sessions.items() if state["updated_at"] < cutoff]
+            states = [self._sessions.pop(session_id) for session_id in expired]
+        return [{**state["meta"], "frames": state["frames"], "updated_at": state["updated_at"]} for state in states]
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite 파일 저장소 (같은 호스트의 여러 워커 프로세스가 공유)
+
+    WAL 모드는 공유 메모리 파일을 쓰므로 NFS 등 네트워크 파일 시스템에서는
+    안전하지 않다. 여러 호스트로 확장하려면 별도의 저장소 구현이 필요하다.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.SESSION_STORE_PATH
+        self._local = threading.local()
+        # close()에서 모두 닫을 수 있도록 스레드별 연결을 모아 둠
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        conn = self._connect()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS session_state (
+                session_id TEXT PRIMARY KEY,
+                owner TEXT,
+                meta TEXT,
+                frame_count INTEGER DEFAULT 0,
+                updated_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS session_state_frames (
+                session_id TEXT,
+                frame_index INTEGER,
+                record TEXT,
+                PRIMARY KEY (session_id, frame_index)
+            );
+            CREATE INDEX IF NOT EXISTS idx_session_state_updated ON session_state (updated_at);
+        ''')
+
+    def _connect(self) -> sqlite3.Connection:
+        """스레드별 연결 (세션 기록은 이벤트 루프 밖의 스레드에서도 호출됨)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # 연결은 만든 스레드에서만 쓰지만, close()는 다른 스레드에서 호출될 수 있음
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            # 여러 프로세스가 동시에 읽고 쓸 수 있도록 WAL 사용
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """쓰기 잠금을 먼저 잡는 트랜잭션 (다른 프로세스와의 교착 방지)"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    def create(self, session_id: str, owner: str, meta: Dict) -> None:
+        self._connect().execute(
+            "INSERT OR REPLACE INTO session_state (session_id, owner, meta, frame_count, updated_at) VALUES (?, ?, ?, 0, ?)",
+            (session_id, owner, json.dumps(meta), time.time())
+        )
+
+    def claim(self, session_id: str, owner: str) -> Optional[Dict]:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT meta, frame_count FROM session_state WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE session_state SET owner = ?, updated_at = ? WHERE session_id = ?",
+                (owner, time.time(), session_id)
+            )
+            records = conn.execute(
+                "SELECT record FROM session_state_frames WHERE session_id = ? AND frame_index < ? ORDER BY frame_index",
+                (session_id, row[1])
+            ).fetchall()
+        return {**json.loads(row[0]), "frames": [json.loads(record) for (record,) in records]}
+
+    def append_frames(self, session_id: str, owner: str, start_index: int, frames: List[Dict]) -> bool:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT owner FROM session_state WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None or row[0] != owner:
+                return False
+            conn.executemany(
+                "INSERT OR REPLACE INTO session_state_frames (session_id, frame_index, record) VALUES (?, ?, ?)",
+                [(session_id, start_index + i, json.dumps(frame)) for i, frame in enumerate(frames)]
+            )
+            conn.execute(
+                "UPDATE session_state SET frame_count = ?, updated_at = ? WHERE session_id = ?",
+                (start_index + len(frames), time.time(), session_id)
+            )
+        return True
+
+    def delete(self, session_id: str, owner: str) -> None:
+        with self._transaction() as conn:
+            deleted = conn.execute(
+                "DELETE FROM session_state WHERE session_id = ? AND owner = ?", (session_id, owner)
+            ).rowcount
+            if deleted:
+                conn.execute("DELETE FROM session_state_frames WHERE session_id = ?", (session_id,))
+
+    def pop_expired(self, max_age: float) -> List[Dict]:
+        cutoff = time.time() - max_age
+        states = []
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT session_id, meta, frame_count, updated_at FROM session_state WHERE updated_at < ?", (cutoff,)
+            ).fetchall()
+            for session_id, meta, frame_count, updated_at in rows:
+                records = conn.execute(
+                    "SELECT record FROM session_state_frames WHERE session_id = ? AND frame_index < ? ORDER BY frame_index",
+                    (session_id, frame_count)
+                ).fetchall()
+                states.append({
+                    **json.loads(meta),
+                    "frames": [json.loads(record) for (record,) in records],
+                    "updated_at": updated_at
+                })
+                conn.execute("DELETE FROM session_state_frames WHERE session_id = ?", (session_id,))
+                conn.execute("DELETE FROM session_state WHERE session_id = ?", (session_id,))
+        return states
+
+    def close(self) -> None:
+        """모든 스레드의 연결 닫기"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+def create_session_store(kind: Optional[str] = None) -> SessionStore:
+    """설정에 따른 세션 저장소 생성 (memory, sqlite)"""
+    kind = kind or config.SESSION_STORE
+    if kind == "memory":
+        return MemorySessionStore()
+    if kind == "sqlite":
+        return SQLiteSessionStore()
+    raise ValueError(f"알 수 없는 세션 저장소입니다: {kind}")
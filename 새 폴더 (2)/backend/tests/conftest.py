@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# config를 읽기 전에 설정: 테스트 데이터는 임시 디렉터리에 기록
+_TEST_DIR = tempfile.mkdtemp(prefix="golflink_test_")
+os.environ["GOLFLINK_DB_PATH"] = os.path.join(_TEST_DIR, "golflink.db")
+os.environ["GOLFLINK_FRAME_LOG_DIR"] = os.path.join(_TEST_DIR, "frame_logs")
+os.environ["GOLFLINK_SESSION_STORE"] = "memory"
+os.environ.setdefault("GOLFLINK_INFERENCE_WORKERS", "1")
+os.environ.setdefault("GOLFLINK_MODEL_COMPLEXITY", "1")
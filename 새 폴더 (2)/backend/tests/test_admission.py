@@ -0,0 +1,123 @@
+"""세션 수락 제어: 한도, 대기열, 거절(1013 종료), 서버 워커별 기본 한도"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from admission import CLOSE_TRY_AGAIN_LATER, AdmissionController, AdmissionRejected
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class IdlePool:
+    """부하/지연이 없는 추론 풀"""
+
+    def load(self):
+        return 0.0
+
+    def latency(self):
+        return 0.0
+
+
+def test_explicit_zero_limits_are_respected():
+    admission = AdmissionController(IdlePool(), max_sessions=0, max_client_sessions=0, queue_size=0)
+    assert admission.try_admit() == "max_sessions"
+    assert admission.try_admit_client() == "max_client_sessions"
+    with pytest.raises(AdmissionRejected):
+        admission.enqueue("max_sessions")
+    assert admission.get_stats()["rejected_by_reason"]["queue_full"] == 1
+    assert not admission.accepting()
+
+
+def test_queued_session_is_admitted_when_a_slot_is_released():
+    async def scenario():
+        admission = AdmissionController(IdlePool(), max_sessions=1, queue_size=1, queue_timeout=5)
+        assert admission.try_admit() is None
+        reason = admission.try_admit()
+        assert reason == "max_sessions"
+        ticket = admission.enqueue(reason)
+        assert admission.queue_position(ticket) == 1
+        # 대기열이 가득 차면 바로 거절
+        with pytest.raises(AdmissionRejected):
+            admission.enqueue(reason)
+
+        waiter = asyncio.ensure_future(admission.wait_for_slot(ticket, reason))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        admission.release()
+        await asyncio.wait_for(waiter, 1)
+        return admission
+
+    admission = asyncio.run(scenario())
+    assert admission.active == 1
+    assert admission.get_stats()["waiting_sessions"] == 0
+
+
+def test_queued_session_times_out():
+    async def scenario():
+        admission = AdmissionController(IdlePool(), max_sessions=0, queue_size=1, queue_timeout=0.1)
+        ticket = admission.enqueue("max_sessions")
+        with pytest.raises(AdmissionRejected):
+            await admission.wait_for_slot(ticket, "max_sessions")
+        return admission
+
+    admission = asyncio.run(scenario())
+    assert admission.rejected["queue_timeout"] == 1
+    assert admission.get_stats()["waiting_sessions"] == 0
+
+
+@pytest.fixture
+def client(monkeypatch):
+    import main
+
+    # lifespan 없이 요청만 처리 (거절되는 세션은 추론 풀/세션을 쓰지 않음)
+    def use(**limits):
+        monkeypatch.setattr(main, "admission", AdmissionController(IdlePool(), retry_after=7, **limits))
+        return TestClient(main.app)
+
+    return use
+
+
+def assert_closed_try_again_later(ws):
+    with pytest.raises(WebSocketDisconnect) as closed:
+        ws.receive_json()
+    assert closed.value.code == CLOSE_TRY_AGAIN_LATER
+
+
+def test_full_server_rejects_with_1013(client):
+    with client(max_sessions=0, queue_size=0).websocket_connect("/ws/pose-analysis") as ws:
+        assert ws.receive_json() == {"type": "rejected", "reason": "max_sessions", "retry_after": 7}
+        assert_closed_try_again_later(ws)
+
+
+def test_queued_session_is_rejected_after_timeout(client):
+    with client(max_sessions=0, queue_size=1, queue_timeout=0.1).websocket_connect("/ws/pose-analysis") as ws:
+        queued = ws.receive_json()
+        assert (queued["type"], queued["reason"], queued["position"]) == ("queued", "max_sessions", 1)
+        assert ws.receive_json()["type"] == "rejected"
+        assert_closed_try_again_later(ws)
+
+
+def test_client_inference_limit_rejects_with_1013(client):
+    with client(max_client_sessions=0).websocket_connect("/ws/pose-analysis?inference=client") as ws:
+        assert ws.receive_json()["reason"] == "max_client_sessions"
+        assert_closed_try_again_later(ws)
+
+
+def test_default_limits_are_scaled_per_server_worker():
+    env = {key: value for key, value in os.environ.items()
+           if not key.startswith("GOLFLINK_ADMISSION_") and key != "GOLFLINK_INFERENCE_WORKERS"}
+    env["GOLFLINK_SERVER_WORKERS"] = "4"
+    output = subprocess.run(
+        [sys.executable, "-c", "import config, json; print(json.dumps([config.INFERENCE_WORKERS, "
+         "config.ADMISSION_MAX_SESSIONS, config.ADMISSION_QUEUE_SIZE, config.ADMISSION_MAX_CLIENT_SESSIONS]))"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+
+    inference_workers = max(1, ((os.cpu_count() or 2) - 1) // 4)
+    assert json.loads(output) == [inference_workers, inference_workers * 4, 2, 64]
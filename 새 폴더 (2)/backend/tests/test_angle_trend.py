@@ -0,0 +1,77 @@
+"""실시간 세션 종료 → 프레임별 지표 기록 → 각도 추이 조회"""
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from frame_protocol import FRAME_HEADER, PROTOCOL_VERSION
+
+NUM_FRAMES = 20
+# 바이너리 메시지 type (frame_protocol.MESSAGE_TYPES)
+LANDMARKS = 3
+INTERMEDIATE = 1
+
+
+@pytest.fixture(scope="module")
+def app(tmp_path_factory):
+    import main
+
+    main.report_generator.output_dir = str(tmp_path_factory.mktemp("reports"))
+    with TestClient(main.app) as client:
+        yield main, client
+
+
+def run_session(client, user_id: str, points: list, mode: str = "intermediate") -> str:
+    """랜드마크 프레임을 보내고 end_session으로 끝낸 뒤 세션 ID 반환"""
+    with client.websocket_connect(f"/ws/pose-analysis?user_id={user_id}&mode={mode}&summary=0") as ws:
+        session_id = ws.receive_json()["session_id"]
+        for frame in points:
+            header = FRAME_HEADER.pack(PROTOCOL_VERSION, LANDMARKS, INTERMEDIATE, time.time())
+            ws.send_bytes(header + frame.astype("<f4").tobytes())
+            # 최신 프레임만 분석하므로 프레임마다 결과를 받은 뒤 다음 프레임 전송
+            while ws.receive_json()["type"] != "analysis":
+                pass
+        ws.send_json({"type": "end_session"})
+        while ws.receive_json()["type"] != "session_end":
+            pass
+    return session_id
+
+
+def test_ended_session_is_recorded_with_angle_trend(app):
+    main, client = app
+    rng = np.random.default_rng(0)
+    points = [rng.uniform(0.2, 0.8, (33, 3)).astype(np.float32) for _ in range(NUM_FRAMES)]
+
+    session_id = run_session(client, "trend_user", points)
+
+    expected = [main.landmark_analyzer.analyze_landmarks(frame)["angles"]["left_elbow"] for frame in points]
+    response = client.get("/api/user/trend_user/angles/left_elbow/trend")
+    assert response.status_code == 200
+    trend = response.json()["trend"]
+    assert len(trend) == 1
+    assert trend[0]["frames"] == NUM_FRAMES
+    assert trend[0]["average"] == pytest.approx(np.mean(expected), rel=1e-5)
+    assert trend[0]["minimum"] == pytest.approx(min(expected), rel=1e-5)
+    assert trend[0]["maximum"] == pytest.approx(max(expected), rel=1e-5)
+
+    # 세션 요약과 프레임 로그도 기록됨
+    stats = client.get("/api/user/trend_user/stats").json()
+    assert stats["total_sessions"] == 1
+    if main.config.FRAME_LOG:
+        assert len(list(main.db.database.iter_session_frames(session_id))) == NUM_FRAMES
+
+
+def test_session_is_recorded_with_connection_mode(app):
+    _, client = app
+    points = [np.full((33, 3), 0.5, np.float32) + np.eye(33, 3, dtype=np.float32) * 0.1]
+
+    session_id = run_session(client, "mode_user", points, mode="professional")
+
+    history = client.get("/api/training/user/mode_user/history").json()["history"]
+    assert [(row["session_id"], row["mode"]) for row in history] == [(session_id, "professional")]
+
+
+def test_unknown_angle_is_rejected(app):
+    _, client = app
+    assert client.get("/api/user/trend_user/angles/not_an_angle/trend").status_code == 400
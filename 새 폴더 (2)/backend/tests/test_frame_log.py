@@ -0,0 +1,88 @@
+"""프레임 로그: 기록/읽기 왕복, 잘린 마지막 레코드, 오래된 로그 정리"""
+import io
+import os
+import time
+
+import pytest
+
+from frame_columns import FrameColumns
+from frame_log import FrameLog, purge_frame_logs, read_records
+
+PHASES = ["setup", "backswing", None, "impact", "setup"]
+
+
+def write_frames(path: str, count: int) -> FrameColumns:
+    """count개 프레임을 열과 로그에 같이 기록 (비교용 열 반환)"""
+    columns = FrameColumns(None)
+    log = FrameLog(path, fsync_interval=0)
+    for i in range(count):
+        pose_data = {
+            "detected": i % 3 != 2,
+            "landmarks": {"NOSE": (0.5, 0.1 * i, -0.2)} if i % 3 != 2 else None,
+            "angles": {"left_elbow": 90.0 + i, "spine": 150.5} if i % 3 != 2 else None,
+            "swing_phase": PHASES[i % len(PHASES)],
+            "posture_score": {"score": 70 + i},
+        }
+        if i == 3:
+            pose_data["motion_skipped"] = True
+        feedback = {
+            "severity": "error" if i % 2 else "success",
+            "posture_score": {"score": 70 + i},
+            "details": [{"angle_name": "left_elbow"}] if i % 2 else [],
+        }
+        columns.append(i / 30, pose_data, feedback, 1_700_000_000 + i)
+        log.append(columns, columns.count - 1)
+    log.close()
+    return columns
+
+
+def test_append_read_round_trip(tmp_path):
+    path = str(tmp_path / "session.frames")
+    columns = write_frames(path, len(PHASES) * 2)
+
+    with open(path, "rb") as stream:
+        records = list(read_records(stream))
+    assert records == [columns.record(i) for i in range(columns.count)]
+
+    # 구간 읽기
+    with open(path, "rb") as stream:
+        assert list(read_records(stream, 3, 6)) == [columns.record(i) for i in range(3, 6)]
+
+
+def test_truncated_last_record_is_ignored(tmp_path):
+    path = str(tmp_path / "session.frames")
+    columns = write_frames(path, 4)
+    with open(path, "rb") as f:
+        data = f.read()
+
+    # 마지막 프레임 기록 도중 프로세스가 종료된 경우
+    with open(path, "wb") as f:
+        f.write(data[:-10])
+    with open(path, "rb") as stream:
+        assert list(read_records(stream)) == [columns.record(i) for i in range(3)]
+
+    # 태그만 남은 경우
+    with open(path, "wb") as f:
+        f.write(data + b"S")
+    with open(path, "rb") as stream:
+        assert len(list(read_records(stream))) == 4
+
+
+def test_rejects_other_files():
+    with pytest.raises(ValueError):
+        list(read_records(io.BytesIO(b"not a frame log")))
+
+
+def test_purge_removes_only_old_frame_logs(tmp_path):
+    old = tmp_path / "old.frames"
+    recent = tmp_path / "recent.frames"
+    other = tmp_path / "old.txt"
+    for path in (old, recent, other):
+        path.write_bytes(b"")
+    past = time.time() - 3600
+    os.utime(old, (past, past))
+    os.utime(other, (past, past))
+
+    assert purge_frame_logs(str(tmp_path), max_age=600) == 1
+    assert sorted(os.listdir(tmp_path)) == ["old.txt", "recent.frames"]
+    assert purge_frame_logs(str(tmp_path / "missing"), max_age=600) == 0
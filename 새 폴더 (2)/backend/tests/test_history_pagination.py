@@ -0,0 +1,98 @@
+"""훈련 이력 API: 커서 페이지, 같은 시작 시각 경계, 필드 선택, 기간 필터, 잘못된 요청"""
+import base64
+import json
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from database import AsyncDatabase, Database
+
+USER_ID = "history_user"
+# 같은 시작 시각의 세션이 페이지 경계에 걸치도록 구성
+START_TIMES = [
+    datetime(2026, 3, 1, 9, 0),
+    datetime(2026, 3, 2, 9, 0),
+    datetime(2026, 3, 2, 9, 0),
+    datetime(2026, 3, 2, 9, 0),
+    datetime(2026, 3, 3, 9, 0),
+    datetime(2026, 3, 4, 9, 0),
+    datetime(2026, 3, 4, 9, 0),
+]
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    import main
+
+    db = AsyncDatabase(Database(str(tmp_path / "golflink.db")))
+    monkeypatch.setattr(main, "db", db)
+    for i, start_time in enumerate(START_TIMES):
+        db.database.create_training_session(USER_ID, "professional" if i % 2 else "beginner", 10,
+                                            session_id=f"session_{i:02d}", start_time=start_time)
+    # 다른 사용자의 세션은 나오지 않음
+    db.database.create_training_session("other_user", "beginner", 10, session_id="session_other",
+                                        start_time=START_TIMES[0])
+    # lifespan 없이 요청만 처리 (추론 풀을 띄우지 않음)
+    yield TestClient(main.app)
+    db.close()
+
+
+def expected_order():
+    return [session_id for _, session_id in sorted(
+        ((start_time, f"session_{i:02d}") for i, start_time in enumerate(START_TIMES)), reverse=True
+    )]
+
+
+def get_history(client, **params):
+    response = client.get(f"/api/training/user/{USER_ID}/history", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_cursor_pages_cover_every_session_once(client):
+    seen = []
+    pages = 0
+    cursor = None
+    while True:
+        page = get_history(client, limit=2, **({"cursor": cursor} if cursor else {}))
+        pages += 1
+        assert len(page["history"]) <= 2
+        seen.extend(row["session_id"] for row in page["history"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == expected_order()
+    assert pages == 4
+
+
+def test_last_full_page_has_no_next_cursor(client):
+    page = get_history(client, limit=len(START_TIMES))
+    assert len(page["history"]) == len(START_TIMES)
+    assert page["next_cursor"] is None
+
+
+def test_fields_projection_always_includes_cursor_columns(client):
+    page = get_history(client, fields="mode, average_score", limit=1)
+    assert set(page["history"][0]) == {"session_id", "start_time", "mode", "average_score"}
+
+
+def test_since_until_filter_start_time(client):
+    page = get_history(client, since="2026-03-02", until="2026-03-04")
+    assert [row["session_id"] for row in page["history"]] == ["session_04", "session_03", "session_02", "session_01"]
+
+    page = get_history(client, since="2026-03-02T09:00:00", limit=2)
+    rest = get_history(client, since="2026-03-02T09:00:00", cursor=page["next_cursor"])
+    assert [row["session_id"] for row in page["history"] + rest["history"]] == expected_order()[:6]
+
+
+@pytest.mark.parametrize("params", [
+    {"cursor": "not-a-cursor"},
+    {"cursor": base64.urlsafe_b64encode(json.dumps([1, "session_00"]).encode()).decode()},
+    {"fields": "mode,password"},
+    {"since": "yesterday"},
+])
+def test_malformed_requests_return_400(client, params):
+    response = client.get(f"/api/training/user/{USER_ID}/history", params=params)
+    assert response.status_code == 400
@@ -0,0 +1,166 @@
+"""추론 풀: 워커 비정상 종료 시 재시작과 대기 시간 증가, 예열 분석기 준비 실패, 과부하 응답"""
+import asyncio
+import logging
+import queue
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import config
+import inference_pool
+import pose_analyzer
+from inference_pool import InferencePool, InferencePoolFull, InferenceWorkerUnavailable, _SpareAnalyzers, _WorkerHandle
+
+
+class FakeProcess:
+    def __init__(self, pid):
+        self.pid = pid
+        self.exitcode = None
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def crash(self):
+        self.alive = False
+        self.exitcode = -9
+
+
+class FakeQueue:
+    def __init__(self):
+        self.items = []
+        self.closed = False
+
+    def put(self, item):
+        self.items.append(item)
+
+    def cancel_join_thread(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """워커 프로세스 대신 가짜 프로세스를 띄우는 풀"""
+    pool = InferencePool(num_workers=1, queue_depth=4)
+    pids = iter(range(100, 200))
+    monkeypatch.setattr(pool, "_spawn", lambda worker_id: (FakeProcess(next(pids)), FakeQueue()))
+    pool._workers = [_WorkerHandle(0, *pool._spawn(0))]
+    yield pool
+    pool._stopping.set()
+
+
+def test_crashed_worker_fails_pending_requests_and_reopens_sessions(pool):
+    worker = pool._workers[0]
+    pool.open_session("session-1")
+
+    async def scenario():
+        request = asyncio.ensure_future(pool.analyze(b"jpeg", session_id="session-1"))
+        await asyncio.sleep(0)
+        worker.process.crash()
+        pool._handle_exit(worker)
+        with pytest.raises(InferenceWorkerUnavailable):
+            await request
+        # 다시 시작하기 전에는 새 프레임을 바로 거절
+        with pytest.raises(InferenceWorkerUnavailable):
+            await pool.analyze(b"jpeg", session_id="session-1")
+
+    asyncio.run(scenario())
+    assert (worker.inflight, worker.failed, worker.rejected) == (0, 1, 1)
+    # 처음 비정상 종료한 워커는 바로 재시작
+    assert worker.restart_at <= time.monotonic()
+
+    old_queue = worker.task_queue
+    pool._restart(worker)
+    assert old_queue.closed
+    assert worker.task_queue.items == [("open", None, "session-1", None, 0, None)]
+    assert (worker.process.pid, worker.restarts, worker.restarting) == (101, 1, True)
+
+
+def test_restart_backoff_grows_until_the_worker_is_ready(pool):
+    worker = pool._workers[0]
+    delays = []
+    for _ in range(7):
+        worker.process.crash()
+        crashed_at = time.monotonic()
+        pool._handle_exit(worker)
+        delays.append(round(worker.restart_at - crashed_at))
+        pool._restart(worker)
+    assert delays == [0, 1, 3, 7, 15, 30, 30]
+
+    # 준비 완료를 알리면 대기 시간이 처음으로 돌아감
+    pool._result_queue = queue.Queue()
+    pool._result_queue.put(("ready", 0, None, None))
+    pool._result_queue.put(None)
+    pool._collect_results()
+    assert (worker.ready, worker.restarting, worker.consecutive_crashes) == (True, False, 0)
+
+
+def test_monitor_restarts_dead_worker(pool, monkeypatch):
+    monkeypatch.setattr(config, "INFERENCE_WORKER_CHECK_INTERVAL_S", 0.01)
+    worker = pool._workers[0]
+    worker.process.crash()
+
+    monitor = threading.Thread(target=pool._monitor_workers, daemon=True)
+    monitor.start()
+    deadline = time.monotonic() + 5
+    while worker.restarts == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    pool._stopping.set()
+    monitor.join(1)
+
+    assert worker.restarts == 1
+    assert worker.process.is_alive()
+    assert worker.exit_handled is False
+
+
+def test_spare_analyzer_is_retried_after_a_failure(monkeypatch, caplog):
+    attempts = []
+
+    class FlakyAnalyzer:
+        def __init__(self):
+            attempts.append(1)
+            if len(attempts) <= 2:
+                raise RuntimeError("model download failed")
+
+    monkeypatch.setattr(pose_analyzer, "PoseAnalyzer", FlakyAnalyzer)
+    monkeypatch.setattr(inference_pool, "_warm_up", lambda analyzer: None)
+    monkeypatch.setattr(inference_pool, "_RESTART_BACKOFF_MAX_S", 0.01)
+
+    with caplog.at_level(logging.ERROR, logger="inference_pool"):
+        spare = _SpareAnalyzers()
+        deadline = time.monotonic() + 5
+        analyzer = None
+        while analyzer is None and time.monotonic() < deadline:
+            analyzer = spare.take()
+            time.sleep(0.01)
+
+    assert isinstance(analyzer, FlakyAnalyzer)
+    assert len(attempts) >= 3
+    assert caplog.text.count("Failed to prepare a spare pose analyzer") == 2
+
+
+class FullPool:
+    def __init__(self, exc):
+        self.exc = exc
+
+    async def analyze(self, payload, session_id=None, mode=None, offset=0):
+        raise self.exc
+
+
+@pytest.mark.parametrize("exc", [
+    InferencePoolFull("Inference worker 0 queue is full"),
+    InferenceWorkerUnavailable("Inference worker 0 is restarting"),
+])
+def test_analyze_frame_returns_503_when_workers_are_busy(monkeypatch, exc):
+    import main
+
+    monkeypatch.setattr(main, "inference_pool", FullPool(exc))
+    # lifespan 없이 요청만 처리 (추론 풀을 띄우지 않음)
+    response = TestClient(main.app).post("/api/analyze-frame", json={"frame_data": {"image": ""}, "timestamp": 0})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(main.admission.retry_after)
@@ -0,0 +1,78 @@
+"""일괄 각도 엔진 ↔ 기존 프레임별 각도 계산 비교"""
+import math
+
+import numpy as np
+import pytest
+
+from landmark_batch import ANGLE_NAMES, JOINT_ANGLES, NUM_LANDMARKS, POSE_LANDMARKS, LandmarkBatch, calculate_angles_batch
+from pose_analyzer import PoseAnalyzer
+
+# 연산 순서 차이(np.dot/np.linalg.norm ↔ 성분별 계산)로 생기는 오차 허용치 (도)
+TOLERANCE = 1e-9
+
+
+def reference_angle(point1, point2, point3) -> float:
+    """기존 PoseAnalyzer._calculate_angle (float64, 프레임별)"""
+    vec1 = np.array([point1[0] - point2[0], point1[1] - point2[1]])
+    vec2 = np.array([point3[0] - point2[0], point3[1] - point2[1]])
+    cos_angle = np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2) + 1e-6)
+    cos_angle = np.clip(cos_angle, -1.0, 1.0)
+    return np.arccos(cos_angle) * 180 / np.pi
+
+
+def reference_shoulder_rotation(left_shoulder, right_shoulder, nose) -> float:
+    """기존 PoseAnalyzer._calculate_shoulder_rotation"""
+    center = ((left_shoulder[0] + right_shoulder[0]) / 2, (left_shoulder[1] + right_shoulder[1]) / 2)
+    return math.atan2(nose[1] - center[1], nose[0] - center[0]) * 180 / math.pi
+
+
+def reference_angles(landmarks: dict) -> dict:
+    angles = {}
+    for name, points in JOINT_ANGLES:
+        if all(p in landmarks for p in points):
+            angles[name] = reference_angle(*(landmarks[p] for p in points))
+    if all(p in landmarks for p in ('LEFT_SHOULDER', 'RIGHT_SHOULDER', 'NOSE')):
+        angles['shoulder_rotation'] = reference_shoulder_rotation(
+            landmarks['LEFT_SHOULDER'], landmarks['RIGHT_SHOULDER'], landmarks['NOSE']
+        )
+    return angles
+
+
+@pytest.fixture
+def frames():
+    rng = np.random.default_rng(0)
+    frames = [{name: tuple(rng.uniform(0.0, 1.0, 3)) for name in POSE_LANDMARKS} for _ in range(500)]
+    # 일부 랜드마크가 검출되지 않은 프레임과 자세가 없는 프레임
+    del frames[1]['LEFT_KNEE']
+    del frames[2]['NOSE']
+    frames[3] = None
+    return frames
+
+
+def test_batch_matches_per_frame_formula(frames):
+    angles = calculate_angles_batch(LandmarkBatch.from_dicts(frames))
+    for i, landmarks in enumerate(frames):
+        expected = reference_angles(landmarks or {})
+        for name in ANGLE_NAMES:
+            value = angles[name][i]
+            if name not in expected:
+                assert np.isnan(value), (i, name)
+            else:
+                assert value == pytest.approx(expected[name], abs=TOLERANCE), (i, name)
+
+
+def test_batch_keeps_float64_input(frames):
+    batch = LandmarkBatch.from_dicts(frames[:1])
+    assert batch.data.dtype == np.float64
+    assert batch.to_dict(0) == frames[0]
+
+
+def test_client_landmarks_keep_float64(frames):
+    points = np.zeros((NUM_LANDMARKS, 3))
+    for name, index in POSE_LANDMARKS.items():
+        points[index] = frames[0][name]
+
+    result = PoseAnalyzer(load_models=False).analyze_landmarks(points.tolist())
+    assert result["landmarks"] == frames[0]
+    for name, value in reference_angles(frames[0]).items():
+        assert result["angles"][name] == pytest.approx(value, abs=TOLERANCE), name
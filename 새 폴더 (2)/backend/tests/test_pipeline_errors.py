@@ -0,0 +1,89 @@
+"""잘못된 입력 프레임은 그 프레임만 버리고 세션은 계속 진행"""
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from ai_coach import AICoach
+from frame_protocol import FRAME_HEADER, PROTOCOL_VERSION
+from pipeline import PosePipeline
+from pose_analyzer import PoseAnalyzer
+from response_encoder import ResponseEncoder
+from training_session import TrainingSession
+
+# 바이너리 메시지 type (frame_protocol.MESSAGE_TYPES)
+FRAME = 1
+LANDMARKS = 3
+INTERMEDIATE = 1
+
+
+class FakeWebSocket:
+    """메시지를 하나씩 전달하는 WebSocket (이전 프레임이 슬롯에서 빠진 뒤 다음 메시지 전달)"""
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.sent = []
+        self.pipeline = None
+
+    async def receive(self):
+        # 대기 중인 프레임이 새 프레임으로 교체되지 않도록 슬롯이 빌 때까지 대기
+        while self.pipeline.frame_slot._pending is not None:
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.01)
+        return self.messages.pop(0)
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+
+class CorruptImagePool:
+    """모든 이미지 프레임을 디코딩하지 못하는 추론 풀"""
+
+    def open_session(self, session_id):
+        return 0
+
+    async def analyze(self, image_data, session_id=None, mode="intermediate", offset=0):
+        raise RuntimeError("이미지를 디코딩할 수 없습니다.")
+
+    def load(self):
+        return 0.0
+
+
+def binary(message_type, payload=b""):
+    return {"type": "websocket.receive", "bytes": FRAME_HEADER.pack(PROTOCOL_VERSION, message_type, INTERMEDIATE, time.time()) + payload}
+
+
+def text(value):
+    return {"type": "websocket.receive", "text": value}
+
+
+def test_invalid_frames_are_dropped_without_ending_the_session():
+    landmarks = np.full((33, 3), 0.5, np.float32) + np.eye(33, 3, dtype=np.float32) * 0.1
+    websocket = FakeWebSocket([
+        text("{not json"),
+        text("[1, 2]"),
+        binary(LANDMARKS, b"\x00" * 12),
+        text(json.dumps({"type": "landmarks", "timestamp": time.time(), "landmarks": [[0.5, 0.5]]})),
+        text(json.dumps({"type": "frame", "timestamp": time.time(), "frame": "not-a-data-url"})),
+        binary(FRAME, b"not a jpeg"),
+        binary(LANDMARKS, landmarks.astype("<f4").tobytes()),
+        text(json.dumps({"type": "end_session"})),
+    ])
+    session = TrainingSession(frame_log=False)
+    pipeline = PosePipeline(
+        websocket, "stream", session, ResponseEncoder(), CorruptImagePool(),
+        PoseAnalyzer(load_models=False), AICoach()
+    )
+    websocket.pipeline = pipeline
+
+    asyncio.run(asyncio.wait_for(pipeline.run(), timeout=10))
+    session.close()
+
+    assert [message["type"] for message in websocket.sent if message["type"] != "control"] == ["analysis"]
+    stats = pipeline.frame_stats()
+    assert stats["processed"] == 1
+    assert stats["dropped_by_reason"] == {
+        "replaced": 0, "stale": 0, "queue_full": 0,
+        "invalid_message": 3, "invalid_landmarks": 1, "invalid_frame": 1, "inference_error": 1
+    }
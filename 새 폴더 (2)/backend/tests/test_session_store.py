@@ -0,0 +1,97 @@
+"""세션 저장소: 만료 세션 반환, 연결 정리, 재개되지 않은 세션의 훈련 기록 저장"""
+import asyncio
+import logging
+import sqlite3
+import threading
+
+import pytest
+
+from database import AsyncDatabase, Database
+from session_store import MemorySessionStore, SQLiteSessionStore
+from training_session import TrainingSession
+
+
+def add_frames(session: TrainingSession, count: int):
+    for i in range(count):
+        session.add_frame(
+            {"angles": {"left_elbow": 90.0 + i}, "swing_phase": "setup", "posture_score": {"score": 75}},
+            {"posture_score": {"score": 75}, "severity": "success"},
+            timestamp=i / 30
+        )
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    store = MemorySessionStore() if request.param == "memory" else SQLiteSessionStore(str(tmp_path / "state.db"))
+    yield store
+    store.close()
+
+
+def test_pop_expired_returns_each_session_once(store):
+    session = TrainingSession(frame_log=False)
+    add_frames(session, 3)
+    store.create(session.session_id, "conn-1", {**session.to_meta(), "user_id": "alice"})
+    assert store.checkpoint(session, "conn-1")
+
+    assert store.pop_expired(3600) == []
+    states = store.pop_expired(0)
+    assert [(state["session_id"], state["user_id"], len(state["frames"])) for state in states] == [
+        (session.session_id, "alice", 3)
+    ]
+    assert states[0]["updated_at"] > 0
+    assert store.pop_expired(0) == []
+    assert store.claim(session.session_id, "conn-2") is None
+
+
+def test_checkpoint_fails_after_another_connection_resumes(store):
+    session = TrainingSession(frame_log=False)
+    store.create(session.session_id, "conn-1", session.to_meta())
+    store.claim(session.session_id, "conn-2")
+    add_frames(session, 1)
+    assert not store.checkpoint(session, "conn-1")
+
+
+def test_sqlite_close_closes_connections_of_all_threads(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / "state.db"))
+    thread = threading.Thread(target=store.pop_expired, args=(0,))
+    thread.start()
+    thread.join()
+    connections = list(store._connections)
+    assert len(connections) == 2
+
+    store.close()
+    for conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+
+def test_unresumed_session_is_saved_to_history(monkeypatch, caplog, tmp_path):
+    import main
+
+    # 앞선 테스트의 앱 종료로 닫혔을 수 있으므로 새 데이터베이스 사용
+    db = AsyncDatabase(Database(str(tmp_path / "golflink.db")))
+    monkeypatch.setattr(main, "db", db)
+    session, resumed = main.open_training_session(None, "conn-1", "beginner", "expired_user")
+    assert not resumed
+    add_frames(session, 4)
+    assert main.session_store.checkpoint(session, "conn-1")
+    add_frames(session, 2)
+
+    # 다른 연결이 재개하면 이전 연결의 마지막 기록은 거부되고 경고를 남김
+    resumed_session = TrainingSession.restore(main.session_store.claim(session.session_id, "conn-2"))
+    with caplog.at_level(logging.WARNING, logger="main"):
+        main.close_training_session(session, "conn-1", ended=False)
+    assert "2 frames not saved" in caplog.text
+
+    add_frames(resumed_session, 1)
+    main.close_training_session(resumed_session, "conn-2", ended=False)
+
+    # 재개되지 않고 만료되면 훈련 기록으로 저장
+    monkeypatch.setattr(main.config, "SESSION_RESUME_TTL_S", 0)
+    assert asyncio.run(main.expire_sessions()) >= 1
+
+    history = db.database.get_user_history("expired_user")
+    assert [(row["session_id"], row["mode"], row["total_frames"]) for row in history] == [
+        (session.session_id, "beginner", 5)
+    ]
+    db.close()
@@ -0,0 +1,92 @@
+"""영상 분석: 프레임 단위 전달, 구간 순서 보장, 탐색이 부정확한 영상의 단일 구간 처리"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import pytest
+
+import video_analysis
+from video_analysis import VideoAnalyzer, probe_video
+
+FRAME_COUNT = 20
+
+
+class GatedAnalyzer:
+    """두 번째 프레임부터는 gate가 열릴 때까지 분석을 멈추는 분석기"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.calls = 0
+
+    def reset(self):
+        pass
+
+    def analyze_pose(self, frame, mode="intermediate"):
+        self.calls += 1
+        if self.calls > 1:
+            self.gate.wait(5)
+        return {"detected": True, "angles": {"spine": 150.0}, "swing_phase": "setup", "posture_score": {"score": 80}}
+
+
+class FixedCoach:
+    def generate_feedback(self, pose_results, mode="intermediate", timestamp=None):
+        return {"posture_score": {"score": 80}, "severity": "success", "details": []}
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = str(tmp_path / "swing.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 64))
+    for i in range(FRAME_COUNT):
+        writer.write(np.full((64, 64, 3), i * 10, np.uint8))
+    writer.release()
+    return path
+
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    """워커 프로세스 대신 스레드에서 구간을 분석하는 영상 분석기"""
+    pose_analyzer = GatedAnalyzer()
+    monkeypatch.setattr(video_analysis, "_analyzer", pose_analyzer)
+    monkeypatch.setattr(video_analysis, "_coach", FixedCoach())
+    analyzer = VideoAnalyzer(max_workers=1, chunk_frames=6)
+    analyzer._executor = ThreadPoolExecutor(max_workers=1)
+    yield analyzer, pose_analyzer
+    pose_analyzer.gate.set()
+    analyzer.shutdown()
+
+
+def test_frames_are_streamed_as_they_are_analyzed(video, analyzer):
+    analyzer, pose_analyzer = analyzer
+
+    async def scenario():
+        records = analyzer.analyze(video, info=probe_video(video))
+        info = await records.__anext__()
+        # 첫 구간이 끝나기 전 (두 번째 프레임 분석 중)에도 첫 프레임은 바로 전달
+        first = await asyncio.wait_for(records.__anext__(), 5)
+        assert not pose_analyzer.gate.is_set()
+        pose_analyzer.gate.set()
+        return info, [first] + [record async for record in records]
+
+    info, records = asyncio.run(scenario())
+    assert info["chunks"] == 4
+    assert [record["frame"] for record in records[:-1]] == list(range(FRAME_COUNT))
+    assert records[-1]["type"] == "summary"
+    assert records[-1]["total_frames"] == FRAME_COUNT
+
+
+def test_inaccurate_seeking_analyzes_in_a_single_pass(video, analyzer, monkeypatch):
+    analyzer, pose_analyzer = analyzer
+    assert video_analysis._can_seek(video, 6)
+
+    monkeypatch.setattr(video_analysis, "_can_seek", lambda path, frame: False)
+    pose_analyzer.gate.set()
+
+    async def scenario():
+        return [record async for record in analyzer.analyze(video)]
+
+    records = asyncio.run(scenario())
+    assert records[0]["chunks"] == 1
+    assert [record["frame"] for record in records[1:-1]] == list(range(FRAME_COUNT))
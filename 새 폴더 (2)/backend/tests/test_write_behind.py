@@ -0,0 +1,58 @@
+"""쓰기 지연 큐: 세션 종료 기록이 큐를 거치고, 일괄 기록 전에도 바로 읽힘"""
+import pytest
+
+from database import Database
+from training_session import TrainingSession
+from write_behind import WriteBehindQueue
+
+NUM_FRAMES = 5
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(str(tmp_path / "golflink.db"), pool_size=2, write_behind=True)
+    # 테스트 중에는 기록 스레드가 주기적으로 기록하지 않도록 간격을 길게
+    database.writes.close()
+    database.writes = WriteBehindQueue(database.pool, interval=3600.0)
+    yield database
+    database.close()
+
+
+def test_session_end_write_is_queued_and_read_back(db):
+    session = TrainingSession(frame_log=True)
+    db.create_training_session("queued_user", session.mode, 1, session_id=session.session_id,
+                               start_time=session.start_time)
+    for i in range(NUM_FRAMES):
+        session.add_frame(
+            {"angles": {"left_elbow": 90.0 + i}, "swing_phase": "setup", "posture_score": {"score": 80}},
+            {"posture_score": {"score": 80}, "severity": "success"},
+            timestamp=i / 30
+        )
+
+    db.update_training_session(session.session_id, session.get_session_data(include_frames=False),
+                               frame_log=session.frame_log)
+    # 프레임 로그는 큐에 넣을 때 복사했으므로 기록 전에 삭제해도 됨
+    session.close()
+    assert db.writes.get_stats()["pending"] == 1
+
+    # 같은 세션/사용자를 읽으면 남은 변경을 먼저 기록
+    saved = db.get_training_session(session.session_id)
+    assert db.writes.get_stats()["pending"] == 0
+    assert saved["total_frames"] == NUM_FRAMES
+    assert saved["average_score"] == pytest.approx(80)
+
+    frames = list(db.iter_session_frames(session.session_id))
+    assert [frame["pose_data"]["angles"]["left_elbow"] for frame in frames] == [90.0 + i for i in range(NUM_FRAMES)]
+    trend = db.get_angle_trend("queued_user", "left_elbow")
+    assert trend[0]["frames"] == NUM_FRAMES
+
+
+def test_user_stats_read_your_writes(db):
+    session_id = db.create_training_session("stats_user", "beginner", 1)
+    db.update_training_session(session_id, {"total_frames": 10, "swing_count": 2, "average_score": 70})
+    assert db.writes.has_pending("user:stats_user")
+
+    stats = db.get_user_stats("stats_user")
+    assert not db.writes.has_pending("user:stats_user")
+    assert stats["total_sessions"] == 1
+    assert stats["total_swings"] == 2
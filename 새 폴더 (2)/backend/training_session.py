@@ -1,100 +1,196 @@
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 from datetime import datetime
 import json
+import os
+import time
+import uuid
+
+import config
+from frame_columns import FrameColumns
+from frame_log import FrameLog
 
 class TrainingSession:
     """훈련 세션 관리"""
     
-    def __init__(self, session_id: Optional[str] = None):
-        self.session_id = session_id or f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    def __init__(self, session_id: Optional[str] = None, mode: str = "intermediate", max_frames: Optional[int] = None,
+                 frame_log: Optional[bool] = None):
+        # 여러 워커 프로세스가 동시에 세션을 만들어도 겹치지 않도록 임의 접미사 추가
+        self.session_id = session_id or f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        self.mode = mode
         self.start_time = datetime.now()
-        self.frames: List[Dict] = []
-        self.feedback_history: List[Dict] = []
+        
+        # 전체 프레임은 디스크 로그에 기록하고 메모리에는 최근 프레임만 유지
+        # (같은 세션을 재개한 연결마다 별도 파일 사용)
+        self.frame_log: Optional[FrameLog] = None
+        if config.FRAME_LOG if frame_log is None else frame_log:
+            if max_frames is None and not config.SESSION_MAX_FRAMES:
+                max_frames = config.FRAME_LOG_WINDOW_FRAMES
+            self.frame_log = FrameLog(os.path.join(config.FRAME_LOG_DIR, f"{self.session_id}_{uuid.uuid4().hex[:8]}.frames"))
+        
+        # 프레임별 데이터 (열 단위 저장, max_frames를 넘으면 오래된 프레임부터 제거)
+        self.frames = FrameColumns(max_frames)
+        self._last_phase: Optional[str] = None
         self.swing_count = 0
         self.total_score = 0
         self.average_score = 0
+        # 움직임이 없어 추론을 건너뛴 프레임 수
+        self.skipped_frames = 0
+        # 프레임 추가 시 갱신하는 누적 통계 (요약 시 프레임을 다시 훑지 않음)
+        self.severity_counts: Dict[str, int] = {}
+        self.phase_counts: Dict[str, int] = {}
+        self.phase_success_counts: Dict[str, int] = {}
+        self.error_angle_counts: Dict[str, int] = {}
+        # 세션 저장소에 기록된 프레임 수
+        self.persisted_frames = 0
+    
+    @classmethod
+    def restore(cls, state: Dict) -> "TrainingSession":
+        """세션 저장소에 기록된 상태로 세션 복원 (프레임을 다시 집계)"""
+        session = cls(session_id=state["session_id"], mode=state.get("mode", "intermediate"))
+        session.start_time = datetime.fromisoformat(state["start_time"])
+        for frame_record in state.get("frames", []):
+            session._add_record(frame_record)
+        session.persisted_frames = session.frame_count
+        return session
+    
+    @property
+    def frame_count(self) -> int:
+        """세션에 추가된 전체 프레임 수"""
+        return self.frames.count
+    
+    @property
+    def first_frame(self) -> int:
+        """조회할 수 있는 가장 오래된 프레임 번호 (프레임 로그를 쓰면 항상 0)"""
+        return 0 if self.frame_log is not None else self.frames.start
+    
+    def to_meta(self) -> Dict:
+        """세션 저장소에 기록할 메타데이터"""
+        return {
+            "session_id": self.session_id,
+            "mode": self.mode,
+            "start_time": self.start_time.isoformat()
+        }
     
     def add_frame(self, pose_data: Dict, feedback: Dict, timestamp: float):
         """프레임 데이터 추가"""
-        frame_record = {
-            "timestamp": timestamp,
-            "pose_data": pose_data,
-            "feedback": feedback,
-            "datetime": datetime.now().isoformat()
-        }
-        self.frames.append(frame_record)
-        self.feedback_history.append(feedback)
+        self._add(pose_data, feedback, timestamp, time.time())
+    
+    def _add_record(self, frame_record: Dict):
+        """저장된 프레임 기록 추가 (세션 복원용)"""
+        recorded_at = datetime.fromisoformat(frame_record["datetime"]).timestamp()
+        self._add(frame_record["pose_data"], frame_record["feedback"], frame_record["timestamp"], recorded_at)
+    
+    def _add(self, pose_data: Dict, feedback: Dict, timestamp: float, recorded_at: float):
+        """프레임 저장 및 통계 갱신"""
+        is_first = self.frames.count == 0
+        self.frames.append(timestamp, pose_data, feedback, recorded_at)
+        if self.frame_log is not None:
+            self.frame_log.append(self.frames, self.frames.count - 1)
+        
+        if pose_data.get("motion_skipped"):
+            self.skipped_frames += 1
         
         # 스윙 카운트 (스윙 단계 변경 감지)
-        if len(self.frames) > 1:
-            prev_phase = self.frames[-2]["pose_data"].get("swing_phase")
-            curr_phase = pose_data.get("swing_phase")
-            if prev_phase != curr_phase and curr_phase == "setup":
-                self.swing_count += 1
+        curr_phase = pose_data.get("swing_phase")
+        if not is_first and self._last_phase != curr_phase and curr_phase == "setup":
+            self.swing_count += 1
+        self._last_phase = curr_phase
         
         # 점수 업데이트
         if feedback.get("posture_score"):
             score = feedback["posture_score"].get("score", 0)
             self.total_score += score
-            self.average_score = self.total_score / len(self.frames) if self.frames else 0
-    
-    def get_session_data(self) -> Dict:
-        """세션 데이터 반환"""
-        end_time = datetime.now()
-        duration = (end_time - self.start_time).total_seconds()
+            self.average_score = self.total_score / self.frames.count
         
-        # 통계 계산
-        error_count = sum(1 for f in self.feedback_history if f.get("severity") == "error")
-        warning_count = sum(1 for f in self.feedback_history if f.get("severity") == "warning")
-        success_count = sum(1 for f in self.feedback_history if f.get("severity") == "success")
+        # 피드백 심각도 및 스윙 단계별 누적
+        severity = feedback.get("severity")
+        self.severity_counts[severity] = self.severity_counts.get(severity, 0) + 1
+        phase = pose_data.get("swing_phase", "unknown")
+        self.phase_counts[phase] = self.phase_counts.get(phase, 0) + 1
+        if curr_phase and severity == "success":
+            self.phase_success_counts[curr_phase] = self.phase_success_counts.get(curr_phase, 0) + 1
+        
+        # 에러 프레임의 세부 항목 각도별 횟수
+        if severity == "error":
+            for detail in feedback.get("details", []):
+                angle_name = detail.get("angle_name")
+                if angle_name:
+                    self.error_angle_counts[angle_name] = self.error_angle_counts.get(angle_name, 0) + 1
+    
+    def frame_records(self, start: int = 0) -> List[Dict]:
+        """start번째 이후 프레임 기록 목록 (세션 저장소 기록용)"""
+        return list(self.iter_frame_records(start))
+    
+    def iter_frame_records(self, start: int = 0) -> Iterator[Dict]:
+        """start번째 이후 프레임 기록을 차례로 반환 (메모리에 없는 프레임은 프레임 로그에서 읽음)"""
+        retained = self.frames.start
+        if start < retained and self.frame_log is not None:
+            yield from self.frame_log.iter_records(start, retained)
+        for index in range(max(start, retained), self.frames.count):
+            yield self.frames.record(index)
+    
+    def _feedback_stats(self) -> Dict[str, int]:
+        return {
+            "error": self.severity_counts.get("error", 0),
+            "warning": self.severity_counts.get("warning", 0),
+            "success": self.severity_counts.get("success", 0)
+        }
+    
+    def _summary(self) -> Dict:
+        return {
+            "overall_score": self.average_score,
+            "improvement_areas": self._get_improvement_areas(),
+            "strengths": self._get_strengths()
+        }
+    
+    def get_summary(self) -> Dict:
+        """세션 진행 중 현재까지의 요약 (누적 통계만 사용하므로 프레임 수와 무관)"""
+        return {
+            "session_id": self.session_id,
+            "duration": (datetime.now() - self.start_time).total_seconds(),
+            "total_frames": self.frame_count,
+            "skipped_frames": self.skipped_frames,
+            "swing_count": self.swing_count,
+            "average_score": self.average_score,
+            "feedback_stats": self._feedback_stats(),
+            "swing_phases": dict(self.phase_counts),
+            "summary": self._summary()
+        }
+    
+    def get_session_data(self, include_frames: bool = True, end_time: Optional[datetime] = None) -> Dict:
+        """세션 데이터 반환
         
-        # 스윙 단계별 분석
-        swing_phases = {}
-        for frame in self.frames:
-            phase = frame["pose_data"].get("swing_phase", "unknown")
-            if phase not in swing_phases:
-                swing_phases[phase] = []
-            swing_phases[phase].append(frame)
+        통계는 세션 전체 기준이며, include_frames가 True이면 프레임 기록
+        목록을 함께 반환한다 (프레임 로그를 쓰면 전체 프레임을 읽어 오므로
+        긴 세션은 iter_frame_records()로 차례로 읽는 것이 좋다).
+        end_time을 지정하지 않으면 현재 시각을 종료 시각으로 사용한다.
+        """
+        end_time = end_time or datetime.now()
+        duration = (end_time - self.start_time).total_seconds()
         
         return {
             "session_id": self.session_id,
             "start_time": self.start_time.isoformat(),
             "end_time": end_time.isoformat(),
             "duration": duration,
-            "total_frames": len(self.frames),
+            "total_frames": self.frame_count,
+            "skipped_frames": self.skipped_frames,
             "swing_count": self.swing_count,
             "average_score": self.average_score,
             "total_score": self.total_score,
-            "feedback_stats": {
-                "error": error_count,
-                "warning": warning_count,
-                "success": success_count
-            },
-            "swing_phases": {phase: len(frames) for phase, frames in swing_phases.items()},
-            "frames": self.frames,
-            "summary": {
-                "overall_score": self.average_score,
-                "improvement_areas": self._get_improvement_areas(),
-                "strengths": self._get_strengths()
-            }
+            "feedback_stats": self._feedback_stats(),
+            "swing_phases": dict(self.phase_counts),
+            "frames": self.frame_records() if include_frames else [],
+            "summary": self._summary()
         }
     
     def _get_improvement_areas(self) -> List[str]:
         """개선 영역 식별"""
         improvement_areas = []
         
-        # 가장 많이 발생한 에러 분석
-        error_angles = {}
-        for feedback in self.feedback_history:
-            if feedback.get("severity") == "error":
-                for detail in feedback.get("details", []):
-                    angle_name = detail.get("angle_name")
-                    if angle_name:
-                        error_angles[angle_name] = error_angles.get(angle_name, 0) + 1
-        
         # 가장 많이 문제가 된 각도
-        if error_angles:
-            sorted_angles = sorted(error_angles.items(), key=lambda x: x[1], reverse=True)
+        if self.error_angle_counts:
+            sorted_angles = sorted(self.error_angle_counts.items(), key=lambda x: x[1], reverse=True)
             for angle_name, count in sorted_angles[:3]:
                 improvement_areas.append(f"{angle_name} (문제 발생 {count}회)")
         
@@ -104,19 +200,12 @@ class TrainingSession:
         """강점 식별"""
         strengths = []
         
-        success_count = sum(1 for f in self.feedback_history if f.get("severity") == "success")
-        if success_count > len(self.feedback_history) * 0.5:
+        if self.severity_counts.get("success", 0) > self.frame_count * 0.5:
             strengths.append("일관된 자세 유지")
         
         # 스윙 단계별 성공률
-        phase_success = {}
-        for frame in self.frames:
-            phase = frame["pose_data"].get("swing_phase")
-            if phase and frame["feedback"].get("severity") == "success":
-                phase_success[phase] = phase_success.get(phase, 0) + 1
-        
-        if phase_success:
-            best_phase = max(phase_success.items(), key=lambda x: x[1])
+        if self.phase_success_counts:
+            best_phase = max(self.phase_success_counts.items(), key=lambda x: x[1])
             strengths.append(f"{best_phase[0]} 단계가 우수함")
         
         return strengths if strengths else ["계속해서 연습하세요"]
@@ -124,4 +213,9 @@ class TrainingSession:
     def end_session(self):
         """세션 종료"""
         return self.get_session_data()
+    
+    def close(self):
+        """프레임 로그 삭제 (세션 종료 또는 연결 종료 후 더 이상 읽지 않을 때)"""
+        if self.frame_log is not None:
+            self.frame_log.close(delete=True)
 
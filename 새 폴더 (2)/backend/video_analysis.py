@@ -0,0 +1,268 @@
+from typing import AsyncIterator, Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import logging
+import multiprocessing as mp
+import os
+import queue
+import tempfile
+
+import config
+from training_session import TrainingSession
+
+logger = logging.getLogger(__name__)
+
+# 워커 프로세스별 분석기 (프로세스 초기화 시 생성)
+_analyzer = None
+_coach = None
+
+
+def _init_worker():
+    """영상 분석 워커 프로세스 초기화"""
+    global _analyzer, _coach
+    from ai_coach import AICoach
+    from pose_analyzer import PoseAnalyzer
+
+    # 오프라인 분석은 지연 시간보다 정확도가 중요하므로 단계 고정, 모든 프레임 추론
+    _analyzer = PoseAnalyzer(adaptive=False, motion_gating=False)
+    _coach = AICoach()
+
+
+def _open_at(path: str, start: int):
+    """start번째 프레임부터 읽도록 영상 열기
+
+    CAP_PROP_POS_FRAMES 탐색은 코덱/컨테이너에 따라 키프레임 단위로 어긋날 수
+    있으므로, 이동 후 위치를 확인하고 맞지 않으면 처음부터 프레임을 넘기며 이동한다.
+    """
+    import cv2
+
+    cap = cv2.VideoCapture(path)
+    if start <= 0:
+        return cap
+
+    position = 0
+    if cap.set(cv2.CAP_PROP_POS_FRAMES, start):
+        position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+        if position > start:
+            # 지나쳤으면 다시 열어 처음부터 이동
+            cap.release()
+            cap = cv2.VideoCapture(path)
+            position = 0
+    else:
+        # 탐색이 실패하면 위치가 바뀌었을 수 있으므로 다시 열기
+        cap.release()
+        cap = cv2.VideoCapture(path)
+
+    if position != start:
+        logger.debug(f"Seek to frame {start} landed at {position}, decoding forward")
+    # grab()은 디코딩만 하고 이미지 변환은 하지 않으므로 read()보다 빠름
+    while position < start and cap.grab():
+        position += 1
+    return cap
+
+
+def _can_seek(path: str, frame: int) -> bool:
+    """frame번째 프레임으로 이동했을 때 그 위치나 앞쪽 키프레임에 도착하는지 확인
+
+    실패하거나 지나치면 _open_at이 구간마다 처음부터 디코딩해야 하므로 구간 분할을 쓰지 않는다.
+    """
+    import cv2
+
+    cap = cv2.VideoCapture(path)
+    try:
+        return bool(cap.set(cv2.CAP_PROP_POS_FRAMES, frame)) and int(cap.get(cv2.CAP_PROP_POS_FRAMES)) <= frame
+    finally:
+        cap.release()
+
+
+def _analyze_chunk(path: str, start: int, end: Optional[int], fps: float, mode: str, results, chunk: int) -> int:
+    """영상의 [start, end) 프레임 구간 분석 (워커 프로세스에서 실행)
+
+    프레임을 분석할 때마다 (chunk, 레코드)를 results 큐로 보내고, 끝나면 (chunk, None)을 보낸다.
+    분석한 프레임 수를 반환한다.
+    """
+    # 구간마다 추적 상태를 새로 시작
+    _analyzer.reset()
+
+    cap = _open_at(path, start)
+    try:
+        index = start
+        while end is None or index < end:
+            ok, frame = cap.read()
+            if not ok:
+                break
+
+            timestamp = index / fps if fps else 0.0
+            pose_results = _analyzer.analyze_pose(frame, mode=mode)
+            feedback = _coach.generate_feedback(pose_results, mode=mode, timestamp=timestamp)
+            results.put((chunk, {
+                "type": "frame",
+                "frame": index,
+                "timestamp": timestamp,
+                "pose_data": pose_results,
+                "feedback": feedback
+            }))
+            index += 1
+    finally:
+        cap.release()
+
+    results.put((chunk, None))
+    return index - start
+
+
+async def save_upload(upload, chunk_size: int = 1024 * 1024) -> str:
+    """업로드 파일을 메모리에 모두 올리지 않고 임시 파일로 저장"""
+    suffix = os.path.splitext(upload.filename or "")[1] or ".mp4"
+    fd, path = tempfile.mkstemp(prefix="golflink_upload_", suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while True:
+                data = await upload.read(chunk_size)
+                if not data:
+                    break
+                # 디스크 쓰기가 이벤트 루프를 막지 않도록 스레드에서 실행
+                await asyncio.to_thread(f.write, data)
+    except BaseException:
+        remove_upload(path)
+        raise
+    return path
+
+
+def remove_upload(path: str):
+    """업로드 임시 파일 삭제 (이미 삭제되었으면 무시)"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def probe_video(path: str) -> Dict:
+    """영상 메타데이터 조회"""
+    import cv2
+
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened():
+            raise ValueError("영상을 열 수 없습니다.")
+        return {
+            "fps": cap.get(cv2.CAP_PROP_FPS) or 0.0,
+            "frame_count": int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0),
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
+        }
+    finally:
+        cap.release()
+
+
+class VideoAnalyzer:
+    """업로드된 스윙 영상 오프라인 분석기
+
+    영상을 프레임 구간으로 나누어 워커 프로세스에서 병렬로 분석하고,
+    결과는 분석되는 대로 프레임 순서에 맞춰 한 프레임씩 전달한다.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_frames: Optional[int] = None):
+        self.max_workers = max_workers or config.VIDEO_ANALYSIS_WORKERS
+        self.chunk_frames = chunk_frames or config.VIDEO_CHUNK_FRAMES
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # 워커가 프레임별 결과를 보내는 큐를 만드는 관리자 프로세스
+        self._manager = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=mp.get_context("spawn"),
+                initializer=_init_worker
+            )
+        return self._executor
+
+    def _result_queue(self):
+        """워커 프로세스에 인자로 넘길 수 있는 결과 큐 생성"""
+        if self._manager is None:
+            self._manager = mp.get_context("spawn").Manager()
+        return self._manager.Queue()
+
+    def shutdown(self):
+        """워커 프로세스 종료"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def split_chunks(self, frame_count: int) -> List[tuple]:
+        """프레임 구간 목록 생성 (프레임 수를 모르면 전체를 하나의 구간으로)"""
+        if frame_count <= 0:
+            return [(0, None)]
+        return [
+            (start, min(start + self.chunk_frames, frame_count))
+            for start in range(0, frame_count, self.chunk_frames)
+        ]
+
+    async def analyze(self, path: str, mode: str = "intermediate", info: Optional[Dict] = None) -> AsyncIterator[Dict]:
+        """영상 분석 결과를 프레임 순서대로 생성
+
+        video_info → frame (프레임마다) → summary 순서로 레코드를 생성한다.
+        """
+        info = info or probe_video(path)
+        chunks = self.split_chunks(info["frame_count"])
+        if len(chunks) > 1 and not await asyncio.to_thread(_can_seek, path, chunks[1][0]):
+            logger.info(f"Frame seeking is inaccurate for {path}, analyzing in a single pass")
+            chunks = [(0, None)]
+        yield {"type": "video_info", "chunks": len(chunks), **info}
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        results = await asyncio.to_thread(self._result_queue)
+        # 요약은 누적 통계만 사용하므로 프레임 로그 없이 최근 프레임만 유지
+        session = TrainingSession(max_frames=config.FRAME_LOG_WINDOW_FRAMES, frame_log=False)
+
+        # 메모리 사용량을 제한하기 위해 동시에 제출하는 구간 수를 제한
+        max_pending = self.max_workers * 2
+        pending: Dict[int, asyncio.Future] = {}
+        # 앞 구간이 끝나기 전에 도착한 뒤 구간의 프레임
+        buffered: Dict[int, List[Dict]] = {}
+        finished = set()
+        head = 0
+
+        try:
+            while head < len(chunks):
+                next_chunk = head + len(pending)
+                while next_chunk < len(chunks) and len(pending) < max_pending:
+                    start, end = chunks[next_chunk]
+                    pending[next_chunk] = loop.run_in_executor(
+                        executor, _analyze_chunk, path, start, end, info["fps"], mode, results, next_chunk
+                    )
+                    next_chunk += 1
+
+                # 순서 보장을 위해 가장 앞 구간의 프레임만 바로 전달
+                for record in buffered.pop(head, []):
+                    session.add_frame(record["pose_data"], record["feedback"], record["timestamp"])
+                    yield record
+                if head in finished:
+                    await pending.pop(head)
+                    head += 1
+                    continue
+
+                # 워커가 실패하면 끝 표시가 오지 않으므로 예외를 확인하며 기다림
+                future = pending[head]
+                if future.done():
+                    future.result()
+                try:
+                    chunk, record = await asyncio.to_thread(results.get, True, 0.1)
+                except queue.Empty:
+                    continue
+                if record is None:
+                    finished.add(chunk)
+                else:
+                    buffered.setdefault(chunk, []).append(record)
+        finally:
+            for future in pending.values():
+                future.cancel()
+            session.close()
+
+        session_data = session.get_session_data(include_frames=False)
+        session_data.pop("frames", None)
+        yield {"type": "summary", **session_data}
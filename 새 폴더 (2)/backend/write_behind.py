@@ -0,0 +1,134 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+import sqlite3
+import threading
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# 연결을 받아 SQL을 실행하는 변경 작업 (커밋은 큐가 함)
+WriteOp = Callable[[sqlite3.Connection], None]
+
+
+class WriteBehindQueue:
+    """데이터베이스 변경 지연 일괄 기록 큐
+
+    변경 작업을 바로 커밋하지 않고 모아 두었다가, batch_size개가 쌓이거나
+    interval초가 지나면 하나의 트랜잭션으로 기록한다 (fsync 한 번).
+    작업마다 키(예: "user:<id>")를 붙여 두고, 조회 전에 같은 키의 작업이
+    남아 있으면 먼저 기록해 자신이 쓴 값을 바로 읽을 수 있게 한다.
+    프로세스가 비정상 종료되면 아직 기록하지 않은 변경(최대 interval초)은
+    유실될 수 있다.
+    """
+
+    def __init__(self, pool, batch_size: Optional[int] = None, interval: Optional[float] = None):
+        self.pool = pool
+        self.batch_size = batch_size or config.DB_WRITE_BATCH_SIZE
+        self.interval = interval or config.DB_WRITE_INTERVAL_S
+
+        self._pending: List[Tuple[Tuple[str, ...], WriteOp]] = []
+        # 키별 기록 대기 중인 작업 수
+        self._pending_keys: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        # 배치는 한 번에 하나씩, 들어온 순서대로 기록
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+
+        self.batches = 0
+        self.writes = 0
+        self.failed = 0
+
+        self._thread = threading.Thread(target=self._run, name="golflink-db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, keys: Iterable[str], op: WriteOp):
+        """변경 작업 추가 (기록은 나중에 일괄로)"""
+        keys = tuple(keys)
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError("Write-behind queue is closed")
+            self._pending.append((keys, op))
+            for key in keys:
+                self._pending_keys[key] = self._pending_keys.get(key, 0) + 1
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def has_pending(self, key: str) -> bool:
+        """key에 해당하는 변경이 아직 기록되지 않았는지 여부"""
+        with self._lock:
+            return key in self._pending_keys
+
+    def flush(self):
+        """대기 중인 변경을 모두 기록 (반환 시점에는 이전에 추가된 변경이 모두 커밋됨)"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            try:
+                self._commit(batch)
+            finally:
+                with self._lock:
+                    for keys, _ in batch:
+                        for key in keys:
+                            remaining = self._pending_keys[key] - 1
+                            if remaining:
+                                self._pending_keys[key] = remaining
+                            else:
+                                del self._pending_keys[key]
+
+    def _commit(self, batch: List[Tuple[Tuple[str, ...], WriteOp]]):
+        with self.pool.connection() as conn:
+            try:
+                for _, op in batch:
+                    op(conn)
+                conn.commit()
+                self.batches += 1
+                self.writes += len(batch)
+                return
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Batched database write failed, retrying individually: {e}")
+
+            # 배치 중 하나가 실패하면 작업마다 따로 기록 (실패한 작업만 버림)
+            for _, op in batch:
+                try:
+                    op(conn)
+                    conn.commit()
+                    self.writes += 1
+                except Exception as e:
+                    conn.rollback()
+                    self.failed += 1
+                    logger.error(f"Dropped database write: {e}")
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Write-behind flush failed: {e}")
+
+    def close(self):
+        """기록 스레드를 멈추고 남은 변경을 모두 기록"""
+        with self._lock:
+            self._stopped = True
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+
+    def get_stats(self) -> Dict:
+        """대기/기록 통계"""
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "batches": self.batches,
+            "writes": self.writes,
+            "failed": self.failed,
+            "writes_per_batch": round(self.writes / self.batches, 2) if self.batches else 0
+        }
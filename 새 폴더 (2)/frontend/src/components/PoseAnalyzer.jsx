@@ -1,14 +1,70 @@
 // MediaPipe Pose 분석 컴포넌트 (클라이언트 사이드 분석용)
-// 실제로는 백엔드에서 처리하지만, 미리보기용으로 사용 가능
+// 브라우저에서 랜드마크를 추정하고 33개 (x, y, z) 좌표만 상위 컴포넌트로 전달
 
 import React, { useEffect, useRef } from 'react'
+import { Pose } from '@mediapipe/pose'
+
+function PoseAnalyzer({ videoRef, enabled, onPoseDetected, interval = 100, modelComplexity = 1 }) {
+  const onPoseDetectedRef = useRef(onPoseDetected)
+
+  useEffect(() => {
+    onPoseDetectedRef.current = onPoseDetected
+  }, [onPoseDetected])
+
+  useEffect(() => {
+    if (!enabled) return
+
+    const pose = new Pose({
+      locateFile: (file) => `https://cdn.jsdelivr.net/npm/@mediapipe/pose/${file}`
+    })
+    pose.setOptions({
+      modelComplexity,
+      smoothLandmarks: true,
+      enableSegmentation: false,
+      minDetectionConfidence: 0.5,
+      minTrackingConfidence: 0.5
+    })
+
+    let timestamp = 0
+    pose.onResults((results) => {
+      // 미검출 시 null 전달
+      const landmarks = results.poseLandmarks
+        ? results.poseLandmarks.map((lm) => [lm.x, lm.y, lm.z])
+        : null
+      onPoseDetectedRef.current?.(landmarks, timestamp)
+    })
+
+    let isRunning = true
+    let timer = null
+
+    const detect = async () => {
+      if (!isRunning) return
+      const video = videoRef.current
+      if (video && video.readyState === video.HAVE_ENOUGH_DATA) {
+        try {
+          timestamp = Date.now() / 1000
+          await pose.send({ image: video })
+        } catch (error) {
+          console.error('Error detecting pose:', error)
+        }
+      }
+      if (isRunning) {
+        timer = setTimeout(detect, interval)
+      }
+    }
+
+    detect()
+
+    return () => {
+      isRunning = false
+      if (timer) {
+        clearTimeout(timer)
+      }
+      pose.close()
+    }
+  }, [enabled, interval, modelComplexity, videoRef])
 
-function PoseAnalyzer({ videoRef, onPoseDetected }) {
-  // 클라이언트 사이드 MediaPipe Pose는 필요시 구현
-  // 현재는 백엔드에서 처리하므로 이 컴포넌트는 플레이스홀더
-  
   return null
 }
 
 export default PoseAnalyzer
-
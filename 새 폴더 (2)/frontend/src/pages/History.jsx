@@ -3,27 +3,39 @@ import { Link } from 'react-router-dom'
 import axios from 'axios'
 import '../App.css'
 
+// 사용자 ID는 임시로 'default' 사용
+const USER_ID = 'default'
+// 목록에 표시하는 열만 요청
+const HISTORY_FIELDS = 'mode,start_time,average_score,swing_count'
+const HISTORY_PAGE_SIZE = 20
+
 function History() {
   const [stats, setStats] = useState(null)
   const [history, setHistory] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
 
   useEffect(() => {
     fetchHistory()
   }, [])
 
+  const fetchHistoryPage = (cursor) => {
+    return axios.get(`http://localhost:8000/api/training/user/${USER_ID}/history`, {
+      params: { limit: HISTORY_PAGE_SIZE, fields: HISTORY_FIELDS, cursor: cursor || undefined }
+    })
+  }
+
   const fetchHistory = async () => {
     try {
-      // 사용자 ID는 임시로 'default' 사용
-      const userId = 'default'
-      
       const [statsResponse, historyResponse] = await Promise.all([
-        axios.get(`http://localhost:8000/api/user/${userId}/stats`),
-        axios.get(`http://localhost:8000/api/training/user/${userId}/history`)
+        axios.get(`http://localhost:8000/api/user/${USER_ID}/stats`),
+        fetchHistoryPage(null)
       ])
 
       setStats(statsResponse.data)
       setHistory(historyResponse.data.history || [])
+      setNextCursor(historyResponse.data.next_cursor || null)
     } catch (error) {
       console.error('Error fetching history:', error)
     } finally {
@@ -31,6 +43,19 @@ function History() {
     }
   }
 
+  const loadMore = async () => {
+    setLoadingMore(true)
+    try {
+      const response = await fetchHistoryPage(nextCursor)
+      setHistory((prev) => [...prev, ...(response.data.history || [])])
+      setNextCursor(response.data.next_cursor || null)
+    } catch (error) {
+      console.error('Error fetching history:', error)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   if (loading) {
     return (
       <div className="container">
@@ -113,6 +138,13 @@ function History() {
                 </div>
               </div>
             ))}
+            {nextCursor && (
+              <div style={{ textAlign: 'center', marginTop: '16px' }}>
+                <button className="btn" onClick={loadMore} disabled={loadingMore}>
+                  {loadingMore ? '불러오는 중...' : '더 보기'}
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>
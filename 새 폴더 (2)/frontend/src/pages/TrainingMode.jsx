@@ -1,14 +1,72 @@
 import React, { useState, useRef, useEffect } from 'react'
 import { Link } from 'react-router-dom'
+import { decode } from '@msgpack/msgpack'
 import '../App.css'
 import PoseAnalyzer from '../components/PoseAnalyzer'
 import FeedbackPanel from '../components/FeedbackPanel'
 import CameraView from '../components/CameraView'
 
+// 바이너리 프레임 헤더 (little-endian, 12바이트)
+// version(u8) | type(u8) | mode(u8) | reserved(u8) | timestamp(f64, 초)
+const FRAME_PROTOCOL_VERSION = 1
+const FRAME_HEADER_SIZE = 12
+const MESSAGE_TYPE_FRAME = 1
+const MESSAGE_TYPE_LANDMARKS = 3
+const LANDMARK_COUNT = 33
+const MODE_CODES = { beginner: 0, intermediate: 1, professional: 2 }
+
+// 압축 응답 협상: 필요한 필드만 MessagePack으로 받고 피드백은 변경 시에만 수신
+const ANALYSIS_WS_URL = 'ws://localhost:8000/ws/pose-analysis?format=msgpack&fields=swing_phase,posture_score&feedback=on_change'
+
+// 서버 과부하로 세션이 거절된 경우의 종료 코드 (Try Again Later)
+const CLOSE_TRY_AGAIN_LATER = 1013
+
+// 연결이 끊기면 같은 세션으로 다시 접속 (다른 서버 워커에서도 이어짐)
+const RECONNECT_DELAY_MS = 1000
+const MAX_RECONNECT_ATTEMPTS = 5
+
+// 캡처 기본값 (서버 control 메시지로 조절됨)
+const DEFAULT_CAPTURE_SETTINGS = { fps: 10, maxWidth: 1280, jpegQuality: 0.8 }
+
+const encodeFrameMessage = (jpegBuffer, timestamp, mode) => {
+  const message = new Uint8Array(FRAME_HEADER_SIZE + jpegBuffer.byteLength)
+  const header = new DataView(message.buffer)
+  header.setUint8(0, FRAME_PROTOCOL_VERSION)
+  header.setUint8(1, MESSAGE_TYPE_FRAME)
+  header.setUint8(2, MODE_CODES[mode] ?? MODE_CODES.intermediate)
+  header.setFloat64(4, timestamp, true)
+  message.set(new Uint8Array(jpegBuffer), FRAME_HEADER_SIZE)
+  return message.buffer
+}
+
+// 브라우저에서 추정한 랜드마크 전송 (미검출 시 헤더만 전송)
+const encodeLandmarksMessage = (landmarks, timestamp, mode) => {
+  const bodySize = landmarks ? LANDMARK_COUNT * 3 * 4 : 0
+  const buffer = new ArrayBuffer(FRAME_HEADER_SIZE + bodySize)
+  const view = new DataView(buffer)
+  view.setUint8(0, FRAME_PROTOCOL_VERSION)
+  view.setUint8(1, MESSAGE_TYPE_LANDMARKS)
+  view.setUint8(2, MODE_CODES[mode] ?? MODE_CODES.intermediate)
+  view.setFloat64(4, timestamp, true)
+  if (landmarks) {
+    landmarks.forEach(([x, y, z], i) => {
+      const offset = FRAME_HEADER_SIZE + i * 12
+      view.setFloat32(offset, x, true)
+      view.setFloat32(offset + 4, y, true)
+      view.setFloat32(offset + 8, z, true)
+    })
+  }
+  return buffer
+}
+
 function TrainingMode() {
   const [isTraining, setIsTraining] = useState(false)
   const [mode, setMode] = useState('intermediate') // beginner, intermediate, professional
+  // 브라우저에서 자세 추정 후 랜드마크만 전송
+  const [clientInference, setClientInference] = useState(false)
   const [feedback, setFeedback] = useState(null)
+  // 서버 수락 대기 순번 (대기 중이 아니면 null)
+  const [queuePosition, setQueuePosition] = useState(null)
   const [sessionStats, setSessionStats] = useState({
     swingCount: 0,
     averageScore: 0,
@@ -17,6 +75,13 @@ function TrainingMode() {
   const videoRef = useRef(null)
   const wsRef = useRef(null)
   const stopCaptureRef = useRef(null)
+  const captureSettingsRef = useRef(DEFAULT_CAPTURE_SETTINGS)
+  // 수락 대기 중에는 프레임을 보내지 않음
+  const awaitingAdmissionRef = useRef(false)
+  // 재접속 시 이어갈 서버 세션 ID
+  const sessionIdRef = useRef(null)
+  const stoppingRef = useRef(false)
+  const reconnectAttemptsRef = useRef(0)
 
   const startTraining = async () => {
     try {
@@ -30,50 +95,118 @@ function TrainingMode() {
       }
 
       // WebSocket 연결
-      const ws = new WebSocket('ws://localhost:8000/ws/pose-analysis')
-      wsRef.current = ws
+      sessionIdRef.current = null
+      stoppingRef.current = false
+      reconnectAttemptsRef.current = 0
+      connect()
 
-      ws.onopen = () => {
-        console.log('WebSocket connected')
-        setIsTraining(true)
+      // 프레임 전송 시작 (브라우저 분석 모드에서는 PoseAnalyzer가 랜드마크 전송)
+      if (!clientInference) {
+        stopCaptureRef.current = startFrameCapture()
       }
 
-      ws.onmessage = (event) => {
-        const data = JSON.parse(event.data)
-        if (data.type === 'analysis') {
+    } catch (error) {
+      console.error('Error starting training:', error)
+      alert('카메라 접근에 실패했습니다. 카메라 권한을 확인해주세요.')
+    }
+  }
+
+  const connect = () => {
+    // 브라우저 분석 세션은 서버 추론 한도와 별도로 수락됨
+    let url = clientInference ? `${ANALYSIS_WS_URL}&inference=client` : ANALYSIS_WS_URL
+    // 훈련 기록에 남길 난이도 (훈련 중에는 바꿀 수 없음)
+    url += `&mode=${mode}`
+    if (sessionIdRef.current) {
+      url += `&session_id=${encodeURIComponent(sessionIdRef.current)}`
+    }
+    const ws = new WebSocket(url)
+    ws.binaryType = 'arraybuffer'
+    wsRef.current = ws
+    captureSettingsRef.current = DEFAULT_CAPTURE_SETTINGS
+    awaitingAdmissionRef.current = false
+
+    ws.onopen = () => {
+      console.log('WebSocket connected')
+      setIsTraining(true)
+    }
+
+    ws.onmessage = (event) => {
+      const data = event.data instanceof ArrayBuffer
+        ? decode(new Uint8Array(event.data))
+        : JSON.parse(event.data)
+      if (data.type === 'session') {
+        // 재접속 시 이어갈 세션 ID 보관
+        sessionIdRef.current = data.session_id
+        reconnectAttemptsRef.current = 0
+      } else if (data.type === 'queued') {
+        awaitingAdmissionRef.current = true
+        setQueuePosition(data.position)
+      } else if (data.type === 'admitted') {
+        awaitingAdmissionRef.current = false
+        setQueuePosition(null)
+      } else if (data.type === 'control') {
+        // 서버 부하에 맞춰 캡처 fps/해상도/JPEG 품질 조절
+        captureSettingsRef.current = {
+          fps: data.fps,
+          maxWidth: data.max_width,
+          jpegQuality: data.jpeg_quality
+        }
+      } else if (data.type === 'summary') {
+        // 서버가 집계한 현재까지의 세션 요약으로 통계 보정
+        setSessionStats({
+          swingCount: data.swing_count,
+          averageScore: data.average_score,
+          totalFrames: data.total_frames
+        })
+      } else if (data.type === 'analysis') {
+        // 피드백은 내용이 바뀐 경우에만 포함됨
+        if (data.feedback) {
           setFeedback(data.feedback)
-          setSessionStats(prev => ({
-            ...prev,
-            totalFrames: prev.totalFrames + 1,
-            averageScore: (prev.averageScore * prev.totalFrames + (data.feedback.posture_score?.score || 0)) / (prev.totalFrames + 1),
-            swingCount: data.pose_data.swing_phase === 'setup' ? prev.swingCount + 1 : prev.swingCount
-          }))
         }
+        setSessionStats(prev => ({
+          ...prev,
+          totalFrames: prev.totalFrames + 1,
+          averageScore: (prev.averageScore * prev.totalFrames + (data.pose_data.posture_score?.score || 0)) / (prev.totalFrames + 1),
+          swingCount: data.pose_data.swing_phase === 'setup' ? prev.swingCount + 1 : prev.swingCount
+        }))
       }
+    }
 
-      ws.onerror = (error) => {
-        console.error('WebSocket error:', error)
-      }
+    ws.onerror = (error) => {
+      console.error('WebSocket error:', error)
+    }
 
-      ws.onclose = () => {
-        console.log('WebSocket closed')
+    ws.onclose = (event) => {
+      console.log('WebSocket closed')
+      if (event.code === CLOSE_TRY_AGAIN_LATER) {
+        const retryAfter = /retry_after=(\d+)/.exec(event.reason)?.[1]
+        stopTraining()
+        alert(`서버가 혼잡합니다. ${retryAfter ? `${retryAfter}초 후 ` : ''}다시 시도해주세요.`)
+      } else if (!stoppingRef.current && sessionIdRef.current && reconnectAttemptsRef.current < MAX_RECONNECT_ATTEMPTS) {
+        // 예기치 않게 끊긴 경우 같은 세션으로 재접속 (이미 분석된 프레임은 서버에 보존됨)
+        reconnectAttemptsRef.current += 1
+        setTimeout(() => {
+          if (!stoppingRef.current) {
+            connect()
+          }
+        }, RECONNECT_DELAY_MS * reconnectAttemptsRef.current)
       }
-
-      // 프레임 전송 시작
-      stopCaptureRef.current = startFrameCapture(ws)
-
-    } catch (error) {
-      console.error('Error starting training:', error)
-      alert('카메라 접근에 실패했습니다. 카메라 권한을 확인해주세요.')
     }
   }
 
-  const startFrameCapture = (ws) => {
+  const startFrameCapture = () => {
     const canvas = document.createElement('canvas')
     const context = canvas.getContext('2d')
     let isCapturing = true
     let frameInterval = null
 
+    const scheduleNext = () => {
+      // 서버가 지시한 fps 간격으로 프레임 전송
+      if (isCapturing) {
+        frameInterval = setTimeout(captureFrame, 1000 / captureSettingsRef.current.fps)
+      }
+    }
+
     const captureFrame = () => {
       if (!isCapturing) return
       
@@ -83,27 +216,30 @@ function TrainingMode() {
       }
 
       try {
-        canvas.width = videoRef.current.videoWidth
-        canvas.height = videoRef.current.videoHeight
-        context.drawImage(videoRef.current, 0, 0)
-
-        const frameData = canvas.toDataURL('image/jpeg', 0.8)
-        
-        if (ws.readyState === WebSocket.OPEN && isCapturing) {
-          ws.send(JSON.stringify({
-            type: 'frame',
-            frame: frameData,
-            timestamp: Date.now() / 1000,
-            mode: mode
-          }))
-        }
+        const { maxWidth, jpegQuality } = captureSettingsRef.current
+        const { videoWidth, videoHeight } = videoRef.current
+        const scale = Math.min(1, maxWidth / videoWidth)
+        canvas.width = Math.round(videoWidth * scale)
+        canvas.height = Math.round(videoHeight * scale)
+        context.drawImage(videoRef.current, 0, 0, canvas.width, canvas.height)
+        const timestamp = Date.now() / 1000
+
+        // JPEG 바이트를 Base64 없이 바이너리 메시지로 전송
+        canvas.toBlob(async (blob) => {
+          try {
+            const ws = wsRef.current
+            if (blob && ws && ws.readyState === WebSocket.OPEN && isCapturing && !awaitingAdmissionRef.current) {
+              const jpegBuffer = await blob.arrayBuffer()
+              ws.send(encodeFrameMessage(jpegBuffer, timestamp, mode))
+            }
+          } catch (error) {
+            console.error('Error sending frame:', error)
+          }
+          scheduleNext()
+        }, 'image/jpeg', jpegQuality)
       } catch (error) {
         console.error('Error capturing frame:', error)
-      }
-
-      // 100ms마다 프레임 전송 (약 10fps)
-      if (isCapturing) {
-        frameInterval = setTimeout(captureFrame, 100)
+        scheduleNext()
       }
     }
 
@@ -118,7 +254,16 @@ function TrainingMode() {
     }
   }
 
+  const sendLandmarks = (landmarks, timestamp) => {
+    const ws = wsRef.current
+    if (ws && ws.readyState === WebSocket.OPEN && !awaitingAdmissionRef.current) {
+      ws.send(encodeLandmarksMessage(landmarks, timestamp, mode))
+    }
+  }
+
   const stopTraining = () => {
+    stoppingRef.current = true
+
     // 프레임 캡처 중지
     if (stopCaptureRef.current) {
       stopCaptureRef.current()
@@ -138,6 +283,7 @@ function TrainingMode() {
 
     setIsTraining(false)
     setFeedback(null)
+    setQueuePosition(null)
   }
 
   useEffect(() => {
@@ -164,6 +310,11 @@ function TrainingMode() {
         <div className="card">
           <h2>카메라 뷰</h2>
           <CameraView videoRef={videoRef} isTraining={isTraining} />
+          <PoseAnalyzer
+            videoRef={videoRef}
+            enabled={isTraining && clientInference}
+            onPoseDetected={sendLandmarks}
+          />
           
           <div style={{ marginTop: '20px', display: 'flex', gap: '12px', alignItems: 'center' }}>
             <label>
@@ -180,6 +331,17 @@ function TrainingMode() {
               </select>
             </label>
 
+            <label>
+              <input
+                type="checkbox"
+                checked={clientInference}
+                onChange={(e) => setClientInference(e.target.checked)}
+                disabled={isTraining}
+                style={{ marginRight: '6px' }}
+              />
+              브라우저 분석
+            </label>
+
             {!isTraining ? (
               <button className="btn" onClick={startTraining}>훈련 시작</button>
             ) : (
@@ -187,6 +349,12 @@ function TrainingMode() {
             )}
           </div>
 
+          {queuePosition !== null && (
+            <p style={{ marginTop: '12px', color: '#666' }}>
+              서버가 혼잡하여 대기 중입니다 (대기 순번 {queuePosition})
+            </p>
+          )}
+
           {/* 세션 통계 */}
           <div style={{ marginTop: '20px', padding: '16px', background: '#f5f5f5', borderRadius: '8px' }}>
             <h3>세션 통계</h3>